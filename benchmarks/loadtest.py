@@ -0,0 +1,163 @@
+"""
+Concurrency load test for `query`, run against a ReplayDriver so no SQL Server is
+needed. Requests are driven from N threads, N asyncio tasks (offloaded to a thread
+pool as the library is synchronous) and N processes, for increasing N.
+
+Run from the repository root:
+    python -m benchmarks.loadtest
+    python -m benchmarks.loadtest --modes threads --concurrency 1,4,16 --rows 5000
+    python -m benchmarks.loadtest --capture orders.capture --operation "SELECT ..."
+"""
+
+import argparse
+import asyncio
+import sys
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from time import perf_counter, process_time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pymssqlutils as sql
+from tests.helpers import cursor_description, cursor_row
+
+DEFAULT_OPERATION = "SELECT * FROM LoadTest WHERE Id = %s"
+
+Timings = Tuple[List[float], float]
+
+
+def _configure(args: Dict[str, Any]) -> None:
+    if args["capture"]:
+        recordings: Any = args["capture"]
+    else:
+        recordings = {
+            sql.substitute_parameters(DEFAULT_OPERATION, 0): [
+                (cursor_description, cursor_row * args["rows"])
+            ]
+        }
+    sql.set_driver(
+        sql.ReplayDriver(
+            recordings,
+            connect_latency=args["connect_latency"],
+            latency=args["latency"],
+            rows_per_second=args["rows_per_second"],
+        )
+    )
+    sql.set_connection_details(server="loadtest")
+
+
+def _request(operation: str, idx: int) -> float:
+    start = perf_counter()
+    sql.query(operation, idx if "%s" in operation else None)
+    return perf_counter() - start
+
+
+def _process_worker(args: Dict[str, Any], count: int) -> Timings:
+    # runs in a child process, returns the latencies and the CPU seconds used
+    _configure(args)
+    cpu_start = process_time()
+    latencies = [_request(args["operation"], idx) for idx in range(count)]
+    return latencies, process_time() - cpu_start
+
+
+def _split(requests: int, concurrency: int) -> List[int]:
+    return [
+        requests // concurrency + (1 if idx < requests % concurrency else 0)
+        for idx in range(concurrency)
+    ]
+
+
+def run_threads(args: Dict[str, Any], concurrency: int, requests: int) -> Timings:
+    operation = args["operation"]
+    cpu_start = process_time()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(
+            pool.map(lambda idx: _request(operation, idx), range(requests))
+        )
+    return latencies, process_time() - cpu_start
+
+
+def run_asyncio(args: Dict[str, Any], concurrency: int, requests: int) -> Timings:
+    operation = args["operation"]
+
+    async def worker(pool: ThreadPoolExecutor, count: int) -> List[float]:
+        loop = asyncio.get_event_loop()
+        return [
+            await loop.run_in_executor(pool, _request, operation, idx)
+            for idx in range(count)
+        ]
+
+    async def main() -> List[float]:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = await asyncio.gather(
+                *(worker(pool, count) for count in _split(requests, concurrency))
+            )
+        return [latency for latencies in results for latency in latencies]
+
+    cpu_start = process_time()
+    latencies = asyncio.run(main())
+    return latencies, process_time() - cpu_start
+
+
+def run_processes(args: Dict[str, Any], concurrency: int, requests: int) -> Timings:
+    with ProcessPoolExecutor(max_workers=concurrency) as pool:
+        results = list(
+            pool.map(
+                _process_worker,
+                [args] * concurrency,
+                _split(requests, concurrency),
+            )
+        )
+    latencies = [latency for latencies, _ in results for latency in latencies]
+    return latencies, sum(cpu for _, cpu in results)
+
+
+MODES = {
+    "threads": run_threads,
+    "asyncio": run_asyncio,
+    "processes": run_processes,
+}
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    idx = min(len(sorted_values) - 1, int(len(sorted_values) * percentile))
+    return sorted_values[idx]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--concurrency", default="1,2,4,8,16")
+    parser.add_argument("--requests", type=int, default=400, help="per level")
+    parser.add_argument("--rows", type=int, default=500, help="synthetic rows")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds")
+    parser.add_argument("--connect-latency", type=float, default=0.002)
+    parser.add_argument("--rows-per-second", type=float, default=None)
+    parser.add_argument("--capture", default=None, help="a RecordingDriver file")
+    parser.add_argument("--operation", default=DEFAULT_OPERATION)
+    args = vars(parser.parse_args(argv))
+
+    _configure(args)
+    # warm up, e.g. the one off TDS protocol check
+    _request(args["operation"], 0)
+
+    print(
+        f"{'mode':<10} {'N':>4} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'cpu ms/req':>11}"
+    )
+    for mode in args["modes"].split(","):
+        for concurrency in (int(x) for x in args["concurrency"].split(",")):
+            start = perf_counter()
+            latencies, cpu = MODES[mode](args, concurrency, args["requests"])
+            elapsed = perf_counter() - start
+            latencies.sort()
+            print(
+                f"{mode:<10} {concurrency:>4} {len(latencies) / elapsed:>10.1f} "
+                f"{_percentile(latencies, 0.50) * 1000:>9.2f} "
+                f"{_percentile(latencies, 0.95) * 1000:>9.2f} "
+                f"{_percentile(latencies, 0.99) * 1000:>9.2f} "
+                f"{cpu / len(latencies) * 1000:>11.3f}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
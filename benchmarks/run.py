@@ -0,0 +1,338 @@
+"""
+Benchmarks for the library's hot paths, these run without a SQL Server by using the
+mock cursors from the test suite.
+
+Run from the repository root:
+    python -m benchmarks.run                  # run and compare against the baseline
+    python -m benchmarks.run --save-baseline  # run and overwrite the baseline
+    python -m benchmarks.run -k decode        # only run benchmarks matching 'decode'
+"""
+
+import argparse
+import io
+import json
+import sys
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from unittest import mock
+
+import pymssqlutils as sql
+from pymssqlutils import DatabaseResult, methods
+from tests.helpers import MockCursor, cursor_description, cursor_row
+
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+# memory growth is only checked when both peaks are at least this many MB, below it
+# the ratio is dominated by noise
+MEMORY_FLOOR_MB = 1.0
+
+Setup = Callable[[int], Tuple[Callable[[], Any], int]]
+BENCHMARKS: Dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    """
+    Registers a benchmark. The decorated function is passed a scale factor, does any
+    setup and returns a zero argument callable to time along with the number of
+    rows (or items) that callable processes.
+    """
+
+    def decorator(func: Setup) -> Setup:
+        BENCHMARKS[name] = func
+        return func
+
+    return decorator
+
+
+def _json_safe_columns() -> Tuple[Tuple[Any, ...], List[Tuple[Any, ...]]]:
+    # the binary columns are not JSON serializable, the tests drop the same columns
+    keep = [idx for idx in range(len(cursor_description)) if idx not in (8, 9, 37)]
+    description = tuple(cursor_description[idx] for idx in keep)
+    row = tuple(cursor_row[0][idx] for idx in keep)
+    return description, [row]
+
+
+def _decoded_result(rows: int, json_safe: bool = False) -> DatabaseResult:
+    if json_safe:
+        description, row = _json_safe_columns()
+        cursor = MockCursor(row_count=rows, description=description, row=row)
+    else:
+        cursor = MockCursor(row_count=rows)
+    return DatabaseResult(ok=True, fetch=True, commit=False, cursor=cursor)
+
+
+@benchmark("decode_wide")
+def decode_wide(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+
+    def run() -> Any:
+        return DatabaseResult(
+            ok=True, fetch=True, commit=False, cursor=MockCursor(row_count=rows)
+        )
+
+    return run, rows
+
+
+def _decode_tall(idx: int) -> Setup:
+    def setup(scale: int) -> Tuple[Callable[[], Any], int]:
+        rows = 20_000 * scale
+        description = (cursor_description[idx],)
+        row = [(cursor_row[0][idx],)]
+
+        def run() -> Any:
+            return DatabaseResult(
+                ok=True,
+                fetch=True,
+                commit=False,
+                cursor=MockCursor(row_count=rows, description=description, row=row),
+            )
+
+        return run, rows
+
+    return setup
+
+
+for _idx, _column in enumerate(cursor_description):
+    benchmark(f"decode_tall[{_column[0]}]")(_decode_tall(_idx))
+
+
+@benchmark("substitute_parameters")
+def substitute_parameters(scale: int) -> Tuple[Callable[[], Any], int]:
+    count = 20_000 * scale
+    parameters = (
+        1,
+        1.23,
+        "hello",
+        datetime(2021, 7, 7, 9, 49, tzinfo=timezone.utc),
+        Decimal("1.5"),
+        None,
+    )
+
+    def run() -> Any:
+        for _ in range(count):
+            sql.substitute_parameters("SELECT %s, %s, %s, %s, %s, %s", parameters)
+
+    return run, count
+
+
+@benchmark("to_sql_list[int]")
+def to_sql_list_int(scale: int) -> Tuple[Callable[[], Any], int]:
+    values = list(range(50_000 * scale))
+    return lambda: sql.to_sql_list(values), len(values)
+
+
+@benchmark("to_sql_list[str]")
+def to_sql_list_str(scale: int) -> Tuple[Callable[[], Any], int]:
+    values = [f"value-{x}" for x in range(50_000 * scale)]
+    return lambda: sql.to_sql_list(values), len(values)
+
+
+@benchmark("model_to_values")
+def model_to_values(scale: int) -> Tuple[Callable[[], Any], int]:
+    count = 10_000 * scale
+    model = {
+        "id": 1,
+        "name": "hello",
+        "price": 1.23,
+        "created": datetime(2021, 7, 7, 9, 49, tzinfo=timezone.utc),
+        "active": True,
+        "notes": None,
+    }
+
+    def run() -> Any:
+        for _ in range(count):
+            sql.model_to_values(model)
+
+    return run, count
+
+
+@benchmark("models_to_values")
+def models_to_values(scale: int) -> Tuple[Callable[[], Any], int]:
+    count = 10_000 * scale
+    models = [
+        {
+            "id": idx,
+            "name": "hello",
+            "price": 1.23,
+            "created": datetime(2021, 7, 7, 9, 49, tzinfo=timezone.utc),
+            "active": True,
+            "notes": None,
+        }
+        for idx in range(count)
+    ]
+    return lambda: sql.models_to_values(models), count
+
+
+class _NullCursor:
+    def __enter__(self) -> "_NullCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        pass
+
+    def execute(self, operation: str) -> None:
+        pass
+
+
+class _NullConnection:
+    def cursor(self) -> _NullCursor:
+        return _NullCursor()
+
+    def commit(self) -> None:
+        pass
+
+
+@contextmanager
+def _null_connection(*args: Any, **kwargs: Any) -> Iterator[_NullConnection]:
+    yield _NullConnection()
+
+
+@benchmark("execute_batched")
+def execute_batched(scale: int) -> Tuple[Callable[[], Any], int]:
+    count = 50_000 * scale
+    parameters = [(x, f"name-{x}", x * 1.5) for x in range(count)]
+
+    def run() -> Any:
+        with mock.patch.object(methods, "_get_connection", _null_connection):
+            sql.execute(
+                "INSERT INTO T VALUES (%s, %s, %s)",
+                parameters,
+                batch_size=1000,
+                server="benchmark",
+            )
+
+    return run, count
+
+
+@benchmark("to_dataframe")
+def to_dataframe(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    result = _decoded_result(rows)
+    return result.to_dataframe, rows
+
+
+@benchmark("to_json")
+def to_json(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    result = _decoded_result(rows, json_safe=True)
+    return result.to_json, rows
+
+
+@benchmark("to_json[with_columns]")
+def to_json_with_columns(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    result = _decoded_result(rows, json_safe=True)
+    return lambda: result.to_json(with_columns=True), rows
+
+
+@benchmark("to_csv")
+def to_csv(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    result = _decoded_result(rows)
+    return lambda: result.to_csv(io.BytesIO()), rows
+
+
+@benchmark("to_bytes")
+def to_bytes(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    result = _decoded_result(rows)
+    return result.to_bytes, rows
+
+
+@benchmark("from_bytes")
+def from_bytes(scale: int) -> Tuple[Callable[[], Any], int]:
+    rows = 5_000 * scale
+    data = _decoded_result(rows).to_bytes()
+    return lambda: list(DatabaseResult.from_bytes(data)), rows
+
+
+def measure(setup: Setup, scale: int, repeat: int) -> Dict[str, float]:
+    run, items = setup(scale)
+
+    timings = []
+    for _ in range(repeat):
+        start = perf_counter()
+        run()
+        timings.append(perf_counter() - start)
+    best = min(timings)
+
+    # memory is measured on a separate run as tracing slows everything down
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "items": items,
+        "seconds": best,
+        "items_per_sec": items / best if best else float("inf"),
+        "peak_memory_mb": peak / 1024**2,
+    }
+
+
+def compare(
+    name: str,
+    result: Dict[str, float],
+    baseline: Optional[Dict[str, float]],
+    tolerance: float,
+) -> Tuple[str, bool]:
+    if baseline is None:
+        return "new", False
+    speed = result["items_per_sec"] / baseline["items_per_sec"]
+    memory = result["peak_memory_mb"] / max(baseline["peak_memory_mb"], 1e-9)
+    memory_checked = (
+        min(result["peak_memory_mb"], baseline["peak_memory_mb"]) >= MEMORY_FLOOR_MB
+    )
+    regressed = speed < 1 - tolerance or (memory_checked and memory > 1 + tolerance)
+    status = f"{speed:6.2f}x speed, {memory:6.2f}x memory"
+    return (f"{status}  REGRESSION" if regressed else status), regressed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("-k", "--filter", default="", help="substring filter")
+    parser.add_argument("--scale", type=int, default=1, help="multiplies row counts")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per bench")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="allowed fractional slow down or memory growth before failing",
+    )
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    baseline: Dict[str, Dict[str, float]] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+
+    results: Dict[str, Dict[str, float]] = {}
+    failed = False
+    print(f"{'benchmark':<36} {'rows/s':>14} {'peak MB':>9}  vs baseline")
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        result = results[name] = measure(setup, args.scale, args.repeat)
+        status, regressed = compare(name, result, baseline.get(name), args.tolerance)
+        failed |= regressed
+        print(
+            f"{name:<36} {result['items_per_sec']:>14,.0f} "
+            f"{result['peak_memory_mb']:>9.2f}  {status}"
+        )
+
+    if args.save_baseline:
+        baseline.update(results)
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
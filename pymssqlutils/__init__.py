@@ -1,20 +1,100 @@
+from .converters import (
+    Interned,
+    clear_converters,
+    datetimeoffset,
+    keep,
+    register_converter,
+    scaled_int,
+    unregister_converter,
+    vectorized,
+)
 from .databaseresult import DatabaseError, DatabaseResult
+from .drivers import RecordingDriver, ReplayDriver, get_driver, set_driver
+from .index import ResultIndex
+from .instrumentation import (
+    ExecutionEvent,
+    ExecutionStats,
+    ServerStatistics,
+    clear_hooks,
+    configure_hooks,
+    disable_slow_query_log,
+    enable_slow_query_log,
+    register_hook,
+    unregister_hook,
+)
 from .methods import (
+    build_in_list,
     execute,
     model_to_values,
+    models_to_rows,
+    models_to_values,
     query,
+    query_pages,
+    query_to_csv,
+    query_to_json,
+    query_to_numpy,
+    query_to_parquet,
+    query_to_polars,
     set_connection_details,
     substitute_parameters,
     to_sql_list,
 )
+from .querystats import (
+    QueryStats,
+    disable_query_stats,
+    enable_query_stats,
+    fingerprint,
+    get_query_stats,
+    reset_query_stats,
+)
+from .views import ChainedRows, RowsView
 
 __all__ = [
     "execute",
     "query",
+    "query_to_json",
+    "query_to_csv",
+    "query_to_parquet",
+    "query_to_numpy",
+    "query_to_polars",
+    "query_pages",
     "to_sql_list",
+    "build_in_list",
     "model_to_values",
+    "models_to_values",
+    "models_to_rows",
     "substitute_parameters",
     "set_connection_details",
     "DatabaseResult",
     "DatabaseError",
+    "ResultIndex",
+    "RowsView",
+    "ChainedRows",
+    "ExecutionStats",
+    "ExecutionEvent",
+    "ServerStatistics",
+    "register_hook",
+    "unregister_hook",
+    "clear_hooks",
+    "configure_hooks",
+    "enable_slow_query_log",
+    "disable_slow_query_log",
+    "QueryStats",
+    "fingerprint",
+    "enable_query_stats",
+    "disable_query_stats",
+    "get_query_stats",
+    "reset_query_stats",
+    "register_converter",
+    "unregister_converter",
+    "clear_converters",
+    "vectorized",
+    "keep",
+    "scaled_int",
+    "datetimeoffset",
+    "Interned",
+    "set_driver",
+    "get_driver",
+    "ReplayDriver",
+    "RecordingDriver",
 ]
@@ -0,0 +1,189 @@
+import struct
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from itertools import starmap
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# a converter is called with each non-null value of a column, or if it is marked
+# with `vectorized` once per chunk with the list of the column's values
+Converter = Callable[[Any], Any]
+# per-call overrides, keyed by source type (int) or by column name (str)
+Converters = Dict[Union[int, str], Optional[Converter]]
+
+_registry: Dict[Tuple[int, type], Optional[Converter]] = {}
+
+
+def vectorized(converter: Callable[[List[Any]], Sequence[Any]]) -> Converter:
+    """
+    Marks a converter as vectorized, it is then called once per fetched chunk with
+    a list of all the column's values in the chunk (including None) and must return
+    a sequence of the same length.
+    """
+    converter.vectorized = True  # type: ignore
+    return converter
+
+
+def _is_vectorized(converter: Optional[Converter]) -> bool:
+    return getattr(converter, "vectorized", False)
+
+
+@vectorized
+def keep(values: List[Any]) -> List[Any]:
+    """
+    A converter which leaves the values as returned by pymssql, this skips the
+    per value conversion entirely.
+    """
+    return values
+
+
+def scaled_int(scale: int) -> Converter:
+    """
+    Returns a converter which converts Decimals to integers in units of
+    10 ** -scale, e.g. with a scale of 2 Decimal("12.34") becomes 1234. The value is
+    rounded if it has more decimal places.
+
+    :param scale: the number of decimal places to keep
+    """
+
+    def convert(value: Decimal) -> int:
+        return int(value.scaleb(scale).to_integral_value())
+
+    return convert
+
+
+# the layout of a DATETIMEOFFSET returned as bytes by certain versions of FreeTDS:
+# 100ns ticks since midnight, days since 1900-01-01, offset in minutes & flags
+_DATETIMEOFFSET = struct.Struct("QIhH")
+_DATETIMEOFFSET_EPOCH = datetime(1900, 1, 1)
+_timezones: Dict[int, timezone] = {}
+
+
+def _decode_datetimeoffset(ticks: int, days: int, offset: int, _: int) -> datetime:
+    tz = _timezones.get(offset)
+    if tz is None:
+        tz = _timezones.setdefault(offset, timezone(timedelta(minutes=offset)))
+    # the date & time are stored in UTC
+    return (
+        _DATETIMEOFFSET_EPOCH
+        + timedelta(days=days, minutes=offset, microseconds=ticks / 10)
+    ).replace(tzinfo=tz)
+
+
+def _parse_datetimeoffset_from_bytes(item: bytes) -> datetime:
+    return _decode_datetimeoffset(*_DATETIMEOFFSET.unpack(item))
+
+
+@vectorized
+def datetimeoffset(values: List[Any]) -> List[Any]:
+    """
+    Decodes a column of DATETIMEOFFSET values returned as bytes by certain versions
+    of FreeTDS, unpacking the whole chunk at once. Values which are already
+    datetimes are left as they are, as are chunks containing values which aren't
+    16 bytes long, e.g. a VARBINARY column whose first value looked like a
+    DATETIMEOFFSET. Pass this as a column's converter, e.g.
+    `converters={"CreatedAt": datetimeoffset}`, so that the column is decoded
+    without checking whether its first value looks like a DATETIMEOFFSET.
+    """
+    present = [x for x in values if x is not None]
+    if present and not isinstance(present[0], bytes):
+        return values
+    if any(len(x) != _DATETIMEOFFSET.size for x in present):
+        return values
+    decoded = starmap(
+        _decode_datetimeoffset, _DATETIMEOFFSET.iter_unpack(b"".join(present))
+    )
+    if len(present) == len(values):
+        return list(decoded)
+    return [None if x is None else next(decoded) for x in values]
+
+
+class Interned:
+    """
+    A vectorized converter which interns a column's values, so that each distinct
+    value is held in memory once rather than once per row, e.g. for status, country
+    or category columns. Exports map columns whose chunks were all interned to a
+    pandas Categorical, polars Categorical or Arrow dictionary array.
+
+    If max_ratio is given, each chunk's column is sampled and only interned if the
+    ratio of distinct to sampled values is at most max_ratio, so it can be registered
+    for every string column, e.g. `register_converter(1, str, Interned(0.1))`.
+    Once the cache holds max_size distinct values new values are not interned.
+
+    :param max_ratio: the maximum ratio of distinct values in a sample to intern a
+                      chunk, if None the chunks are always interned
+    :param sample_size: the number of values to sample from each chunk
+    :param max_size: the maximum number of distinct values held in the cache
+    """
+
+    vectorized = True
+    max_ratio: Optional[float]
+    sample_size: int
+    max_size: int
+    _cache: Dict[Any, Any]
+
+    def __init__(
+        self,
+        max_ratio: Optional[float] = None,
+        sample_size: int = 1000,
+        max_size: int = 100_000,
+    ):
+        self.max_ratio = max_ratio
+        self.sample_size = sample_size
+        self.max_size = max_size
+        self._cache = {}
+
+    def __call__(self, values: List[Any]) -> List[Any]:
+        interned = self._intern(values)
+        return values if interned is None else interned
+
+    def _intern(self, values: List[Any]) -> Optional[List[Any]]:
+        # returns the interned values, or None if the sample has too many distinct
+        # values to intern them
+        if self.max_ratio is not None:
+            sample = values[:: max(1, len(values) // self.sample_size)]
+            if len(set(sample)) > self.max_ratio * len(sample):
+                return None
+        if len(self._cache) < self.max_size:
+            return list(map(self._cache.setdefault, values, values))
+        return list(map(self._cache.get, values, values))
+
+    def __repr__(self) -> str:
+        return f"Interned(max_ratio={self.max_ratio}, size={len(self._cache)})"
+
+
+def register_converter(
+    source_type: int, python_type: type, converter: Optional[Converter]
+) -> None:
+    """
+    Registers the converter used for the values of columns with this source type
+    (the DB-API type code, 1 STRING, 2 BINARY, 3 NUMBER, 4 DATETIME, 5 DECIMAL)
+    whose first non-null value is an instance of python_type, replacing the
+    default conversion. Pass `keep` (or None) to return the values unconverted.
+
+    :param source_type: the source type of the column
+    :param python_type: the type of the values returned by pymssql, subclasses match
+    :param converter: a callable taking one value, or marked with `vectorized`
+    """
+    _registry[(source_type, python_type)] = converter
+
+
+def unregister_converter(source_type: int, python_type: type) -> None:
+    """
+    Removes a registered converter, raises a KeyError if it is not registered.
+    """
+    del _registry[(source_type, python_type)]
+
+
+def clear_converters() -> None:
+    """
+    Removes all registered converters, restoring the default conversions.
+    """
+    _registry.clear()
+
+
+def _lookup(source_type: int, item: Any) -> Tuple[bool, Optional[Converter]]:
+    # returns whether a converter is registered & the converter
+    for python_type in type(item).__mro__:
+        if (source_type, python_type) in _registry:
+            return True, _registry[(source_type, python_type)]
+    return False, None
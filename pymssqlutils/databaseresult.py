@@ -1,52 +1,85 @@
+import io
 import logging
 import struct
 import uuid
 import warnings
-from datetime import date, datetime, time, timedelta, timezone
+from contextlib import ExitStack
+from datetime import date, datetime, time
 from decimal import Decimal
+from time import perf_counter
 from typing import (
+    IO,
     TYPE_CHECKING,
     Any,
     Callable,
     Dict,
+    Iterator,
     List,
     NoReturn,
     Optional,
+    Sequence,
+    Set,
     Tuple,
     TypeVar,
     Union,
+    overload,
 )
 
 import pymssql as sql
 from pymssql import Cursor, InterfaceError, OperationalError
 from pymssql._mssql import MSSQLDatabaseException, MSSQLDriverException
 
+from pymssqlutils.converters import (
+    Converter,
+    Converters,
+    Interned,
+    _is_vectorized,
+    _lookup,
+    _parse_datetimeoffset_from_bytes,
+    datetimeoffset,
+    keep,
+)
+from pymssqlutils.export import (
+    WRITE_CHUNK_SIZE,
+    _iter_chunks,
+    build_numpy_columns,
+    build_numpy_structured,
+    build_polars_frame,
+    iter_polars_frames,
+    write_csv,
+    write_json,
+)
 from pymssqlutils.helpers import SQLParameter
+from pymssqlutils.index import ResultIndex
+from pymssqlutils.instrumentation import ExecutionStats, ServerStatistics
+from pymssqlutils.serialization import (
+    Buffer,
+    attach_shared_memory,
+    decode_result_sets,
+    encode_result_sets,
+    write_to_shared_memory,
+)
+from pymssqlutils.spill import SpilledRows, _estimate_rows_size
+from pymssqlutils.views import ChainedRows, RowsView
 
 if TYPE_CHECKING:
+    from multiprocessing.shared_memory import SharedMemory
+
     from pandas import DataFrame
 
 logger = logging.getLogger(__name__)
 T = TypeVar("T")
-ResultSet = Tuple[List[Tuple[Any, ...]], Tuple[str, ...], Tuple[int, ...]]
+ResultSet = Tuple[Sequence[Tuple[Any, ...]], Tuple[str, ...], Tuple[int, ...]]
 
-
-def _parse_datetimeoffset_from_bytes(item: bytes) -> datetime:
-    # fix for certain versions of FreeTDS driver returning Datetimeoffset as bytes
-    microseconds, days, tz, _ = struct.unpack("QIhH", item)
-    return datetime(
-        1900, 1, 1, 0, 0, 0, tzinfo=timezone(timedelta(minutes=tz))
-    ) + timedelta(days=days, minutes=tz, microseconds=microseconds / 10)
+# rows are pulled from the driver in chunks of this size so that fetching and
+# decoding can be timed separately
+FETCH_SIZE = 5000
 
 
 def _identity(x: T) -> T:
     return x
 
 
-def _unset(x: T) -> T:
-    return x
-
-
 def _get_data_mapper(sql_type_hint: int, item: Any) -> Callable[[Any], SQLParameter]:
     if sql_type_hint == 1:  # STRING: str
         if isinstance(item, str):
@@ -60,8 +93,8 @@ def _get_data_mapper(sql_type_hint: int, item: Any) -> Callable[[Any], SQLParame
         if isinstance(item, bytes):
             try:
                 _parse_datetimeoffset_from_bytes(item)
-                return _parse_datetimeoffset_from_bytes
-            except (ValueError, struct.error):
+                return datetimeoffset
+            except (ValueError, OverflowError, struct.error):
                 # it's not a datetime
                 return _identity
 
@@ -84,48 +117,181 @@ def _get_data_mapper(sql_type_hint: int, item: Any) -> Callable[[Any], SQLParame
     return _identity
 
 
-def _get_cleaned_data(
-    cursor: Cursor, source_types: Tuple[int, ...]
-) -> List[Tuple[Any, ...]]:
-    data_mappers: List[Callable[[Any], Any]] = [_unset] * len(source_types)
-
-    def clean_item(idx: int, item: Any) -> Any:
-        if item is None:
-            return None
-
-        data_mapper = data_mappers[idx]
-
-        if data_mapper is _unset:
-            data_mapper = _get_data_mapper(source_types[idx], item)
-            data_mappers[idx] = data_mapper
-            return data_mapper(item)
-
-        return data_mapper(item)
+def _resolve_converter(
+    source_type: int,
+    column: str,
+    item: Any,
+    converters: Optional[Converters],
+) -> Optional[Converter]:
+    if converters:
+        if column in converters:
+            return converters[column]
+        if source_type in converters:
+            return converters[source_type]
+    registered, converter = _lookup(source_type, item)
+    if registered:
+        return converter
+    return _get_data_mapper(source_type, item)
+
+
+def _to_chunk_converter(
+    converter: Optional[Converter],
+) -> Optional[Callable[[List[Any]], Sequence[Any]]]:
+    # returns a converter taking a chunk's column of values, or None if the values
+    # are left as they are
+    if converter is None or converter is _identity or converter is keep:
+        return None
+    if _is_vectorized(converter):
+        return converter
+
+    def convert(values: List[Any]) -> List[Any]:
+        return [None if x is None else converter(x) for x in values]
+
+    return convert
+
+
+def _iter_cleaned_chunks(
+    cursor: Cursor,
+    source_types: Tuple[int, ...],
+    stats: ExecutionStats,
+    converters: Optional[Converters] = None,
+    interned: Optional[Set[str]] = None,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Fetches the current result set from the cursor in chunks of FETCH_SIZE rows,
+    yielding each chunk once it has been decoded. Each column's converter is found
+    from its first non-null value, then applied to a whole column of the chunk.
+
+    If interned is given, the columns whose every chunk so far was interned by an
+    Interned converter are kept in it, for the exports to treat as categorical.
+    """
+    columns = tuple(x[0] for x in cursor.description or ())
+    chunk_converters: List[Optional[Callable[[List[Any]], Sequence[Any]]]] = [
+        None
+    ] * len(source_types)
+    unresolved = set(range(len(source_types)))
+    # columns with a chunk which was sampled & not interned
+    not_interned: Set[int] = set()
 
     try:
-        return [
-            tuple(clean_item(e, item) for e, item in enumerate(row)) for row in cursor
-        ]
+        while True:
+            fetch_start = perf_counter()
+            rows = cursor.fetchmany(FETCH_SIZE)
+            decode_start = perf_counter()
+            stats.fetch_time += decode_start - fetch_start
+            if not rows:
+                break
+            values: List[Any] = []
+            if unresolved:
+                values = list(zip(*rows))
+                for idx in list(unresolved):
+                    item = next((x for x in values[idx] if x is not None), None)
+                    if item is not None:
+                        chunk_converters[idx] = _to_chunk_converter(
+                            _resolve_converter(
+                                source_types[idx], columns[idx], item, converters
+                            )
+                        )
+                        unresolved.discard(idx)
+            chunk = rows
+            if any(chunk_converters):
+                values = values or list(zip(*rows))
+                for idx, convert in enumerate(chunk_converters):
+                    if isinstance(convert, Interned) and interned is not None:
+                        column = list(values[idx])
+                        converted = convert._intern(column)
+                        if converted is None:
+                            not_interned.add(idx)
+                            interned.discard(columns[idx])
+                        elif idx not in not_interned:
+                            interned.add(columns[idx])
+                        values[idx] = column if converted is None else converted
+                    elif convert is not None:
+                        values[idx] = convert(list(values[idx]))
+                        if len(values[idx]) != len(rows):
+                            raise ValueError(
+                                f"converter for column {columns[idx]!r} returned "
+                                f"{len(values[idx])} values for {len(rows)} rows"
+                            )
+                chunk = list(zip(*values))
+            stats.decode_time += perf_counter() - decode_start
+            stats.row_count += len(chunk)
+            yield chunk
     except MSSQLDatabaseException as err:
         raise OperationalError(err.args[0])
     except MSSQLDriverException as err:
         raise InterfaceError(err.args[0])
 
 
-def _get_result_set(cursor: Cursor) -> ResultSet:
+def _get_cleaned_data(
+    cursor: Cursor,
+    source_types: Tuple[int, ...],
+    stats: ExecutionStats,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
+    interned: Optional[Set[str]] = None,
+) -> Sequence[Tuple[Any, ...]]:
+    data: List[Tuple[Any, ...]] = []
+    spilled: Optional[SpilledRows] = None
+    data_size = 0
+    chunks = _iter_cleaned_chunks(cursor, source_types, stats, converters, interned)
+    for chunk in chunks:
+        if memory_budget is not None and spilled is None:
+            data_size += _estimate_rows_size(chunk)
+            if data_size > memory_budget:
+                logger.debug(
+                    f"result exceeded memory_budget of {memory_budget} bytes "
+                    f"after {len(data)} rows, spilling to disk"
+                )
+                spilled = SpilledRows(data)
+        if spilled is None:
+            data.extend(chunk)
+        else:
+            spilled._append(chunk)
+
+    if spilled is not None:
+        return spilled
+    return data
+
+
+def _get_result_set(
+    cursor: Cursor,
+    stats: ExecutionStats,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
+    interned: Optional[Set[str]] = None,
+) -> ResultSet:
     columns = tuple(x[0] for x in cursor.description)
     source_types = tuple(x[1] for x in cursor.description)
-    data = _get_cleaned_data(cursor, source_types)
+    data = _get_cleaned_data(
+        cursor, source_types, stats, memory_budget, converters, interned
+    )
+    stats.set_count += 1
     return data, columns, source_types
 
 
-def _get_result_sets(cursor: Cursor) -> Tuple[ResultSet, ...]:
+def _get_result_sets(
+    cursor: Cursor,
+    stats: ExecutionStats,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
+    interned: Optional[List[Set[str]]] = None,
+) -> Tuple[ResultSet, ...]:
+    # if interned is given, a set of each result set's interned columns is appended
     if cursor.description is None:
         return tuple()
 
-    result_sets = [_get_result_set(cursor)]
-    while cursor.nextset():
-        result_sets.append(_get_result_set(cursor))
+    result_sets = []
+    while True:
+        columns: Optional[Set[str]] = None
+        if interned is not None:
+            columns = set()
+            interned.append(columns)
+        result_sets.append(
+            _get_result_set(cursor, stats, memory_budget, converters, columns)
+        )
+        if not cursor.nextset():
+            break
 
     return tuple(result_sets)
 
@@ -139,11 +305,19 @@ class DatabaseResult:
     fetch: bool
     commit: bool
     error: Optional[sql.Error]
+    stats: ExecutionStats
+    server_stats: Optional[ServerStatistics]
     _columns: Optional[Tuple[str, ...]]
     _source_types: Optional[Tuple[int, ...]]
-    _data: Optional[List[Tuple[SQLParameter, ...]]]
-    _result_sets: Optional[Tuple[ResultSet, ...]]
+    _data: Optional[Sequence[Tuple[SQLParameter, ...]]]
+    _result_sets: Optional[List[ResultSet]]
     _current_result_set_index: int
+    _cursor: Optional[Cursor]
+    _resources: Optional[ExitStack]
+    _memory_budget: Optional[int]
+    _converters: Optional[Converters]
+    _interned: List[Set[str]]
+    _indexes: Dict[Tuple[Tuple[str, ...], bool], ResultIndex]
 
     def __init__(
         self,
@@ -152,20 +326,44 @@ class DatabaseResult:
         commit: bool,
         cursor: sql.Cursor = None,
         error: sql.Error = None,
+        stats: Optional[ExecutionStats] = None,
+        server_stats: Optional[ServerStatistics] = None,
+        lazy_sets: bool = False,
+        memory_budget: Optional[int] = None,
+        converters: Optional[Converters] = None,
     ):
         """
         This should not be initialised directly, instead it will be returned when
         calling the `execute` or `query` methods within the model.
+
+        If lazy_sets is True only the first result set is fetched, the cursor is kept
+        and subsequent sets are fetched by `next_set`.
+
+        If memory_budget is given, once a result set's decoded rows are estimated to
+        use more than this many bytes the remaining rows are spilled to a temporary
+        file, see SpilledRows.
+
+        converters override how values are converted, keyed by source type or column
+        name, see register_converter.
         """
         self.ok = ok
         self.fetch = fetch
         self.commit = commit
         self.error = error
+        self.stats = stats if stats is not None else ExecutionStats()
+        self.server_stats = server_stats
         self._columns = None
         self._source_types = None
         self._data = None
         self._result_sets = None
         self._current_result_set_index = 0
+        self._cursor = None
+        self._resources = None
+        self._memory_budget = memory_budget
+        self._converters = converters
+        # the interned columns of each result set
+        self._interned = []
+        self._indexes = {}
 
         if self.error:
             return
@@ -174,11 +372,111 @@ class DatabaseResult:
             if cursor is None:
                 raise ValueError("cursor must be passed to fetch data")
 
-            self._result_sets = _get_result_sets(cursor)
+            if lazy_sets:
+                self._result_sets = []
+                if cursor.description is not None:
+                    self._interned.append(set())
+                    self._result_sets.append(
+                        _get_result_set(
+                            cursor,
+                            self.stats,
+                            memory_budget,
+                            converters,
+                            self._interned[-1],
+                        )
+                    )
+                    self._cursor = cursor
+            else:
+                self._result_sets = list(
+                    _get_result_sets(
+                        cursor, self.stats, memory_budget, converters, self._interned
+                    )
+                )
 
             if self._result_sets:
                 self._set_result_set()
 
+    def __enter__(self) -> "DatabaseResult":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def __iter__(self) -> Iterator[Tuple[Any, ...]]:
+        """
+        Iterates over the current result set's rows as Tuples, reading spilled rows
+        back from disk one chunk at a time.
+        """
+        return iter(self.raw_data)
+
+    @overload
+    def __getitem__(self, idx: int) -> Tuple[Any, ...]: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> "DatabaseResult": ...
+
+    def __getitem__(
+        self, idx: Union[int, slice]
+    ) -> Union[Tuple[Any, ...], "DatabaseResult"]:
+        """
+        Returns a row of the current result set as a Tuple, or for a slice a new
+        DatabaseResult of the sliced rows which shares them rather than copying.
+        The slice's stats only count its rows, as it took no time to execute.
+        """
+        if isinstance(idx, slice):
+            rows = self.raw_data
+            if isinstance(rows, RowsView):
+                view = rows[idx]
+            else:
+                view = RowsView(rows, range(len(rows))[idx])
+            stats = ExecutionStats()
+            stats.row_count = len(view)
+            return self._derive(view, stats)
+        return self.raw_data[idx]
+
+    def head(self, n: int = 5) -> "DatabaseResult":
+        """
+        Returns a new DatabaseResult of the first n rows of the current result set,
+        sharing the rows rather than copying them.
+
+        :param n: int, the number of rows
+        :return: a DatabaseResult
+        """
+        return self[:n]
+
+    @classmethod
+    def concat(cls, results: Sequence["DatabaseResult"]) -> "DatabaseResult":
+        """
+        Returns a new DatabaseResult of the current result sets of the given results
+        one after another, e.g. of partitioned or paginated reads. The rows are shared
+        rather than copied and the stats are summed.
+
+        Raises a ValueError if the results' columns or source types differ.
+
+        :param results: the DatabaseResults to concatenate
+        :return: a DatabaseResult
+        """
+        if not results:
+            raise ValueError("at least one DatabaseResult must be given to concat")
+        first = results[0]
+        stats = ExecutionStats()
+        for result in results:
+            if (result.columns, result.source_types) != (
+                first.columns,
+                first.source_types,
+            ):
+                raise ValueError(
+                    "DatabaseResults must have the same columns and source types to "
+                    f"concat, got {result.columns} and {first.columns}"
+                )
+            for name, value in vars(result.stats).items():
+                setattr(stats, name, getattr(stats, name) + value)
+        result = first._derive(ChainedRows([x.raw_data for x in results]), stats)
+        result._interned = [
+            set.intersection(*(set(x._interned_columns()) for x in results))
+        ]
+        return result
+
     @property
     def source_types(self) -> Tuple[int, ...]:
         """
@@ -217,9 +515,10 @@ class DatabaseResult:
         self._raise_no_data_error()
 
     @property
-    def raw_data(self) -> List[Tuple[Any, ...]]:
+    def raw_data(self) -> Sequence[Tuple[Any, ...]]:
         """
-        Returns the current result set's data as a List of Tuples.
+        Returns the current result set's data as a List of Tuples, or as a
+        SpilledRows sequence of Tuples if the result set exceeded the memory_budget.
 
         Raises a ValueError if there is no data to return.
         """
@@ -231,23 +530,29 @@ class DatabaseResult:
     def set_count(self) -> int:
         """
         Returns the count of current result sets returned by the execution.
+        If the result was created with lazy_sets=True this fetches all the remaining
+        result sets.
 
         Raises a ValueError if there are no result sets.
         """
         if self._result_sets is not None:
+            while self._fetch_next_set():
+                pass
             return len(self._result_sets)
         self._raise_no_data_error()
 
     def next_set(self) -> bool:
         """
         Sets the DatabaseResult class to use the next result set that
-        the execution returned.
+        the execution returned. If the result was created with lazy_sets=True the
+        next set is fetched from the server the first time it is requested.
 
         Returns False if there are no more sets in this direction, otherwise True.
         """
         if self._result_sets is not None:
             if self._current_result_set_index == len(self._result_sets) - 1:
-                return False
+                if not self._fetch_next_set():
+                    return False
             self._current_result_set_index += 1
             self._set_result_set()
             return True
@@ -268,6 +573,37 @@ class DatabaseResult:
             return True
         self._raise_no_data_error()
 
+    def index_by(self, *columns: str, unique: bool = True) -> ResultIndex:
+        """
+        Returns a hash index over the current result set's rows keyed by the given
+        columns, for repeated lookups by key via its `get` and `get_all` methods.
+        The index is built on the first call and cached until the current result set
+        changes.
+
+        :param columns: the column/s making up the key, keys of multiple columns are
+                        tuples of their values
+        :param unique: if True raises a ValueError if a key is duplicated
+        :return: a ResultIndex
+        """
+        key = (columns, unique)
+        index = self._indexes.get(key)
+        if index is None:
+            index = ResultIndex(self.columns, self.raw_data, columns, unique)
+            self._indexes[key] = index
+        return index
+
+    def close(self) -> None:
+        """
+        Releases the cursor and connection held open by a result created with
+        lazy_sets=True, any result sets which have not been fetched are discarded.
+        This happens automatically once the last result set has been fetched, and
+        does nothing for other results.
+        """
+        self._cursor = None
+        if self._resources is not None:
+            resources, self._resources = self._resources, None
+            resources.close()
+
     def write_error_to_logger(self, name: str = "unknown") -> None:
         """
         Writes the error to logger.
@@ -323,7 +659,69 @@ class DatabaseResult:
         if "data" in kwargs:
             raise ValueError("You cannot pass your own data via the kwargs.")
 
-        return DataFrame(data=self.data, **kwargs)
+        df = DataFrame(data=self.data, **kwargs)
+        for column in self._interned_columns():
+            if column in df:
+                df[column] = df[column].astype("category")
+        return df
+
+    def _interned_columns(self) -> List[str]:
+        # the current result set's columns whose values were all interned
+        idx = self._current_result_set_index
+        if self._columns is None or idx >= len(self._interned):
+            return []
+        return [x for x in self._columns if x in self._interned[idx]]
+
+    def to_polars(self) -> Any:
+        """
+        Returns the current result set as a Polars DataFrame, built from one typed
+        Series per column rather than from the rows as dictionaries. Each column's
+        dtype comes from its values, or from its source type if it is entirely NULL.
+
+        :return: a polars DataFrame
+        """
+        return build_polars_frame(
+            self.columns, self.source_types, self.raw_data, self._interned_columns()
+        )
+
+    def iter_polars(self, chunk_size: int = WRITE_CHUNK_SIZE) -> Iterator[Any]:
+        """
+        Yields the current result set as Polars DataFrames of up to chunk_size
+        rows, all with the same dtypes. The rows have already been fetched &
+        decoded, so this only limits how many are converted at once, combined with
+        memory_budget it is a workaround for results too large to hold as a single
+        frame. Use query_to_polars to build the frames as the rows are fetched.
+
+        :params chunk_size: int, the maximum number of rows in each frame
+        :return: an iterator of polars DataFrames
+        """
+        return iter_polars_frames(
+            self.columns,
+            self.source_types,
+            _iter_chunks(self.raw_data, chunk_size),
+            self._interned_columns(),
+        )
+
+    def to_numpy(self, structured: bool = False) -> Any:
+        """
+        Returns the current result set as a dictionary of column name to numpy
+        array, or as a single structured array if structured is True. The arrays
+        are filled a chunk of rows at a time.
+
+        Each column's dtype comes from its first non-null value: int64, float64, bool,
+        datetime64[us] (timezone aware values are converted to UTC), datetime64[D]
+        for dates, fixed-width str (U) or bytes (S, note numpy strips trailing null
+        bytes) and object otherwise. Columns which are entirely NULL fall back to a
+        dtype from their source type. Columns containing NULLs are masked arrays, if
+        structured is True a masked structured array is returned if any are NULL.
+
+        :params structured: bool, if True returns a structured array
+        :return: Union[Dict[str, numpy.ndarray], numpy.ndarray]
+        """
+        columns = build_numpy_columns(
+            self.columns, self.source_types, _iter_chunks(self.raw_data)
+        )
+        return build_numpy_structured(columns) if structured else columns
 
     def to_json(
         self, as_bytes: bool = False, with_columns: bool = False
@@ -343,6 +741,8 @@ class DatabaseResult:
             raise ImportError("ORJSON must be installed to use this method") from err
 
         data_ = self.data if with_columns else self.raw_data
+        if not isinstance(data_, list):
+            data_ = list(data_)
         json_ = dumps(data_)
 
         if as_bytes:
@@ -350,6 +750,150 @@ class DatabaseResult:
 
         return json_.decode("UTF-8")
 
+    def write_json(
+        self, fileobj: IO[bytes], ndjson: bool = False, with_columns: bool = False
+    ) -> None:
+        """
+        Writes the current result set to a binary file-like object as JSON, in
+        chunks, so that the whole serialized output is never held in memory.
+        Decimals are written as strings.
+        :params fileobj: a binary file-like object, e.g. open(path, "wb")
+        :params ndjson: bool, if True writes newline delimited JSON (one row per line)
+                        instead of a JSON array
+        :params with_columns: bool, if True writes rows as objects keyed by column
+                              name, otherwise as arrays
+        """
+        write_json(
+            fileobj, self.columns, _iter_chunks(self.raw_data), ndjson, with_columns
+        )
+
+    def to_csv(
+        self,
+        fileobj: Optional[IO[bytes]] = None,
+        delimiter: str = ",",
+        header: bool = True,
+        gzip: bool = False,
+    ) -> Optional[str]:
+        """
+        Writes the current result set as CSV to a binary file-like object in chunks,
+        or returns it as a string if no fileobj is given. Datetimes are written in
+        ISO 8601 format, bytes as hex and None as an empty field.
+        :params fileobj: a binary file-like object, e.g. open(path, "wb")
+        :params delimiter: str, the field delimiter, e.g. "\\t" for TSV
+        :params header: bool, if True the first line is the column names
+        :params gzip: bool, if True the output is gzip compressed, requires fileobj
+        :return: Optional[str]
+        """
+        if fileobj is None:
+            if gzip:
+                raise ValueError("fileobj must be given to write gzip output")
+            buffer = io.BytesIO()
+            write_csv(
+                buffer, self.columns, _iter_chunks(self.raw_data), delimiter, header
+            )
+            return buffer.getvalue().decode("UTF-8")
+        write_csv(
+            fileobj, self.columns, _iter_chunks(self.raw_data), delimiter, header, gzip
+        )
+        return None
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializes the result, i.e. all of its result sets along with their columns
+        and source types, into a compact typed columnar binary format which is much
+        smaller & faster than pickling the result. Use `from_bytes` to load it.
+
+        Columns of a single type are stored as typed arrays (strings and bytes as
+        a blob with offsets), other columns are pickled so only load data you trust.
+
+        :return: bytes
+        """
+        return b"".join(self._encode())
+
+    @classmethod
+    def from_bytes(cls, data: Buffer) -> "DatabaseResult":
+        """
+        Loads a result serialized by `to_bytes`. This does not copy data, the rows
+        are decoded from it as they are accessed, so data must not be modified
+        whilst the result is in use.
+
+        :param data: the serialized result, e.g. bytes or a memoryview
+        :return: a DatabaseResult
+        """
+        result_sets, meta = decode_result_sets(data)
+        return cls._from_result_sets(result_sets, **meta)
+
+    def to_shared_memory(self, name: Optional[str] = None) -> "SharedMemory":
+        """
+        Publishes the result, serialized as per `to_bytes`, into a new
+        `multiprocessing.shared_memory` block so that other processes can attach to
+        it with `from_shared_memory` without copying it. Requires Python 3.8+.
+
+        The caller owns the block: keep it whilst other processes may attach, then
+        call its `close` and `unlink` methods to free it.
+
+        :param name: optionally the name of the block, by default a unique name is
+                     generated, pass `block.name` to the other processes
+        :return: a SharedMemory instance
+        """
+        return write_to_shared_memory(self._encode(), name)  # type: ignore
+
+    @classmethod
+    def from_shared_memory(cls, name: str) -> "DatabaseResult":
+        """
+        Attaches read-only to a result published with `to_shared_memory`, rows are
+        decoded from the shared memory as they are accessed rather than copied.
+        The block stays mapped until the returned result (and any rows taken from
+        it) are garbage collected, and is never unlinked by this process.
+
+        :param name: the name of the SharedMemory block
+        :return: a DatabaseResult
+        """
+        return cls.from_bytes(attach_shared_memory(name))
+
+    @classmethod
+    def _from_result_sets(
+        cls,
+        result_sets: List[ResultSet],
+        ok: bool = True,
+        fetch: bool = True,
+        commit: bool = False,
+    ) -> "DatabaseResult":
+        """
+        Creates a DatabaseResult from already decoded result sets.
+        """
+        result = cls(ok=ok, fetch=False, commit=commit)
+        result.fetch = fetch
+        if fetch:
+            result._result_sets = result_sets
+            if result_sets:
+                result._set_result_set()
+        return result
+
+    def _derive(
+        self, rows: Sequence[Tuple[Any, ...]], stats: ExecutionStats
+    ) -> "DatabaseResult":
+        # a result of the given rows with the current result set's columns
+        result = self._from_result_sets(
+            [(rows, self.columns, self.source_types)], commit=self.commit
+        )
+        result.stats = stats
+        result._converters = self._converters
+        result._interned = [set(self._interned_columns())]
+        return result
+
+    def _encode(self) -> List[bytes]:
+        if not self.ok:
+            raise ValueError("This DatabaseResult was not successful")
+        result_sets: List[ResultSet] = []
+        if self._result_sets is not None:
+            while self._fetch_next_set():
+                pass
+            result_sets = self._result_sets
+        return encode_result_sets(
+            result_sets, ok=self.ok, fetch=self.fetch, commit=self.commit
+        )
+
     def _raise_no_data_error(self) -> NoReturn:
         if not self.fetch:
             raise ValueError(
@@ -362,6 +906,44 @@ class DatabaseResult:
             )
         raise ValueError("This DatabaseResult returned no data.")
 
+    def _hold_open(self, *resources: ExitStack) -> None:
+        """
+        Takes ownership of the given resources (i.e. the connection and cursor) if
+        there may be further result sets to fetch, otherwise closes them.
+        """
+        held = ExitStack()
+        for resource in resources:
+            held.push(resource)
+        self._resources = held
+        if self._cursor is None:
+            self.close()
+
+    def _fetch_next_set(self) -> bool:
+        """
+        Fetches the next result set from the held cursor, returns False and closes the
+        result if there are no more result sets.
+        """
+        if self._cursor is None or self._result_sets is None:
+            return False
+        try:
+            if self._cursor.nextset():
+                self._interned.append(set())
+                self._result_sets.append(
+                    _get_result_set(
+                        self._cursor,
+                        self.stats,
+                        self._memory_budget,
+                        self._converters,
+                        self._interned[-1],
+                    )
+                )
+                return True
+        except BaseException:
+            self.close()
+            raise
+        self.close()
+        return False
+
     def _set_result_set(self) -> None:
         """
         Decomposes the current result set and assigns the values to the relevant
@@ -371,5 +953,6 @@ class DatabaseResult:
             self._columns = self._result_sets[self._current_result_set_index][1]
             self._source_types = self._result_sets[self._current_result_set_index][2]
             self._data = self._result_sets[self._current_result_set_index][0]
+            self._indexes = {}
         else:
             self._raise_no_data_error()
@@ -0,0 +1,331 @@
+import pickle
+from pathlib import Path
+from threading import Lock
+from time import sleep
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+import pymssql as sql
+from pymssql import Connection, OperationalError
+
+from pymssqlutils.querystats import fingerprint
+
+Driver = Callable[..., Connection]
+Description = Tuple[Tuple[Any, ...], ...]
+RecordedSet = Tuple[Optional[Description], List[Tuple[Any, ...]]]
+
+CAPTURE_FORMAT_VERSION = 1
+
+
+class _DriverSettings:
+    driver: Optional[Driver]
+
+    def __init__(self) -> None:
+        self.driver = None
+
+
+_driver_settings = _DriverSettings()
+
+
+def set_driver(driver: Optional[Driver]) -> None:
+    """
+    Replaces the function used to open connections, this is `pymssql.connect` by
+    default. The driver is called with the connection kwargs and must return an
+    object which behaves like a pymssql Connection. Pass None to restore the default.
+
+    :param driver: e.g. a ReplayDriver or RecordingDriver instance
+    """
+    _driver_settings.driver = driver
+
+
+def get_driver() -> Driver:
+    """
+    Returns the function currently used to open connections.
+    """
+    if _driver_settings.driver is not None:
+        return _driver_settings.driver
+    return sql.connect
+
+
+def _connect(**kwargs: Any) -> Connection:
+    # pymssql.connect is looked up on each call so that it can be patched
+    if _driver_settings.driver is not None:
+        return _driver_settings.driver(**kwargs)
+    return sql.connect(**kwargs)
+
+
+def _load_capture(path: Union[str, Path]) -> Dict[str, List[RecordedSet]]:
+    with open(path, "rb") as file:
+        capture = pickle.load(file)
+    if capture.get("version") != CAPTURE_FORMAT_VERSION:
+        raise ValueError(f"{path} is not a supported capture file")
+    return capture["recordings"]  # type: ignore
+
+
+class _ReplayMSSQLConnection:
+    """Stands in for the low level pymssql._mssql connection."""
+
+    tds_version_tuple = (7, 4)
+
+    def set_msghandler(self, handler: Optional[Callable[..., Any]]) -> None:
+        pass
+
+
+class _ReplayCursor:
+    def __init__(self, driver: "ReplayDriver"):
+        self._driver = driver
+        self._sets: List[RecordedSet] = []
+        self._set_idx = 0
+        self._row_idx = 0
+
+    def __enter__(self) -> "_ReplayCursor":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def execute(self, operation: str, params: Any = None) -> None:
+        if params is not None:
+            raise ValueError("ReplayDriver expects pre-substituted operations")
+        self._driver._wait(self._driver.latency)
+        self._sets = self._driver._lookup(operation)
+        self._set_idx = 0
+        self._row_idx = 0
+
+    @property
+    def description(self) -> Optional[Description]:
+        if self._set_idx < len(self._sets):
+            return self._sets[self._set_idx][0]
+        return None
+
+    @property
+    def rowcount(self) -> int:
+        if self._set_idx < len(self._sets):
+            return len(self._sets[self._set_idx][1])
+        return -1
+
+    def fetchmany(self, size: int = 1) -> List[Tuple[Any, ...]]:
+        if self._set_idx >= len(self._sets):
+            return []
+        rows = self._sets[self._set_idx][1][self._row_idx : self._row_idx + size]
+        self._row_idx += len(rows)
+        if self._driver.rows_per_second:
+            self._driver._wait(len(rows) / self._driver.rows_per_second)
+        return rows
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        if self._set_idx >= len(self._sets):
+            return []
+        return self.fetchmany(len(self._sets[self._set_idx][1]) - self._row_idx)
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def __iter__(self) -> "_ReplayCursor":
+        return self
+
+    def __next__(self) -> Tuple[Any, ...]:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def nextset(self) -> Optional[bool]:
+        if self._set_idx + 1 < len(self._sets):
+            self._set_idx += 1
+            self._row_idx = 0
+            return True
+        self._set_idx = len(self._sets)
+        return None
+
+    def close(self) -> None:
+        self._sets = []
+
+
+class _ReplayConnection:
+    def __init__(self, driver: "ReplayDriver"):
+        self._driver = driver
+        self._conn = _ReplayMSSQLConnection()
+
+    def cursor(self, *args: Any, **kwargs: Any) -> _ReplayCursor:
+        return _ReplayCursor(self._driver)
+
+    def commit(self) -> None:
+        pass
+
+    def rollback(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayDriver:
+    """
+    A driver which serves previously recorded results instead of connecting to a
+    server, for benchmarking and load testing the full `query`/`execute` path offline.
+    Use with `set_driver`.
+
+    Executed statements are matched against the recordings by their exact text,
+    falling back to their fingerprint (see `fingerprint`) so that statements which
+    only differ by parameter values replay the same results. Statements with no
+    matching recording raise a pymssql OperationalError unless `default` is given.
+
+    :param recordings: a capture file written by RecordingDriver.save, or a
+                       mapping of statement to a list of (description, rows) tuples
+    :param connect_latency: seconds to sleep when opening each connection
+    :param latency: seconds to sleep on each execute, simulating the server round trip
+    :param rows_per_second: if given, fetching sleeps to simulate this throughput
+    :param default: result sets to return for statements with no recording
+    """
+
+    def __init__(
+        self,
+        recordings: Union[str, Path, Dict[str, List[RecordedSet]]],
+        connect_latency: float = 0.0,
+        latency: float = 0.0,
+        rows_per_second: Optional[float] = None,
+        default: Optional[List[RecordedSet]] = None,
+    ):
+        if isinstance(recordings, (str, Path)):
+            recordings = _load_capture(recordings)
+        self.recordings = recordings
+        self.connect_latency = connect_latency
+        self.latency = latency
+        self.rows_per_second = rows_per_second
+        self.default = default
+        self._by_fingerprint = {
+            fingerprint(statement): sets for statement, sets in recordings.items()
+        }
+
+    def __call__(self, **kwargs: Any) -> Connection:
+        self._wait(self.connect_latency)
+        return _ReplayConnection(self)  # type: ignore
+
+    def _lookup(self, statement: str) -> List[RecordedSet]:
+        sets = self.recordings.get(statement)
+        if sets is None:
+            sets = self._by_fingerprint.get(fingerprint(statement))
+        if sets is None:
+            sets = self.default
+        if sets is None:
+            raise OperationalError(f"ReplayDriver has no recording for: {statement}")
+        return sets
+
+    @staticmethod
+    def _wait(seconds: float) -> None:
+        if seconds > 0:
+            sleep(seconds)
+
+
+class _RecordingCursor:
+    def __init__(self, cursor: Any, driver: "RecordingDriver"):
+        self._cursor = cursor
+        self._driver = driver
+        self._sets: Optional[List[RecordedSet]] = None
+
+    def __enter__(self) -> "_RecordingCursor":
+        self._cursor.__enter__()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._cursor.__exit__(*args)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._cursor, name)
+
+    def execute(self, operation: str, params: Any = None) -> None:
+        self._cursor.execute(operation, params)
+        if params is not None:
+            operation = sql._mssql.substitute_params(operation, params).decode("UTF-8")
+        self._sets = [(self._cursor.description, [])]
+        self._driver._record(operation, self._sets)
+
+    def _current_rows(self) -> List[Tuple[Any, ...]]:
+        return self._sets[-1][1] if self._sets else []
+
+    def fetchmany(self, size: int = 1) -> List[Tuple[Any, ...]]:
+        rows = self._cursor.fetchmany(size)
+        self._current_rows().extend(rows)
+        return rows  # type: ignore
+
+    def fetchall(self) -> List[Tuple[Any, ...]]:
+        rows = self._cursor.fetchall()
+        self._current_rows().extend(rows)
+        return rows  # type: ignore
+
+    def fetchone(self) -> Optional[Tuple[Any, ...]]:
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._current_rows().append(row)
+        return row  # type: ignore
+
+    def __iter__(self) -> "_RecordingCursor":
+        return self
+
+    def __next__(self) -> Tuple[Any, ...]:
+        row = self.fetchone()
+        if row is None:
+            raise StopIteration
+        return row
+
+    def nextset(self) -> Optional[bool]:
+        has_next = self._cursor.nextset()
+        if has_next and self._sets is not None:
+            self._sets.append((self._cursor.description, []))
+        return has_next  # type: ignore
+
+    def close(self) -> None:
+        self._cursor.close()
+
+
+class _RecordingConnection:
+    def __init__(self, connection: Connection, driver: "RecordingDriver"):
+        self._connection = connection
+        self._driver = driver
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._connection, name)
+
+    def cursor(self, *args: Any, **kwargs: Any) -> _RecordingCursor:
+        return _RecordingCursor(self._connection.cursor(*args, **kwargs), self._driver)
+
+
+class RecordingDriver:
+    """
+    A driver which wraps another driver (`pymssql.connect` by default) and records
+    each executed statement along with the result sets that were fetched from it.
+    Call `save` to write a capture file which ReplayDriver can serve.
+
+    Only rows which are actually fetched are recorded, so use `query` or
+    `execute(..., fetch=True)` for statements whose results you want to replay.
+
+    Capture files are pickles: only replay files that you recorded yourself.
+
+    :param driver: the driver to record, defaults to `pymssql.connect`
+    """
+
+    def __init__(self, driver: Optional[Driver] = None):
+        self.driver = driver
+        self.recordings: Dict[str, List[RecordedSet]] = {}
+        self._lock = Lock()
+
+    def __call__(self, **kwargs: Any) -> Connection:
+        connection = (self.driver or sql.connect)(**kwargs)
+        return _RecordingConnection(connection, self)  # type: ignore
+
+    def _record(self, statement: str, sets: List[RecordedSet]) -> None:
+        with self._lock:
+            self.recordings[statement] = sets
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Writes the recordings to a capture file.
+        """
+        with self._lock:
+            capture = {
+                "version": CAPTURE_FORMAT_VERSION,
+                "recordings": self.recordings,
+            }
+            with open(path, "wb") as file:
+                pickle.dump(capture, file, protocol=pickle.HIGHEST_PROTOCOL)
@@ -0,0 +1,605 @@
+import csv
+import io
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from gzip import GzipFile
+from itertools import chain, islice
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+Row = Tuple[Any, ...]
+
+# rows are written to the file in chunks of this size
+WRITE_CHUNK_SIZE = 5000
+
+
+def _iter_chunks(
+    rows: Iterable[Row], size: int = WRITE_CHUNK_SIZE
+) -> Iterator[List[Row]]:
+    iterator = iter(rows)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        # serialized as a string so that no precision is lost
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def write_json(
+    fileobj: IO[bytes],
+    columns: Sequence[str],
+    chunks: Iterable[List[Row]],
+    ndjson: bool = False,
+    with_columns: bool = False,
+) -> int:
+    """
+    Writes chunks of rows to a binary file-like object as a JSON array, or as
+    newline delimited JSON (one row per line), serializing each chunk with a single
+    orjson call. Returns the number of rows written.
+    """
+    try:
+        from orjson import OPT_APPEND_NEWLINE, dumps
+    except ImportError as err:
+        raise ImportError("ORJSON must be installed to use this method") from err
+
+    row_count = 0
+    if not ndjson:
+        fileobj.write(b"[")
+    for chunk in chunks:
+        if not chunk:
+            continue
+        data: List[Any] = chunk
+        if with_columns:
+            data = [dict(zip(columns, row)) for row in chunk]
+        if ndjson:
+            fileobj.write(
+                b"".join(
+                    dumps(row, default=_json_default, option=OPT_APPEND_NEWLINE)
+                    for row in data
+                )
+            )
+        else:
+            if row_count:
+                fileobj.write(b",")
+            # strip the chunk's own array brackets
+            fileobj.write(dumps(data, default=_json_default)[1:-1])
+        row_count += len(chunk)
+    if not ndjson:
+        fileobj.write(b"]")
+    return row_count
+
+
+def _csv_formatter(value: Any) -> Optional[Callable[[Any], Any]]:
+    # the csv module writes str(value), which only needs changing for these types
+    if isinstance(value, (datetime, date, time)):
+        return type(value).isoformat
+    if isinstance(value, bytes):
+        return bytes.hex
+    return None
+
+
+def write_csv(
+    fileobj: IO[bytes],
+    columns: Sequence[str],
+    chunks: Iterable[List[Row]],
+    delimiter: str = ",",
+    header: bool = True,
+    gzip: bool = False,
+    encoding: str = "UTF-8",
+) -> int:
+    """
+    Writes chunks of rows to a binary file-like object as CSV, optionally gzip
+    compressed. Datetimes, dates and times are written in ISO 8601 format, bytes as
+    hex and None as an empty field. Returns the number of rows written.
+    """
+    target: IO[bytes] = fileobj
+    if gzip:
+        target = GzipFile(fileobj=fileobj, mode="wb")  # type: ignore
+    text = io.TextIOWrapper(target, encoding=encoding, newline="")
+    try:
+        writer = csv.writer(text, delimiter=delimiter)
+
+        if header:
+            writer.writerow(columns)
+
+        # the formatter for each column is found from its first non-null value
+        formatters: List[Optional[Callable[[Any], Any]]] = [None] * len(columns)
+        unresolved = set(range(len(columns)))
+        row_count = 0
+        for chunk in chunks:
+            if unresolved:
+                for idx in list(unresolved):
+                    for row in chunk:
+                        if row[idx] is not None:
+                            formatters[idx] = _csv_formatter(row[idx])
+                            unresolved.discard(idx)
+                            break
+            formatted = [(idx, x) for idx, x in enumerate(formatters) if x is not None]
+            if formatted:
+                rows: List[Any] = []
+                for row in chunk:
+                    row_ = list(row)
+                    for idx, formatter in formatted:
+                        if row_[idx] is not None:
+                            row_[idx] = formatter(row_[idx])
+                    rows.append(row_)
+                writer.writerows(rows)
+            else:
+                writer.writerows(chunk)
+            row_count += len(chunk)
+    finally:
+        # flush & detach even if a chunk raised, so that the caller's file object
+        # isn't closed when the wrapper is garbage collected, & the gzip trailer
+        # is written
+        text.flush()
+        text.detach()
+        if gzip:
+            target.close()
+    return row_count
+
+
+# the parquet type of a column which is NULL throughout the deferred row groups,
+# BINARY also covers DATE, TIME, DATETIME2 & DATETIMEOFFSET so it can't be guessed
+_PARQUET_SOURCE_TYPES = {
+    1: "string",
+    2: "null",
+    3: "float64",
+    4: "timestamp",
+    5: "float64",
+}
+
+
+def _parquet_source_type(pa: Any, source_type: int) -> Any:
+    name = _PARQUET_SOURCE_TYPES.get(source_type, "string")
+    return pa.timestamp("us") if name == "timestamp" else getattr(pa, name)()
+
+
+def _parquet_type(pa: Any, values: Sequence[Any]) -> Any:
+    """
+    Returns the pyarrow type of a column from its first non-null value, similar to
+    how the decoding probes the first value, or None if they are all NULL.
+    """
+    value = next((x for x in values if x is not None), None)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return pa.bool_()
+    if isinstance(value, int):
+        return pa.int64()
+    if isinstance(value, float):
+        return pa.float64()
+    if isinstance(value, str):
+        return pa.string()
+    if isinstance(value, bytes):
+        return pa.binary()
+    if isinstance(value, datetime):
+        # aware datetimes are stored as UTC instants, with the first value's offset
+        return pa.array([value]).type
+    if isinstance(value, date):
+        return pa.date32()
+    if isinstance(value, time):
+        return pa.time64("us")
+    if isinstance(value, Decimal):
+        scale = max(
+            (-x.as_tuple().exponent for x in values if x is not None and x.is_finite()),
+            default=0,
+        )
+        return pa.decimal128(38, max(scale, 0))
+    return pa.array([value]).type
+
+
+def write_parquet(
+    where: Union[str, Path, IO[bytes]],
+    columns: Sequence[str],
+    source_types: Sequence[int],
+    chunks: Iterable[List[Row]],
+    row_group_size: int = 100_000,
+    compression: str = "snappy",
+    dictionary: Collection[str] = (),
+    max_deferred_rows: int = 100_000,
+) -> int:
+    """
+    Writes chunks of rows to a Parquet file, one row group per row_group_size rows.
+    The schema is derived from each column's first non-null value. While a column
+    is NULL throughout, whole row groups are held back as long as that keeps at most
+    max_deferred_rows rows held, after which the column's type falls back to one
+    derived from its source type. So at most max_deferred_rows rows plus the row
+    group being built are held in memory. String & binary columns named in
+    dictionary when the schema is derived are written as dictionary arrays. Returns
+    the number of rows written. Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as err:
+        raise ImportError("PyArrow must be installed to use this method") from err
+
+    if row_group_size <= 0:
+        raise ValueError("row_group_size must be positive")
+    if max_deferred_rows < 0:
+        raise ValueError("max_deferred_rows cannot be negative")
+
+    writer: Any = None
+    schema: Any = None
+    types: List[Any] = [None for _ in columns]
+    deferred: List[List[Row]] = []
+    deferred_rows = 0
+    pending: List[Row] = []
+    row_count = 0
+
+    def open_writer() -> None:
+        nonlocal writer, schema
+        schema = pa.schema(
+            [
+                pa.field(
+                    name,
+                    (
+                        pa.dictionary(pa.int32(), type_)
+                        if name in dictionary
+                        and (pa.types.is_string(type_) or pa.types.is_binary(type_))
+                        else type_
+                    ),
+                )
+                for name, type_ in zip(columns, types)
+            ]
+        )
+        writer = pq.ParquetWriter(where, schema, compression=compression)
+
+    def write_table(rows: List[Row]) -> None:
+        values = list(zip(*rows)) if rows else [() for _ in columns]
+        arrays = []
+        for name, column, field in zip(columns, values, schema):
+            try:
+                arrays.append(pa.array(column, type=field.type))
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as err:
+                raise ValueError(
+                    f"the values of column {name!r} don't fit its parquet type "
+                    f"{field.type}, which was derived from its earlier values: {err}"
+                ) from err
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    def write_group(rows: List[Row], final: bool = False) -> None:
+        nonlocal deferred_rows
+        if schema is None:
+            if None in types:
+                values = list(zip(*rows)) if rows else [() for _ in columns]
+                for idx, column in enumerate(values):
+                    if types[idx] is None:
+                        types[idx] = _parquet_type(pa, column)
+            if (
+                None in types
+                and not final
+                and deferred_rows + len(rows) <= max_deferred_rows
+            ):
+                deferred.append(rows)
+                deferred_rows += len(rows)
+                return
+            if rows or not deferred:
+                deferred.append(rows)
+            for idx, source_type in enumerate(source_types):
+                if types[idx] is None:
+                    types[idx] = _parquet_source_type(pa, source_type)
+            open_writer()
+            for group in deferred:
+                write_table(group)
+            deferred.clear()
+            deferred_rows = 0
+        else:
+            write_table(rows)
+
+    try:
+        for chunk in chunks:
+            pending.extend(chunk)
+            while len(pending) >= row_group_size:
+                write_group(pending[:row_group_size])
+                row_count += row_group_size
+                del pending[:row_group_size]
+        if pending or schema is None:
+            write_group(pending, final=True)
+            row_count += len(pending)
+    finally:
+        if writer is not None:
+            writer.close()
+    return row_count
+
+
+# the numpy dtype of a column which is NULL throughout
+_NUMPY_SOURCE_TYPES = {
+    1: "U",
+    2: "O",
+    3: "float64",
+    4: "datetime64[us]",
+    5: "float64",
+}
+
+_NUMPY_FILL_VALUES: Dict[str, Any] = {
+    "bool": False,
+    "int64": 0,
+    "float64": 0.0,
+    "U": "",
+    "S": b"",
+}
+
+
+def _numpy_dtype(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int64"
+    if isinstance(value, float):
+        return "float64"
+    if isinstance(value, str):
+        return "U"
+    if isinstance(value, bytes):
+        return "S"
+    if isinstance(value, datetime):
+        return "datetime64[us]"
+    if isinstance(value, date):
+        return "datetime64[D]"
+    return "O"
+
+
+def _to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def build_numpy_columns(
+    columns: Sequence[str],
+    source_types: Sequence[int],
+    chunks: Iterable[List[Row]],
+) -> Dict[str, Any]:
+    """
+    Builds a numpy array per column from chunks of rows, converting one chunk at a
+    time. Each column's dtype is found from its first non-null value, or from its
+    source type if it is entirely NULL. Columns containing NULLs are returned as
+    masked arrays. Requires numpy.
+    """
+    try:
+        import numpy as np
+    except ImportError as err:
+        raise ImportError("NumPy must be installed to use this method") from err
+
+    dtypes: List[Optional[str]] = [None] * len(columns)
+    # each part is either an array or the number of leading NULLs, which are
+    # filled once the column's dtype is known
+    parts: List[List[Any]] = [[] for _ in columns]
+    masks: List[List[Any]] = [[] for _ in columns]
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        for idx, values in enumerate(zip(*chunk)):
+            mask = np.fromiter((x is None for x in values), bool, len(values))
+            if dtypes[idx] is None:
+                value = next((x for x in values if x is not None), None)
+                if value is None:
+                    parts[idx].append(len(values))
+                    masks[idx].append(mask)
+                    continue
+                dtypes[idx] = _numpy_dtype(value)
+            dtype = dtypes[idx]
+            if dtype == "datetime64[us]":
+                values = tuple(map(_to_naive_utc, values))
+            elif dtype in _NUMPY_FILL_VALUES and mask.any():
+                fill = _NUMPY_FILL_VALUES[dtype]
+                values = tuple(fill if x is None else x for x in values)
+            parts[idx].append(np.array(values, dtype=dtype))
+            masks[idx].append(mask)
+
+    result: Dict[str, Any] = {}
+    for idx, name in enumerate(columns):
+        dtype = dtypes[idx] or _NUMPY_SOURCE_TYPES.get(source_types[idx], "O")
+        arrays = [
+            (
+                np.full(x, _NUMPY_FILL_VALUES.get(dtype), dtype=dtype)
+                if isinstance(x, int)
+                else x
+            )
+            for x in parts[idx]
+        ]
+        array = np.concatenate(arrays) if arrays else np.array([], dtype=dtype)
+        mask = np.concatenate(masks[idx]) if masks[idx] else np.zeros(0, bool)
+        result[name] = np.ma.MaskedArray(array, mask=mask) if mask.any() else array
+    return result
+
+
+def build_numpy_structured(columns: Dict[str, Any]) -> Any:
+    """
+    Combines the arrays from build_numpy_columns into a single structured array,
+    which is masked if any of the columns are. Requires numpy.
+    """
+    import numpy as np
+
+    length = len(next(iter(columns.values()))) if columns else 0
+    array = np.empty(length, dtype=[(k, v.dtype) for k, v in columns.items()])
+    for name, column in columns.items():
+        array[name] = np.ma.getdata(column)
+    if not any(np.ma.is_masked(x) for x in columns.values()):
+        return array
+    mask = np.empty(length, dtype=[(k, bool) for k in columns])
+    for name, column in columns.items():
+        mask[name] = np.ma.getmaskarray(column)
+    return np.ma.MaskedArray(array, mask=mask)
+
+
+# the polars dtype of a column which is NULL throughout, BINARY also covers DATE,
+# TIME, DATETIME2 & DATETIMEOFFSET so it can't be guessed
+_POLARS_SOURCE_TYPES = {
+    1: "Utf8",
+    2: "Null",
+    3: "Float64",
+    4: "Datetime",
+    5: "Float64",
+}
+
+# the number of chunks held back by iter_polars_frames while a column is NULL
+# throughout, waiting for a non-null value to type it by
+POLARS_DEFERRED_CHUNKS = 10
+
+
+def _polars_dtype(pl: Any, values: Iterable[Any], source_type: int) -> Any:
+    """
+    Returns the polars dtype of a column from its first non-null value, or from its
+    source type. None is returned where polars should infer it, e.g. for Decimals.
+    """
+    value = next((x for x in values if x is not None), None)
+    if value is None:
+        name = _POLARS_SOURCE_TYPES.get(source_type, "Utf8")
+        return pl.Datetime("us") if name == "Datetime" else getattr(pl, name)
+    if isinstance(value, bool):
+        return pl.Boolean
+    if isinstance(value, int):
+        return pl.Int64
+    if isinstance(value, float):
+        return pl.Float64
+    if isinstance(value, str):
+        return pl.Utf8
+    if isinstance(value, bytes):
+        return pl.Binary
+    if isinstance(value, datetime):
+        # aware datetimes are stored as UTC instants
+        return pl.Datetime("us", "UTC" if value.tzinfo is not None else None)
+    if isinstance(value, date):
+        return pl.Date
+    if isinstance(value, time):
+        return pl.Time
+    return None
+
+
+def _polars_frame(
+    pl: Any,
+    columns: Sequence[str],
+    values: Sequence[Sequence[Any]],
+    dtypes: Sequence[Any],
+) -> Any:
+    series = []
+    for name, column, dtype in zip(columns, values, dtypes):
+        if dtype == pl.Null and any(x is not None for x in column):
+            # polars would silently replace the values with nulls
+            raise ValueError(
+                f"column {name!r} was NULL throughout the earlier rows, its dtype "
+                "couldn't be derived from its values"
+            )
+        if isinstance(dtype, pl.Datetime) and dtype.time_zone is not None:
+            series.append(
+                pl.Series(
+                    name, [_to_naive_utc(x) for x in column], dtype=pl.Datetime("us")
+                ).dt.replace_time_zone("UTC")
+            )
+        else:
+            series.append(pl.Series(name, column, dtype=dtype))
+    return pl.DataFrame(series)
+
+
+def _polars_dtypes(
+    pl: Any,
+    columns: Sequence[str],
+    source_types: Sequence[int],
+    values: Sequence[Iterable[Any]],
+    categorical: Collection[str],
+) -> List[Any]:
+    dtypes = []
+    for name, column, source_type in zip(columns, values, source_types):
+        dtype = _polars_dtype(pl, column, source_type)
+        dtypes.append(
+            pl.Categorical if name in categorical and dtype == pl.Utf8 else dtype
+        )
+    return dtypes
+
+
+def _import_polars() -> Any:
+    try:
+        import polars as pl
+    except ImportError as err:
+        raise ImportError("Polars must be installed to use this method") from err
+    return pl
+
+
+def build_polars_frame(
+    columns: Sequence[str],
+    source_types: Sequence[int],
+    rows: Iterable[Row],
+    categorical: Collection[str] = (),
+) -> Any:
+    """
+    Builds a polars DataFrame from rows, converting them to one typed Series per
+    column. Each column's dtype is found from its first non-null value, or from its
+    source type if it is entirely NULL. String columns named in categorical are
+    Categorical. Requires polars.
+    """
+    pl = _import_polars()
+    values = list(zip(*rows)) or [() for _ in columns]
+    dtypes = _polars_dtypes(pl, columns, source_types, values, categorical)
+    return _polars_frame(pl, columns, values, dtypes)
+
+
+def iter_polars_frames(
+    columns: Sequence[str],
+    source_types: Sequence[int],
+    chunks: Iterable[List[Row]],
+    categorical: Collection[str] = (),
+) -> Iterator[Any]:
+    """
+    Yields a polars DataFrame per chunk of rows, every frame having the same dtypes
+    so that they can be concatenated. Each column's dtype is found from its first
+    non-null value. While a column is NULL throughout, the chunks are held back (up
+    to POLARS_DEFERRED_CHUNKS of them) before the column's dtype falls back to one
+    derived from its source type. String columns named in categorical are
+    Categorical. Requires polars.
+    """
+    pl = _import_polars()
+    dtypes: Optional[List[Any]] = None
+    resolved = [False for _ in columns]
+    held: List[List[Tuple[Any, ...]]] = []
+
+    def release() -> Iterator[Any]:
+        nonlocal dtypes
+        if dtypes is None:
+            dtypes = _polars_dtypes(
+                pl,
+                columns,
+                source_types,
+                [chain.from_iterable(x) for x in zip(*held)],
+                categorical,
+            )
+        for values in held:
+            frame = _polars_frame(pl, columns, values, dtypes)
+            # fix inferred dtypes, e.g. a Decimal's scale, to the first frame's
+            dtypes = frame.dtypes
+            yield frame
+        held.clear()
+
+    for chunk in chunks:
+        if not chunk:
+            continue
+        values = list(zip(*chunk))
+        held.append(values)
+        if dtypes is None:
+            for idx, column in enumerate(values):
+                resolved[idx] = resolved[idx] or any(x is not None for x in column)
+            if not all(resolved) and len(held) < POLARS_DEFERRED_CHUNKS:
+                continue
+        yield from release()
+    if held:
+        yield from release()
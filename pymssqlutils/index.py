@@ -0,0 +1,118 @@
+from operator import itemgetter
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+Row = Tuple[Any, ...]
+
+
+class ResultIndex:
+    """
+    A hash index over the rows of a result set, keyed by one or more columns. Keys
+    of a single column are the column's value, keys of multiple columns are tuples of
+    their values. This is returned by DatabaseResult.index_by.
+
+    The index holds the positions of the rows rather than copies of them, so it can
+    be shared for as long as the result set it was built from.
+    """
+
+    columns: Tuple[str, ...]
+    key_columns: Tuple[str, ...]
+    unique: bool
+    _rows: Sequence[Row]
+    _positions: Dict[Any, Union[int, List[int]]]
+
+    def __init__(
+        self,
+        columns: Sequence[str],
+        rows: Sequence[Row],
+        key_columns: Sequence[str],
+        unique: bool = True,
+    ):
+        """
+        :param columns: the result set's columns
+        :param rows: the result set's rows
+        :param key_columns: the columns making up the key
+        :param unique: if True raises a ValueError if a key is duplicated
+        """
+        if not key_columns:
+            raise ValueError("at least one column must be given to index by")
+        missing = [x for x in key_columns if x not in columns]
+        if missing:
+            raise ValueError(f"columns {missing} are not in the result set")
+
+        self.columns = tuple(columns)
+        self.key_columns = tuple(key_columns)
+        self.unique = unique
+        self._rows = rows
+
+        get_key = itemgetter(*(self.columns.index(x) for x in key_columns))
+        positions: Dict[Any, Any] = {}
+        if unique:
+            for position, row in enumerate(rows):
+                key = get_key(row)
+                if positions.setdefault(key, position) != position:
+                    raise ValueError(
+                        f"duplicate key {key!r} for {self.key_columns}, "
+                        "use unique=False to index duplicate keys"
+                    )
+        else:
+            for position, row in enumerate(rows):
+                key = get_key(row)
+                if key in positions:
+                    positions[key].append(position)
+                else:
+                    positions[key] = [position]
+        self._positions = positions
+
+    def __len__(self) -> int:
+        """
+        Returns the number of distinct keys.
+        """
+        return len(self._positions)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._positions
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._positions)
+
+    def __repr__(self) -> str:
+        return (
+            f"ResultIndex(key_columns={self.key_columns}, unique={self.unique}, "
+            f"keys={len(self)})"
+        )
+
+    def _view(self, row: Row, as_dict: bool) -> Any:
+        return dict(zip(self.columns, row)) if as_dict else row
+
+    def get(self, key: Any, default: Any = None, as_dict: bool = False) -> Any:
+        """
+        Returns the row with the given key, or default if there is none. If the
+        index is not unique the first row with the key is returned.
+
+        :param key: the key's value, or a tuple of values for multiple columns
+        :param default: returned if there is no row with the key
+        :param as_dict: if True returns the row as a dictionary keyed by column name
+        :return: the row as a tuple, unless as_dict is True
+        """
+        position = self._positions.get(key)
+        if position is None:
+            return default
+        if not self.unique:
+            position = position[0]  # type: ignore
+        return self._view(self._rows[position], as_dict)  # type: ignore
+
+    def get_all(self, key: Any, as_dict: bool = False) -> List[Any]:
+        """
+        Returns all the rows with the given key, in the order of the result set, or an
+        empty list if there are none.
+
+        :param key: the key's value, or a tuple of values for multiple columns
+        :param as_dict: if True returns the rows as dictionaries keyed by column name
+        :return: a list of rows as tuples, unless as_dict is True
+        """
+        positions: Optional[Any] = self._positions.get(key)
+        if positions is None:
+            return []
+        if self.unique:
+            positions = [positions]
+        return [self._view(self._rows[x], as_dict) for x in positions]
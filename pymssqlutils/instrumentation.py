@@ -0,0 +1,438 @@
+import logging
+import re
+from random import random
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutionStats:
+    """
+    Per-phase timings (in seconds) and counters collected while executing an
+    operation. Every DatabaseResult carries one of these under its `stats` attribute.
+
+    Phases:
+        * connect_time: opening the connection, this includes the login handshake as
+          pymssql performs both in a single call.
+        * build_time: parameter substitution and batch concatenation.
+        * execute_time: sending the operation/s and waiting for the server to return
+          the first result (or completion).
+        * fetch_time: pulling rows from the driver.
+        * decode_time: converting the driver values to their python types.
+    """
+
+    connect_time: float
+    build_time: float
+    execute_time: float
+    fetch_time: float
+    decode_time: float
+    statement_count: int
+    row_count: int
+    set_count: int
+
+    def __init__(self) -> None:
+        self.connect_time = 0.0
+        self.build_time = 0.0
+        self.execute_time = 0.0
+        self.fetch_time = 0.0
+        self.decode_time = 0.0
+        self.statement_count = 0
+        self.row_count = 0
+        self.set_count = 0
+
+    @property
+    def total_time(self) -> float:
+        """
+        Returns the sum of all the phase timings in seconds.
+        """
+        return (
+            self.connect_time
+            + self.build_time
+            + self.execute_time
+            + self.fetch_time
+            + self.decode_time
+        )
+
+    def as_dict(self) -> Dict[str, float]:
+        """
+        Returns the timings and counters as a Dictionary, useful for logging.
+        """
+        return {
+            "connect_time": self.connect_time,
+            "build_time": self.build_time,
+            "execute_time": self.execute_time,
+            "fetch_time": self.fetch_time,
+            "decode_time": self.decode_time,
+            "total_time": self.total_time,
+            "statement_count": self.statement_count,
+            "row_count": self.row_count,
+            "set_count": self.set_count,
+        }
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{key}={value:.6f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in self.as_dict().items()
+        )
+        return f"ExecutionStats({fields})"
+
+
+HOOK_EVENTS = (
+    "before_connect",
+    "after_connect",
+    "before_execute",
+    "after_execute",
+    "after_fetch",
+    "on_error",
+)
+
+Hook = Callable[["ExecutionEvent"], None]
+
+# hooks are looked up on the hot path, an empty list means the event is disabled
+_hooks: Dict[str, List[Hook]] = {event: [] for event in HOOK_EVENTS}
+_include_statement = True
+_statement_redactor: Optional[Callable[[str], str]] = None
+
+
+class ExecutionEvent:
+    """
+    Passed to every registered hook.
+
+    Attributes:
+        * event: the name of the event, one of HOOK_EVENTS.
+        * operation: the operation before parameter substitution, None for
+          connection events.
+        * statement: the operation after parameter substitution (and redaction),
+          None if statements are excluded via `configure_hooks`.
+        * server & database: the connection details of the execution.
+        * stats: the execution's ExecutionStats, cumulative up to this event.
+        * duration: the duration in seconds of the phase that just finished
+          (connect, execute or fetch & decode), 0 for `before_*` events.
+        * error: the raised exception for `on_error` events, else None.
+    """
+
+    event: str
+    operation: Optional[str]
+    statement: Optional[str]
+    server: Optional[str]
+    database: Optional[str]
+    stats: ExecutionStats
+    duration: float
+    error: Optional[BaseException]
+
+    def __init__(
+        self,
+        event: str,
+        operation: Optional[str],
+        statement: Optional[str],
+        server: Optional[str],
+        database: Optional[str],
+        stats: ExecutionStats,
+        duration: float = 0.0,
+        error: Optional[BaseException] = None,
+    ):
+        self.event = event
+        self.operation = operation
+        self.statement = statement
+        self.server = server
+        self.database = database
+        self.stats = stats
+        self.duration = duration
+        self.error = error
+
+    def __repr__(self) -> str:
+        return (
+            f"ExecutionEvent(event={self.event!r}, operation={self.operation!r}, "
+            f"server={self.server!r}, database={self.database!r}, "
+            f"duration={self.duration:.6f})"
+        )
+
+
+def register_hook(event: str, hook: Hook) -> None:
+    """
+    Registers a callable to be called with an ExecutionEvent whenever `event` occurs.
+    Hooks are called synchronously in registration order, any exception raised by a
+    hook is logged and otherwise ignored.
+
+    :param event: one of 'before_connect', 'after_connect', 'before_execute',
+                  'after_execute', 'after_fetch' or 'on_error'
+    :param hook: a callable accepting a single ExecutionEvent argument
+    """
+    if event not in _hooks:
+        raise ValueError(f"event must be one of {HOOK_EVENTS}, got '{event}'")
+    _hooks[event].append(hook)
+
+
+def unregister_hook(event: str, hook: Hook) -> None:
+    """
+    Removes a previously registered hook, raises a ValueError if it is not registered.
+    """
+    if event not in _hooks:
+        raise ValueError(f"event must be one of {HOOK_EVENTS}, got '{event}'")
+    _hooks[event].remove(hook)
+
+
+def clear_hooks() -> None:
+    """
+    Removes all registered hooks.
+    """
+    for hooks in _hooks.values():
+        hooks.clear()
+
+
+def configure_hooks(
+    include_statement: bool = True,
+    statement_redactor: Optional[Callable[[str], str]] = None,
+) -> None:
+    """
+    Controls how the substituted statement is exposed to hooks.
+
+    :param include_statement: if False ExecutionEvent.statement is always None
+    :param statement_redactor: if given, this is called on each substituted statement
+                               and its return value is passed to the hooks instead
+    """
+    global _include_statement, _statement_redactor
+    _include_statement = include_statement
+    _statement_redactor = statement_redactor
+
+
+def _emit(
+    event: str,
+    operation: Optional[str],
+    statement: Optional[str],
+    connection: Dict[str, Any],
+    stats: ExecutionStats,
+    duration: float = 0.0,
+    error: Optional[BaseException] = None,
+) -> None:
+    """
+    Calls the hooks registered for an event, call sites should check `_hooks[event]`
+    before calling this so that there is no overhead when no hooks are registered.
+    """
+    if statement is not None:
+        if not _include_statement:
+            statement = None
+        elif _statement_redactor is not None:
+            statement = _statement_redactor(statement)
+
+    execution_event = ExecutionEvent(
+        event,
+        operation,
+        statement,
+        connection.get("server"),
+        connection.get("database"),
+        stats,
+        duration,
+        error,
+    )
+    for hook in _hooks[event]:
+        try:
+            hook(execution_event)
+        except Exception:
+            logger.exception(f"Hook {hook!r} raised an error handling '{event}'")
+
+
+class _SlowQueryLogSettings:
+    enabled: bool
+    threshold: Optional[float]
+    sample_rate: float
+    statement_redactor: Optional[Callable[[str], str]]
+    level: int
+    max_statement_length: int
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.threshold = None
+        self.sample_rate = 0.0
+        self.statement_redactor = None
+        self.level = logging.WARNING
+        self.max_statement_length = 4000
+
+
+_slow_query_log = _SlowQueryLogSettings()
+slow_query_logger = logging.getLogger("pymssqlutils.slow_query")
+
+
+def enable_slow_query_log(
+    threshold: Optional[float] = 1.0,
+    sample_rate: float = 0.0,
+    statement_redactor: Optional[Callable[[str], str]] = None,
+    level: int = logging.WARNING,
+    max_statement_length: int = 4000,
+) -> None:
+    """
+    Logs `query` and `execute` calls to the 'pymssqlutils.slow_query' logger if their
+    total time exceeds `threshold`, and/or randomly according to `sample_rate`.
+
+    Each entry contains the substituted statement/s, the connection's server and
+    database, the timings and the row counts. The same values are also attached to
+    the log record under the `slow_query` attribute for structured log handlers.
+
+    :param threshold: log calls slower than this many seconds, None disables
+    :param sample_rate: the fraction (0 to 1) of all calls to log regardless of
+                        their duration
+    :param statement_redactor: if given, each substituted statement is passed through
+                               this callable before being truncated & logged
+    :param level: the logging level to log entries at
+    :param max_statement_length: substituted statements are truncated to this length
+    """
+    if threshold is not None and threshold < 0:
+        raise ValueError("threshold cannot be negative")
+    if not 0 <= sample_rate <= 1:
+        raise ValueError("sample_rate must be between 0 and 1")
+    _slow_query_log.threshold = threshold
+    _slow_query_log.sample_rate = sample_rate
+    _slow_query_log.statement_redactor = statement_redactor
+    _slow_query_log.level = level
+    _slow_query_log.max_statement_length = max_statement_length
+    _slow_query_log.enabled = threshold is not None or sample_rate > 0
+
+
+def disable_slow_query_log() -> None:
+    """
+    Stops logging slow and sampled queries.
+    """
+    enable_slow_query_log(threshold=None)
+
+
+def _log_slow_query(
+    statements: Iterable[str],
+    connection: Dict[str, Any],
+    stats: ExecutionStats,
+) -> None:
+    """
+    Logs the execution if it is slow or sampled, call sites should check
+    `_slow_query_log.enabled` before calling this. The statements are only rendered if
+    the execution is logged.
+    """
+    settings = _slow_query_log
+    total_time = stats.total_time
+
+    if settings.threshold is not None and total_time >= settings.threshold:
+        reason = f"Slow query ({total_time:.3f}s >= {settings.threshold}s)"
+    elif settings.sample_rate and random() < settings.sample_rate:
+        reason = f"Sampled query ({total_time:.3f}s)"
+    else:
+        return
+
+    statement = ""
+    for item in statements:
+        # redact before truncating, a literal cut short may no longer be matched
+        if settings.statement_redactor is not None:
+            item = settings.statement_redactor(item)
+        statement = f"{statement}\n;{item}" if statement else item
+        if len(statement) > settings.max_statement_length:
+            statement = statement[: settings.max_statement_length] + "..."
+            break
+
+    entry = {
+        "server": connection.get("server"),
+        "database": connection.get("database"),
+        "statement": statement,
+        **stats.as_dict(),
+    }
+    slow_query_logger.log(
+        settings.level,
+        f"{reason} on {entry['server']}/{entry['database']}, "
+        f"rows={stats.row_count}, sets={stats.set_count}, "
+        f"connect={stats.connect_time:.3f}s, build={stats.build_time:.3f}s, "
+        f"execute={stats.execute_time:.3f}s, fetch={stats.fetch_time:.3f}s, "
+        f"decode={stats.decode_time:.3f}s: {statement}",
+        extra={"slow_query": entry},
+    )
+
+
+_TABLE_READS_MESSAGE = re.compile(r"Table '([^']*)'\. (.*)", re.DOTALL)
+_READ_COUNT = re.compile(r"([A-Za-z][A-Za-z\- ]*?) (\d+)")
+_TIMES = re.compile(r"CPU time = (\d+) ms,\s*elapsed time = (\d+) ms")
+
+
+class ServerStatistics:
+    """
+    The server's informational messages captured during an execution which had
+    `server_statistics=True`, with the output of `SET STATISTICS IO, TIME ON` parsed.
+
+    Attributes:
+        * messages: every informational message the server sent, in order.
+        * table_reads: the `STATISTICS IO` counters summed per table, e.g.
+          {'Orders': {'scan_count': 1, 'logical_reads': 25, 'physical_reads': 0, ...}}
+        * cpu_time_ms & elapsed_time_ms: the summed `SQL Server Execution Times`.
+        * compile_cpu_time_ms & compile_elapsed_time_ms: the summed
+          `SQL Server parse and compile time`.
+    """
+
+    messages: List[str]
+    table_reads: Dict[str, Dict[str, int]]
+    cpu_time_ms: int
+    elapsed_time_ms: int
+    compile_cpu_time_ms: int
+    compile_elapsed_time_ms: int
+
+    def __init__(self) -> None:
+        self.messages = []
+        self.table_reads = {}
+        self.cpu_time_ms = 0
+        self.elapsed_time_ms = 0
+        self.compile_cpu_time_ms = 0
+        self.compile_elapsed_time_ms = 0
+
+    @property
+    def logical_reads(self) -> int:
+        """
+        Returns the logical reads summed over all tables.
+        """
+        return sum(x.get("logical_reads", 0) for x in self.table_reads.values())
+
+    @property
+    def physical_reads(self) -> int:
+        """
+        Returns the physical reads summed over all tables.
+        """
+        return sum(x.get("physical_reads", 0) for x in self.table_reads.values())
+
+    def add_message(self, message: str) -> None:
+        """
+        Records a server message, parsing it if it is `STATISTICS IO` or
+        `STATISTICS TIME` output.
+        """
+        self.messages.append(message)
+
+        table_match = _TABLE_READS_MESSAGE.match(message.strip())
+        if table_match:
+            table, counters = table_match.groups()
+            table_reads = self.table_reads.setdefault(table, {})
+            for name, count in _READ_COUNT.findall(counters):
+                key = name.strip().lower().replace(" ", "_").replace("-", "_")
+                table_reads[key] = table_reads.get(key, 0) + int(count)
+            return
+
+        times_match = _TIMES.search(message)
+        if times_match:
+            cpu_time, elapsed_time = (int(x) for x in times_match.groups())
+            if "parse and compile" in message:
+                self.compile_cpu_time_ms += cpu_time
+                self.compile_elapsed_time_ms += elapsed_time
+            else:
+                self.cpu_time_ms += cpu_time
+                self.elapsed_time_ms += elapsed_time
+
+    def _message_handler(
+        self,
+        msgstate: int,
+        severity: int,
+        srvname: Union[str, bytes],
+        procname: Union[str, bytes],
+        line: int,
+        msgtext: Union[str, bytes],
+    ) -> None:
+        # matches the signature pymssql expects for `set_msghandler`
+        if isinstance(msgtext, bytes):
+            msgtext = msgtext.decode("UTF-8", errors="replace")
+        self.add_message(msgtext)
+
+    def __repr__(self) -> str:
+        return (
+            f"ServerStatistics(logical_reads={self.logical_reads}, "
+            f"physical_reads={self.physical_reads}, cpu_time_ms={self.cpu_time_ms}, "
+            f"elapsed_time_ms={self.elapsed_time_ms}, tables={list(self.table_reads)})"
+        )
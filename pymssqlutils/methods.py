@@ -1,20 +1,64 @@
 import logging
 import os
 import warnings
-from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, time
 from itertools import zip_longest
-from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from pathlib import Path
+from time import perf_counter
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import pymssql as sql
-from pymssql import Connection
+from pymssql import Connection, Cursor
 
-from .databaseresult import DatabaseResult
+from .converters import Converters, keep
+from .databaseresult import DatabaseResult, _iter_cleaned_chunks
+from .drivers import _connect
+from .export import (
+    build_numpy_columns,
+    build_numpy_structured,
+    iter_polars_frames,
+    write_csv,
+    write_json,
+    write_parquet,
+)
 from .helpers import SQLParameter, SQLParameters
+from .instrumentation import (
+    ExecutionStats,
+    ServerStatistics,
+    _emit,
+    _hooks,
+    _log_slow_query,
+    _slow_query_log,
+)
+from .querystats import _query_stats, _record_query
 
 logger = logging.getLogger(__name__)
 
+Row = Tuple[Any, ...]
+# called with the columns, source types & an iterator of decoded chunks of rows
+StreamWriter = Callable[[Tuple[str, ...], Tuple[int, ...], Iterator[List[Row]]], None]
+
 TDS_PROTOCOL_CHECKED = False
 
+# SQL Server allows at most 1000 rows in a single VALUES clause
+MAX_VALUES_ROWS = 1000
+
 
 def substitute_parameters(operation: str, parameters: SQLParameters) -> str:
     """
@@ -96,6 +140,10 @@ def query(
     operation: str,
     parameters: SQLParameters = None,
     raise_errors: bool = True,
+    server_statistics: bool = False,
+    lazy_sets: bool = False,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
     **kwargs: Optional[str],
 ) -> DatabaseResult:
     """
@@ -110,6 +158,22 @@ def query(
     :param raise_errors: if True raises errors, else DatabaseResult class will
                          contain the error details
     :type raise_errors: bool, optional
+    :param server_statistics: if True runs the operation with
+                              `SET STATISTICS IO, TIME ON` and captures the server's
+                              messages under DatabaseResult.server_stats
+    :type server_statistics: bool, optional
+    :param lazy_sets: if True only the first result set is fetched, later sets are
+                      fetched when DatabaseResult.next_set is called. The connection
+                      is held open until the last set is fetched or the result is
+                      closed, so use the result as a context manager
+    :type lazy_sets: bool, optional
+    :param memory_budget: if given, once a result set's decoded rows are estimated
+                          to use more than this many bytes the remaining rows are
+                          spilled to a temporary file and read back on access
+    :type memory_budget: int, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
     :return: a DatabaseResult class.
     :rtype: DatabaseResult
     """
@@ -119,6 +183,10 @@ def query(
             [parameters] if parameters else None,
             commit=False,
             fetch=True,
+            server_statistics=server_statistics,
+            lazy_sets=lazy_sets,
+            memory_budget=memory_budget,
+            converters=converters,
             **_with_conn_details(kwargs),
         )
     except sql.Error as err:
@@ -133,6 +201,9 @@ def execute(
     batch_size: Optional[int] = None,
     fetch: bool = False,
     raise_errors: bool = True,
+    server_statistics: bool = False,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
     **kwargs: Optional[str],
 ) -> DatabaseResult:
     """
@@ -175,6 +246,17 @@ def execute(
     :param raise_errors: if True raises errors, else DatabaseResult class will
                          contain the error details
     :type raise_errors: bool, optional
+    :param server_statistics: if True runs the operation/s with
+                              `SET STATISTICS IO, TIME ON` and captures the server's
+                              messages under DatabaseResult.server_stats
+    :type server_statistics: bool, optional
+    :param memory_budget: if given, once a result set's decoded rows are estimated
+                          to use more than this many bytes the remaining rows are
+                          spilled to a temporary file and read back on access
+    :type memory_budget: int, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
     :return: a DatabaseResult class
     :rtype: DatabaseResult
     """
@@ -208,13 +290,24 @@ def execute(
     try:
         if batch_size:
             return _execute_batched(
-                operations, parameters, batch_size, fetch, **_with_conn_details(kwargs)
+                operations,
+                parameters,
+                batch_size,
+                fetch,
+                server_statistics,
+                memory_budget,
+                converters,
+                **_with_conn_details(kwargs),
             )
         return _execute(
             operations,
             parameters,
             commit=True,
             fetch=fetch,
+            server_statistics=server_statistics,
+            memory_budget=memory_budget,
+            lazy_sets=False,
+            converters=converters,
             **_with_conn_details(kwargs),
         )
     except sql.Error as err:
@@ -228,12 +321,490 @@ def execute(
         )
 
 
+def query_to_json(
+    operation: str,
+    fileobj: IO[bytes],
+    parameters: SQLParameters = None,
+    ndjson: bool = False,
+    with_columns: bool = False,
+    raise_errors: bool = True,
+    converters: Optional[Converters] = None,
+    **kwargs: Optional[str],
+) -> DatabaseResult:
+    """
+    Execute a SQL Operation which DOES NOT COMMIT the transaction & streams the
+    first result set to a binary file-like object as JSON, writing each chunk of
+    rows as soon as it has been fetched & decoded so memory use stays constant.
+    Decimals are written as strings. Requires orjson.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to execute
+    :type operation: str
+    :param fileobj: a binary file-like object to write to, e.g. open(path, "wb")
+    :type fileobj: IO[bytes]
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param ndjson: if True writes newline delimited JSON, one row per line, instead
+                   of a JSON array
+    :type ndjson: bool, optional
+    :param with_columns: if True writes rows as objects keyed by column name,
+                         otherwise as arrays
+    :type with_columns: bool, optional
+    :param raise_errors: if True raises errors, else DatabaseResult class will
+                         contain the error details. Note that part of the output
+                         may have already been written.
+    :type raise_errors: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
+    :return: a DatabaseResult class without data, see its stats for the row count
+    :rtype: DatabaseResult
+    """
+
+    def write(
+        columns: Tuple[str, ...],
+        source_types: Tuple[int, ...],
+        chunks: Iterator[List[Row]],
+    ) -> None:
+        write_json(fileobj, columns, chunks, ndjson, with_columns)
+
+    return _query_stream(operation, parameters, write, raise_errors, converters, kwargs)
+
+
+def query_to_csv(
+    operation: str,
+    fileobj: IO[bytes],
+    parameters: SQLParameters = None,
+    delimiter: str = ",",
+    header: bool = True,
+    gzip: bool = False,
+    raise_errors: bool = True,
+    converters: Optional[Converters] = None,
+    **kwargs: Optional[str],
+) -> DatabaseResult:
+    """
+    Execute a SQL Operation which DOES NOT COMMIT the transaction & streams the
+    first result set to a binary file-like object as CSV, writing each chunk of
+    rows as soon as it has been fetched & decoded so memory use stays constant.
+    Datetimes are written in ISO 8601 format, bytes as hex and NULLs as empty fields.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to execute
+    :type operation: str
+    :param fileobj: a binary file-like object to write to, e.g. open(path, "wb")
+    :type fileobj: IO[bytes]
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param delimiter: the field delimiter, e.g. "\\t" for TSV
+    :type delimiter: str, optional
+    :param header: if True the first line is the column names
+    :type header: bool, optional
+    :param gzip: if True the output is gzip compressed
+    :type gzip: bool, optional
+    :param raise_errors: if True raises errors, else DatabaseResult class will
+                         contain the error details. Note that part of the output
+                         may have already been written.
+    :type raise_errors: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
+    :return: a DatabaseResult class without data, see its stats for the row count
+    :rtype: DatabaseResult
+    """
+
+    def write(
+        columns: Tuple[str, ...],
+        source_types: Tuple[int, ...],
+        chunks: Iterator[List[Row]],
+    ) -> None:
+        write_csv(fileobj, columns, chunks, delimiter, header, gzip)
+
+    return _query_stream(operation, parameters, write, raise_errors, converters, kwargs)
+
+
+def query_to_parquet(
+    operation: str,
+    where: Union[str, Path, IO[bytes]],
+    parameters: SQLParameters = None,
+    row_group_size: int = 100_000,
+    compression: str = "snappy",
+    raise_errors: bool = True,
+    converters: Optional[Converters] = None,
+    max_deferred_rows: int = 100_000,
+    **kwargs: Optional[str],
+) -> DatabaseResult:
+    """
+    Execute a SQL Operation which DOES NOT COMMIT the transaction & streams the
+    first result set into a Parquet file, writing a row group every row_group_size
+    rows. Each column's type is derived from its first non-null value, while a
+    column is NULL throughout up to max_deferred_rows rows are held back waiting
+    for one, so at most max_deferred_rows rows plus one row group are held in
+    memory. After that the column's type falls back to one derived from its source
+    type. Requires pyarrow.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to execute
+    :type operation: str
+    :param where: the path or binary file-like object to write to
+    :type where: Union[str, Path, IO[bytes]]
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param row_group_size: the number of rows in each row group
+    :type row_group_size: int, optional
+    :param compression: the compression codec, e.g. "snappy", "zstd" or "none"
+    :type compression: str, optional
+    :param raise_errors: if True raises errors, else DatabaseResult class will
+                         contain the error details. Note that part of the output
+                         may have already been written.
+    :type raise_errors: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
+    :param max_deferred_rows: the maximum number of rows held back while a column is
+                              NULL throughout, 0 types such columns from the first
+                              row group
+    :type max_deferred_rows: int, optional
+    :return: a DatabaseResult class without data, see its stats for the row count
+    :rtype: DatabaseResult
+    """
+
+    # filled with the interned columns as the chunks are decoded, which is before
+    # write_parquet derives the schema from them
+    interned: Set[str] = set()
+
+    def write(
+        columns: Tuple[str, ...],
+        source_types: Tuple[int, ...],
+        chunks: Iterator[List[Row]],
+    ) -> None:
+        write_parquet(
+            where,
+            columns,
+            source_types,
+            chunks,
+            row_group_size,
+            compression,
+            interned,
+            max_deferred_rows,
+        )
+
+    return _query_stream(
+        operation, parameters, write, raise_errors, converters, kwargs, interned
+    )
+
+
+def query_to_numpy(
+    operation: str,
+    parameters: SQLParameters = None,
+    structured: bool = False,
+    converters: Optional[Converters] = None,
+    **kwargs: Optional[str],
+) -> Any:
+    """
+    Execute a SQL Operation which DOES NOT COMMIT the transaction & fills numpy
+    arrays from the first result set, converting each chunk of rows as soon as it
+    has been fetched & decoded, so the rows are never all held in memory. The
+    dtypes are as for DatabaseResult.to_numpy. Requires numpy.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to execute
+    :type operation: str
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param structured: if True returns a single structured array
+    :type structured: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
+    :return: a dictionary of column name to numpy array, or a structured array
+    :rtype: Union[Dict[str, numpy.ndarray], numpy.ndarray]
+    """
+    arrays: Dict[str, Any] = {}
+
+    def write(
+        columns: Tuple[str, ...],
+        source_types: Tuple[int, ...],
+        chunks: Iterator[List[Row]],
+    ) -> None:
+        arrays.update(build_numpy_columns(columns, source_types, chunks))
+
+    _query_stream(operation, parameters, write, True, converters, kwargs)
+    return build_numpy_structured(arrays) if structured else arrays
+
+
+def query_to_polars(
+    operation: str,
+    on_frame: Callable[[Any], None],
+    parameters: SQLParameters = None,
+    raise_errors: bool = True,
+    converters: Optional[Converters] = None,
+    **kwargs: Optional[str],
+) -> DatabaseResult:
+    """
+    Execute a SQL Operation which DOES NOT COMMIT the transaction & passes the
+    first result set to on_frame as Polars DataFrames, one per chunk of rows as
+    soon as it has been fetched & decoded, all with the same dtypes. While a column
+    is NULL throughout, up to POLARS_DEFERRED_CHUNKS chunks are held back waiting
+    for a value to type it by, see iter_polars_frames. Columns decoded by an
+    Interned converter are Categorical. Requires polars.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to execute
+    :type operation: str
+    :param on_frame: called with each polars DataFrame
+    :type on_frame: Callable[[polars.DataFrame], None]
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param raise_errors: if True raises errors, else DatabaseResult class will
+                         contain the error details. Note that some frames may
+                         have already been passed to on_frame.
+    :type raise_errors: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter
+    :type converters: Converters, optional
+    :return: a DatabaseResult class without data, see its stats for the row count
+    :rtype: DatabaseResult
+    """
+
+    # filled with the interned columns as the chunks are decoded, which is before
+    # iter_polars_frames derives the dtypes from them
+    interned: Set[str] = set()
+
+    def write(
+        columns: Tuple[str, ...],
+        source_types: Tuple[int, ...],
+        chunks: Iterator[List[Row]],
+    ) -> None:
+        for frame in iter_polars_frames(columns, source_types, chunks, interned):
+            on_frame(frame)
+
+    return _query_stream(
+        operation, parameters, write, raise_errors, converters, kwargs, interned
+    )
+
+
+def query_pages(
+    operation: str,
+    key_columns: Union[str, Sequence[str]],
+    page_size: int = 10_000,
+    parameters: SQLParameters = None,
+    rows: bool = False,
+    prefetch: bool = False,
+    raise_errors: bool = True,
+    converters: Optional[Converters] = None,
+    **kwargs: Optional[str],
+) -> Iterator[Any]:
+    """
+    Walks the result of a SQL Operation which DOES NOT COMMIT the transaction page by
+    page using keyset pagination, yielding a DatabaseResult per page (or each row if
+    rows is True). Each page is fetched by seeking past the last page's key:
+
+        SELECT TOP (page_size) * FROM (operation) AS [_page]
+        WHERE [key] > last key ORDER BY [key]
+
+    so every page costs the same regardless of its depth, unlike OFFSET/FETCH, and
+    only one page (two with prefetch) is held in memory. The pages are fetched on a
+    single connection which is closed once the generator is exhausted or closed.
+
+    The operation must be valid as a derived table, i.e. without an ORDER BY or CTE,
+    and the key columns must be in its columns, not NULL and unique together. The key
+    columns are left as pymssql returns them, e.g. DECIMAL keys as Decimal rather
+    than float, so that the last key is sought past exactly.
+
+    **kwargs are passed through to the pymssql.connect() method.
+
+    :param operation: the SQL Operation to page through
+    :type operation: str
+    :param key_columns: the column/s to order and seek by
+    :type key_columns: Union[str, Sequence[str]]
+    :param page_size: the number of rows in each page
+    :type page_size: int, optional
+    :param parameters: parameters to substitute into the operation.
+    :type parameters: SQLParameters
+    :param rows: if True yields the rows as Tuples rather than DatabaseResult pages
+    :type rows: bool, optional
+    :param prefetch: if True the next page is fetched in a background thread while
+                     the current page is being consumed
+    :type prefetch: bool, optional
+    :param raise_errors: if True raises errors, else a DatabaseResult containing the
+                         error details is yielded as the last page
+    :type raise_errors: bool, optional
+    :param converters: overrides how values are converted, keyed by source type
+                       (int) or column name (str), see register_converter. These
+                       don't apply to the key columns.
+    :type converters: Converters, optional
+    :return: an iterator of DatabaseResult pages, or of rows if rows is True
+    :rtype: Iterator[Union[DatabaseResult, Tuple[Any, ...]]]
+    """
+    if isinstance(key_columns, str):
+        key_columns = [key_columns]
+    if not key_columns:
+        raise ValueError("at least one key column must be given")
+    if page_size <= 0:
+        raise ValueError("page_size must be positive")
+    if parameters:
+        operation = substitute_parameters(operation, parameters)
+    # the seek key is read from the page's rows, so it must not lose precision
+    converters = {**(converters or {}), **{x: keep for x in key_columns}}
+
+    try:
+        for page in _iter_pages(
+            operation,
+            key_columns,
+            page_size,
+            prefetch,
+            converters,
+            **_with_conn_details(kwargs),
+        ):
+            if rows:
+                yield from page.raw_data
+            else:
+                yield page
+    except sql.Error as err:
+        if raise_errors:
+            raise err
+        yield DatabaseResult(ok=False, fetch=True, commit=False, error=err)
+
+
+def _keyset_statement(
+    operation: str,
+    key_columns: Sequence[str],
+    page_size: int,
+    last_key: Optional[Tuple[Any, ...]],
+) -> str:
+    keys = [f"[{x}]" for x in key_columns]
+    seek = ""
+    if last_key is not None:
+        values = [substitute_parameters("%s", (x,)) for x in last_key]
+        # (a > x) OR (a = x AND b > y) OR ... for composite keys
+        predicates = [
+            " AND ".join(
+                [f"{keys[i]} = {values[i]}" for i in range(idx)]
+                + [f"{keys[idx]} > {values[idx]}"]
+            )
+            for idx in range(len(keys))
+        ]
+        seek = " WHERE " + " OR ".join(f"({x})" for x in predicates)
+    return (
+        f"SELECT TOP ({page_size}) * FROM (\n{operation}\n) AS [_page]"
+        f"{seek} ORDER BY {', '.join(keys)}"
+    )
+
+
+def _iter_pages(
+    operation: str,
+    key_columns: Sequence[str],
+    page_size: int,
+    prefetch: bool,
+    converters: Optional[Converters],
+    **kwargs: Optional[str],
+) -> Iterator[DatabaseResult]:
+    """
+    This is an internal method, you should call query_pages() instead
+    """
+    stats = ExecutionStats()
+    with ExitStack() as resources:
+        cnxn = resources.enter_context(_get_connection(stats, **kwargs))
+        pool = resources.enter_context(ThreadPoolExecutor(max_workers=1))
+
+        def fetch(last_key: Optional[Tuple[Any, ...]]) -> DatabaseResult:
+            nonlocal stats
+            page_stats, stats = stats, ExecutionStats()
+            statement = _keyset_statement(operation, key_columns, page_size, last_key)
+            try:
+                with cnxn.cursor() as cur:
+                    _execute_statement(cur, operation, statement, page_stats, kwargs)
+                    page = DatabaseResult(
+                        ok=True,
+                        fetch=True,
+                        commit=False,
+                        cursor=cur,
+                        stats=page_stats,
+                        converters=converters,
+                    )
+                    if _hooks["after_fetch"]:
+                        _emit_after_fetch(operation, kwargs, page_stats)
+            except Exception as err:
+                if _hooks["on_error"]:
+                    _emit("on_error", operation, None, kwargs, page_stats, error=err)
+                raise
+            if _slow_query_log.enabled:
+                _log_slow_query([statement], kwargs, page_stats)
+            if _query_stats.enabled:
+                _record_query([statement], page_stats)
+            return page
+
+        def next_key(page: DatabaseResult) -> Optional[Tuple[Any, ...]]:
+            # the key to seek past, or None if this was the last page
+            if not page._result_sets or len(page.raw_data) < page_size:
+                return None
+            last_row = page.raw_data[-1]
+            return tuple(last_row[page.columns.index(x)] for x in key_columns)
+
+        page = fetch(None)
+        page_count = 0
+        while True:
+            key = next_key(page)
+            if key is None:
+                # an empty last page is only yielded if it is the only page
+                if not page_count or (page._result_sets and page.raw_data):
+                    yield page
+                return
+            page_count += 1
+            if prefetch:
+                future = pool.submit(fetch, key)
+                yield page
+                page = future.result()
+            else:
+                yield page
+                page = fetch(key)
+
+
+def _query_stream(
+    operation: str,
+    parameters: SQLParameters,
+    write: StreamWriter,
+    raise_errors: bool,
+    converters: Optional[Converters],
+    kwargs: Dict[str, Optional[str]],
+    interned: Optional[Set[str]] = None,
+) -> DatabaseResult:
+    try:
+        return _execute_stream(
+            operation,
+            parameters,
+            write,
+            converters,
+            interned,
+            **_with_conn_details(kwargs),
+        )
+    except sql.Error as err:
+        if raise_errors:
+            raise err
+        return DatabaseResult(ok=False, fetch=False, commit=False, error=err)
+
+
 @contextmanager
-def _get_connection(**kwargs: Union[str, int, bool, None]) -> Connection:
-    conn = sql.connect(**kwargs)
+def _get_connection(
+    stats: ExecutionStats, **kwargs: Union[str, int, bool, None]
+) -> Iterator[Connection]:
+    if _hooks["before_connect"]:
+        _emit("before_connect", None, None, kwargs, stats)
+    connect_start = perf_counter()
+    conn = _connect(**kwargs)
+    connect_time = perf_counter() - connect_start
+    stats.connect_time += connect_time
+    if _hooks["after_connect"]:
+        _emit("after_connect", None, None, kwargs, stats, connect_time)
     global TDS_PROTOCOL_CHECKED
     if not TDS_PROTOCOL_CHECKED:
-        tds_major, tds_minor = conn._conn.tds_version_tuple
+        # None if the version is unknown
+        tds_major, tds_minor = conn._conn.tds_version_tuple or (7, 3)
         if tds_major < 7 or tds_minor < 3:
             message = (
                 f"Your connection is trying to use TDS Protocol {tds_major}.{tds_minor}"
@@ -243,7 +814,69 @@ def _get_connection(**kwargs: Union[str, int, bool, None]) -> Connection:
             )
             warnings.warn(message, RuntimeWarning)
         TDS_PROTOCOL_CHECKED = True
-    yield conn
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def _execute_statement(
+    cursor: Cursor,
+    operation: str,
+    statement: str,
+    stats: ExecutionStats,
+    connection: Dict[str, Optional[str]],
+) -> None:
+    if _hooks["before_execute"]:
+        _emit("before_execute", operation, statement, connection, stats)
+    execute_start = perf_counter()
+    cursor.execute(statement)
+    execute_time = perf_counter() - execute_start
+    stats.execute_time += execute_time
+    stats.statement_count += 1
+    if _hooks["after_execute"]:
+        _emit("after_execute", operation, statement, connection, stats, execute_time)
+
+
+def _enable_server_statistics(cnxn: Connection, cursor: Cursor) -> ServerStatistics:
+    server_stats = ServerStatistics()
+    cnxn._conn.set_msghandler(server_stats._message_handler)
+    cursor.execute("SET STATISTICS IO, TIME ON")
+    return server_stats
+
+
+def _commit(cnxn: Connection, stats: ExecutionStats) -> None:
+    commit_start = perf_counter()
+    cnxn.commit()
+    stats.execute_time += perf_counter() - commit_start
+
+
+def _emit_after_fetch(
+    operation: Optional[str],
+    connection: Dict[str, Optional[str]],
+    stats: ExecutionStats,
+) -> None:
+    _emit(
+        "after_fetch",
+        operation,
+        None,
+        connection,
+        stats,
+        stats.fetch_time + stats.decode_time,
+    )
+
+
+def _iter_statements(
+    operations: List[str], parameters: Optional[List[SQLParameters]]
+) -> Iterator[str]:
+    if not parameters:
+        yield from operations
+        return
+    fillvalue = parameters[-1] if len(parameters) < len(operations) else operations[-1]
+    for operation, parameter_set in zip_longest(
+        operations, parameters, fillvalue=fillvalue
+    ):
+        yield substitute_parameters(operation, parameter_set)  # type: ignore
 
 
 def _execute(
@@ -251,49 +884,146 @@ def _execute(
     parameters: Optional[List[SQLParameters]] = None,
     commit: bool = False,
     fetch: bool = False,
+    server_statistics: bool = False,
+    lazy_sets: bool = False,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
     **kwargs: Optional[str],
 ) -> DatabaseResult:
     """
     This is an internal method, you should call execute() instead
     """
-    with _get_connection(**kwargs) as cnxn:
-        with cnxn.cursor() as cur:
-            if parameters:
-                fillvalue = (
-                    parameters[-1]
-                    if len(parameters) < len(operations)
-                    else operations[-1]
-                )
-                for operation, parameter_set in zip_longest(
-                    operations, parameters, fillvalue=fillvalue
-                ):
-                    statement = substitute_parameters(
-                        operation,  # type: ignore
-                        parameter_set,
+    stats = ExecutionStats()
+    server_stats: Optional[ServerStatistics] = None
+    operation: Optional[str] = None
+    try:
+        with ExitStack() as resources:
+            cnxn = resources.enter_context(_get_connection(stats, **kwargs))
+            with ExitStack() as cursor_resources:
+                cur = cursor_resources.enter_context(cnxn.cursor())
+                if server_statistics:
+                    server_stats = _enable_server_statistics(cnxn, cur)
+                if parameters:
+                    fillvalue = (
+                        parameters[-1]
+                        if len(parameters) < len(operations)
+                        else operations[-1]
                     )
-                    cur.execute(statement)
-            else:
-                for operation in operations:
-                    cur.execute(operation)
+                    for item, parameter_set in zip_longest(
+                        operations, parameters, fillvalue=fillvalue
+                    ):
+                        operation = cast(str, item)
+                        build_start = perf_counter()
+                        statement = substitute_parameters(operation, parameter_set)
+                        stats.build_time += perf_counter() - build_start
+                        _execute_statement(cur, operation, statement, stats, kwargs)
+                else:
+                    for operation in operations:
+                        _execute_statement(cur, operation, operation, stats, kwargs)
 
-            result = DatabaseResult(ok=True, fetch=fetch, commit=commit, cursor=cur)
+                result = DatabaseResult(
+                    ok=True,
+                    fetch=fetch,
+                    commit=commit,
+                    cursor=cur,
+                    stats=stats,
+                    server_stats=server_stats,
+                    lazy_sets=lazy_sets,
+                    memory_budget=memory_budget,
+                    converters=converters,
+                )
+                if lazy_sets:
+                    # the result closes the cursor & connection once it is exhausted
+                    result._hold_open(resources.pop_all(), cursor_resources.pop_all())
+                if fetch and _hooks["after_fetch"]:
+                    _emit_after_fetch(operation, kwargs, stats)
 
-        if commit:
-            cnxn.commit()
+            if commit:
+                _commit(cnxn, stats)
+    except Exception as err:
+        if _hooks["on_error"]:
+            _emit("on_error", operation, None, kwargs, stats, error=err)
+        raise
+
+    if _slow_query_log.enabled:
+        _log_slow_query(_iter_statements(operations, parameters), kwargs, stats)
+    if _query_stats.enabled:
+        _record_query(operations, stats)
 
     return result
 
 
+def _execute_stream(
+    operation: str,
+    parameters: SQLParameters,
+    write: StreamWriter,
+    converters: Optional[Converters] = None,
+    interned: Optional[Set[str]] = None,
+    **kwargs: Optional[str],
+) -> DatabaseResult:
+    """
+    This is an internal method, it executes the operation and passes the first
+    result set's decoded chunks of rows to write as they are fetched. The interned
+    columns are kept in interned, see _iter_cleaned_chunks.
+    """
+    stats = ExecutionStats()
+    try:
+        with _get_connection(stats, **kwargs) as cnxn:
+            with cnxn.cursor() as cur:
+                statement = operation
+                if parameters:
+                    build_start = perf_counter()
+                    statement = substitute_parameters(operation, parameters)
+                    stats.build_time += perf_counter() - build_start
+                _execute_statement(cur, operation, statement, stats, kwargs)
+
+                if cur.description is None:
+                    write((), (), iter([]))
+                else:
+                    columns = tuple(x[0] for x in cur.description)
+                    source_types = tuple(x[1] for x in cur.description)
+                    write(
+                        columns,
+                        source_types,
+                        _iter_cleaned_chunks(
+                            cur, source_types, stats, converters, interned
+                        ),
+                    )
+                    stats.set_count += 1
+                if _hooks["after_fetch"]:
+                    _emit_after_fetch(operation, kwargs, stats)
+    except Exception as err:
+        if _hooks["on_error"]:
+            _emit("on_error", operation, None, kwargs, stats, error=err)
+        raise
+
+    if _slow_query_log.enabled:
+        _log_slow_query(
+            _iter_statements([operation], [parameters] if parameters else None),
+            kwargs,
+            stats,
+        )
+    if _query_stats.enabled:
+        _record_query([operation], stats)
+
+    return DatabaseResult(ok=True, fetch=False, commit=False, stats=stats)
+
+
 def _execute_batched(
     operations: List[str],
     parameters: Optional[List[SQLParameters]] = None,
     batch_size: int = 1000,
     fetch: bool = False,
+    server_statistics: bool = False,
+    memory_budget: Optional[int] = None,
+    converters: Optional[Converters] = None,
     **kwargs: Optional[str],
 ) -> DatabaseResult:
     """
     This is an internal method, you should call execute() instead
     """
+    stats = ExecutionStats()
+    build_start = perf_counter()
     if parameters:
         fillvalue = (
             parameters[-1] if len(parameters) < len(operations) else operations[-1]
@@ -314,13 +1044,46 @@ def _execute_batched(
             "\n;".join(operation for operation in operations[i : i + batch_size])
             for i in range(0, len(operations), batch_size)
         ]
+    stats.build_time += perf_counter() - build_start
+
+    # each batch is reported to hooks by the first operation it contains
+    batch_operations = [
+        operations[min(i * batch_size, len(operations) - 1)]
+        for i in range(len(batched))
+    ]
+    connection = _with_conn_details(kwargs)
+    server_stats: Optional[ServerStatistics] = None
+    operation: Optional[str] = None
+    try:
+        with _get_connection(stats, **connection) as cnxn:
+            with cnxn.cursor() as cur:
+                if server_statistics:
+                    server_stats = _enable_server_statistics(cnxn, cur)
+                for operation, batch in zip(batch_operations, batched):
+                    _execute_statement(cur, operation, batch, stats, connection)
+                result = DatabaseResult(
+                    ok=True,
+                    fetch=fetch,
+                    commit=True,
+                    cursor=cur,
+                    stats=stats,
+                    server_stats=server_stats,
+                    memory_budget=memory_budget,
+                    converters=converters,
+                )
+                if fetch and _hooks["after_fetch"]:
+                    _emit_after_fetch(operation, connection, stats)
+            _commit(cnxn, stats)
+    except Exception as err:
+        if _hooks["on_error"]:
+            _emit("on_error", operation, None, connection, stats, error=err)
+        raise
+
+    if _slow_query_log.enabled:
+        _log_slow_query(batched, connection, stats)
+    if _query_stats.enabled:
+        _record_query(operations, stats)
 
-    with _get_connection(**_with_conn_details(kwargs)) as cnxn:
-        with cnxn.cursor() as cur:
-            for batch in batched:
-                cur.execute(batch)
-            result = DatabaseResult(ok=True, fetch=fetch, commit=True, cursor=cur)
-        cnxn.commit()
     return result
 
 
@@ -334,10 +1097,100 @@ def to_sql_list(listlike: Iterable[SQLParameter]) -> str:
     :param listlike: The iterable of SQLParameter to transform
     :return: str
     """
-    out_str = ", ".join(substitute_parameters("%s", x) for x in listlike)
+    out_str = ", ".join(_to_sql_values(listlike))
     return f"({out_str})"
 
 
+def _to_sql_values(listlike: Iterable[SQLParameter]) -> List[str]:
+    values = list(listlike)
+    if all(type(x) is int for x in values):
+        # ints render as themselves, so skip the per value substitution
+        return list(map(str, values))
+    return [substitute_parameters("%s", x) for x in values]
+
+
+def _in_list_sql_type(values: List[SQLParameter]) -> str:
+    if all(type(x) is int for x in values):
+        return "BIGINT"
+    if all(isinstance(x, str) for x in values):
+        # NVARCHAR's length is in UTF-16 code units, characters outside the BMP take 2
+        length = max(len(x.encode("utf-16-le")) for x in values) // 2
+        return f"NVARCHAR({length})" if length <= 4000 else "NVARCHAR(MAX)"
+    raise ValueError(
+        "sql_type must be given unless the values are all integers or all strings"
+    )
+
+
+def build_in_list(
+    operation: str,
+    values: Iterable[SQLParameter],
+    parameters: SQLParameters = None,
+    threshold: int = 1000,
+    sql_type: Optional[str] = None,
+    table_name: str = "#in_list",
+) -> str:
+    """
+    Substitutes a list of values into the '{values}' marker of an operation, for use
+    with the SQL 'in' operator, e.g.
+
+        build_in_list("SELECT * FROM T WHERE Id IN {values}", ids)
+
+    Up to threshold values are substituted as a SQL list, as per to_sql_list. Above
+    it the values are loaded into a session temp table, in INSERT statements of at
+    most MAX_VALUES_ROWS rows, and the marker is replaced with a subquery of the
+    table, avoiding huge statements which are slow to parse and hit server limits.
+    The returned batch should be executed as a single operation, e.g. by query().
+
+    :param operation: the SQL operation containing the '{values}' marker
+    :param values: the values to substitute, duplicates are removed
+    :param parameters: parameters to substitute into the operation first, these
+                       cannot be passed to query() as the values may contain '%'
+    :param threshold: the maximum number of values to substitute as a SQL list
+    :param sql_type: the SQL type of the temp table's column, by default BIGINT for
+                     integers & NVARCHAR for strings, it must be given otherwise
+    :param table_name: the name of the temp table
+    :return: str
+    """
+    if parameters:
+        operation = substitute_parameters(operation, parameters)
+    if "{values}" not in operation:
+        raise ValueError("operation must contain the '{values}' marker")
+
+    values = list(dict.fromkeys(values))
+    if len(values) <= threshold:
+        return operation.replace("{values}", to_sql_list(values))
+
+    # NULL never matches 'in', and cannot be held by a primary key
+    values = [x for x in values if x is not None]
+    if sql_type is None:
+        sql_type = _in_list_sql_type(values)
+    if "CHAR" in sql_type.upper():
+        # strings which are equal under the collation, e.g. 'abc' & 'ABC' or 'a' &
+        # 'a ', aren't duplicates in python so would violate a primary key, & tempdb's
+        # collation may differ from the database's
+        column = f"{sql_type} COLLATE DATABASE_DEFAULT"
+    elif "MAX" in sql_type.upper():
+        column = sql_type
+    else:
+        column = f"{sql_type} PRIMARY KEY"
+    rendered = _to_sql_values(values)
+    return "\n".join(
+        [
+            "SET NOCOUNT ON;",
+            f"IF OBJECT_ID('tempdb..{table_name}') IS NOT NULL "
+            f"DROP TABLE {table_name};",
+            f"CREATE TABLE {table_name} ([value] {column});",
+            *(
+                f"INSERT INTO {table_name} ([value]) VALUES "
+                + ", ".join(f"({x})" for x in rendered[idx : idx + MAX_VALUES_ROWS])
+                + ";"
+                for idx in range(0, len(rendered), MAX_VALUES_ROWS)
+            ),
+            operation.replace("{values}", f"(SELECT [value] FROM {table_name})"),
+        ]
+    )
+
+
 def model_to_values(
     model: Any,
     prepend: Optional[List[Tuple[str, str]]] = None,
@@ -391,3 +1244,105 @@ def model_to_values(
 
     column_names = "(" + ", ".join(f"[{key}]" for key in keys) + ")"
     return f"{column_names} VALUES ({values_as_str})"
+
+
+# renders values of these exact types as the parameter substitution does, without
+# its per value overhead
+_SQL_LITERALS: Dict[type, Callable[[Any], str]] = {
+    type(None): lambda x: "NULL",
+    bool: lambda x: "1" if x else "0",
+    int: str,
+    float: repr,
+    str: lambda x: "N'" + x.replace("'", "''") + "'",
+    datetime: lambda x: f"N'{x.isoformat()}'",
+    date: lambda x: f"N'{x.isoformat()}'",
+    time: lambda x: f"N'{x.isoformat()}'",
+}
+
+
+def _to_sql_literal(value: SQLParameter) -> str:
+    render = _SQL_LITERALS.get(type(value))
+    if render is None:
+        # keep (x,) due to: https://github.com/pymssql/pymssql/issues/696
+        return substitute_parameters("%s", (value,))
+    return render(value)
+
+
+def _model_fields(model: Any) -> Dict[str, Any]:
+    return model if isinstance(model, dict) else model.__dict__
+
+
+def models_to_rows(models: Iterable[Any]) -> Tuple[List[str], List[Tuple[Any, ...]]]:
+    """
+    Transforms Dicts or Mappings which all have the same keys, in the same order,
+    into their column names and a list of their values as Tuples, e.g. for a bulk
+    copy. The columns are resolved once from the first model.
+
+    Raises a ValueError if a model's keys differ from the first model's.
+
+    :param models: Dictionaries or anything that implements the __dict__ method
+                   (e.g. Pydantic Models)
+    :return: a Tuple of the column names and the rows
+    """
+    columns: Optional[Tuple[str, ...]] = None
+    rows = []
+    for idx, model in enumerate(models):
+        fields = _model_fields(model)
+        if columns is None:
+            columns = tuple(fields)
+        elif len(fields) != len(columns) or tuple(fields) != columns:
+            raise ValueError(
+                f"model {idx} has the columns {list(fields)}, "
+                f"expected the first model's columns {list(columns)}"
+            )
+        rows.append(tuple(fields.values()))
+    return list(columns or ()), rows
+
+
+def models_to_values(
+    models: Iterable[Any],
+    prepend: Optional[List[Tuple[str, str]]] = None,
+    append: Optional[List[Tuple[str, str]]] = None,
+    chunk_size: int = MAX_VALUES_ROWS,
+) -> List[str]:
+    """
+    Transforms many Dicts or Mappings, which all have the same keys, into strings of
+    the form: '([attr1], [attr2], ...) VALUES (val1, val2, ...), (val1, val2, ...)'
+    with up to chunk_size rows each (SQL Server allows at most 1000).
+    Intended to be used when creating dynamic SQL INSERT statements, e.g.
+
+        execute([f"INSERT INTO MyTable {x}" for x in models_to_values(models)])
+
+    The columns are resolved once, and None, bool, int, float & str values are
+    rendered directly rather than by a substitution call per value. Prepend and
+    append are as per model_to_values, and are not parameter substituted either.
+
+    Raises a ValueError if a model's keys differ from the first model's.
+
+    :param models: Dictionaries or anything that implements the __dict__ method
+                   (e.g. Pydantic Models)
+    :param prepend: prepend a variable number of columns to the beginning of each
+                    row of values.
+    :param append: append a variable number of columns to the end of each row of
+                   values.
+    :param chunk_size: the maximum number of rows in each VALUES statement
+    :return: List[str]
+    """
+    if not 0 < chunk_size <= MAX_VALUES_ROWS:
+        raise ValueError(f"chunk_size must be between 1 and {MAX_VALUES_ROWS}")
+
+    columns, rows = models_to_rows(models)
+    keys = [x[0] for x in prepend or []] + columns + [x[0] for x in append or []]
+    column_names = "(" + ", ".join(f"[{key}]" for key in keys) + ")"
+
+    prefix = "".join(f"{x[1]}, " for x in prepend or [])
+    suffix = "".join(f", {x[1]}" for x in append or [])
+
+    statements = []
+    for idx in range(0, len(rows), chunk_size):
+        values_as_str = ", ".join(
+            f"({prefix}{', '.join(map(_to_sql_literal, row))}{suffix})"
+            for row in rows[idx : idx + chunk_size]
+        )
+        statements.append(f"{column_names} VALUES {values_as_str}")
+    return statements
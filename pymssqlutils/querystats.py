@@ -0,0 +1,211 @@
+import re
+from functools import lru_cache
+from random import randrange
+from threading import Lock
+from typing import Dict, Iterable, List
+
+from pymssqlutils.instrumentation import ExecutionStats
+
+# the number of latency samples kept per fingerprint for the percentile estimates
+RESERVOIR_SIZE = 1024
+
+_NORMALIZERS = [
+    (re.compile(r"--[^\n]*"), " "),
+    (re.compile(r"/\*.*?\*/", re.DOTALL), " "),
+    (re.compile(r"N?'(?:[^']|'')*'"), "?"),
+    (re.compile(r"%\(\w+\)[sd]|%[sd]"), "?"),
+    (re.compile(r"\b0x[0-9a-fA-F]*\b"), "?"),
+    (re.compile(r"(?<![\w@#$.])\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b"), "?"),
+    (re.compile(r"\b(?:NULL|TRUE|FALSE)\b", re.IGNORECASE), "?"),
+    (re.compile(r"\s+"), " "),
+    (re.compile(r"\(\s?\?(?:\s?,\s?\?)*\s?\)"), "(?)"),
+    (re.compile(r"\(\?\)(?:\s?,\s?\(\?\))+"), "(?)"),
+]
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(operation: str) -> str:
+    """
+    Normalizes a SQL operation so that executions which only differ by their literal
+    values or parameters share the same fingerprint. Comments are stripped, literals
+    and parameter placeholders are replaced with '?', lists of literals
+    (e.g. IN lists or multi-row VALUES) are collapsed and whitespace is normalized.
+
+    e.g. "SELECT * FROM T WHERE Id IN (1, 2, 3) AND Name = %s"
+         -> "SELECT * FROM T WHERE Id IN (?) AND Name = ?"
+
+    :param operation: the SQL operation to normalize
+    :return: str
+    """
+    for pattern, replacement in _NORMALIZERS:
+        operation = pattern.sub(replacement, operation)
+    return operation.strip()
+
+
+class QueryStats:
+    """
+    A snapshot of the statistics aggregated for a single fingerprint. All times are
+    in seconds, p50_time and p99_time are estimated from a sample of at most
+    RESERVOIR_SIZE executions.
+    """
+
+    fingerprint: str
+    calls: int
+    total_time: float
+    max_time: float
+    p50_time: float
+    p99_time: float
+    row_count: int
+    decode_time: float
+
+    def __init__(
+        self,
+        fingerprint: str,
+        calls: int,
+        total_time: float,
+        max_time: float,
+        p50_time: float,
+        p99_time: float,
+        row_count: int,
+        decode_time: float,
+    ):
+        self.fingerprint = fingerprint
+        self.calls = calls
+        self.total_time = total_time
+        self.max_time = max_time
+        self.p50_time = p50_time
+        self.p99_time = p99_time
+        self.row_count = row_count
+        self.decode_time = decode_time
+
+    @property
+    def mean_time(self) -> float:
+        """
+        Returns the mean time per call in seconds.
+        """
+        return self.total_time / self.calls if self.calls else 0.0
+
+    def __repr__(self) -> str:
+        return (
+            f"QueryStats(fingerprint={self.fingerprint!r}, calls={self.calls}, "
+            f"total_time={self.total_time:.6f}, p50_time={self.p50_time:.6f}, "
+            f"p99_time={self.p99_time:.6f}, row_count={self.row_count}, "
+            f"decode_time={self.decode_time:.6f})"
+        )
+
+
+class _Aggregate:
+    calls: int
+    total_time: float
+    max_time: float
+    row_count: int
+    decode_time: float
+    samples: List[float]
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.row_count = 0
+        self.decode_time = 0.0
+        self.samples = []
+
+    def add(self, stats: ExecutionStats) -> None:
+        total_time = stats.total_time
+        self.calls += 1
+        self.total_time += total_time
+        self.max_time = max(self.max_time, total_time)
+        self.row_count += stats.row_count
+        self.decode_time += stats.decode_time
+
+        # reservoir sampling keeps a uniform sample of all the calls' latencies
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(total_time)
+        else:
+            idx = randrange(self.calls)
+            if idx < RESERVOIR_SIZE:
+                self.samples[idx] = total_time
+
+    def snapshot(self, fingerprint_: str) -> QueryStats:
+        samples = sorted(self.samples)
+        return QueryStats(
+            fingerprint=fingerprint_,
+            calls=self.calls,
+            total_time=self.total_time,
+            max_time=self.max_time,
+            p50_time=_percentile(samples, 0.50),
+            p99_time=_percentile(samples, 0.99),
+            row_count=self.row_count,
+            decode_time=self.decode_time,
+        )
+
+
+class _Registry:
+    enabled: bool
+    aggregates: Dict[str, _Aggregate]
+    lock: Lock
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.aggregates = {}
+        self.lock = Lock()
+
+
+_query_stats = _Registry()
+
+
+def _percentile(sorted_samples: List[float], percentile: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    idx = min(len(sorted_samples) - 1, int(len(sorted_samples) * percentile))
+    return sorted_samples[idx]
+
+
+def enable_query_stats() -> None:
+    """
+    Starts aggregating statistics per operation fingerprint for every `query` and
+    `execute` call in this process. See `get_query_stats`.
+    """
+    _query_stats.enabled = True
+
+
+def disable_query_stats() -> None:
+    """
+    Stops aggregating statistics, already aggregated statistics are kept.
+    """
+    _query_stats.enabled = False
+
+
+def reset_query_stats() -> None:
+    """
+    Discards all aggregated statistics.
+    """
+    with _query_stats.lock:
+        _query_stats.aggregates = {}
+
+
+def get_query_stats() -> List[QueryStats]:
+    """
+    Returns a snapshot of the statistics aggregated so far, one QueryStats per
+    fingerprint, ordered by total time descending.
+    """
+    with _query_stats.lock:
+        snapshots = [
+            aggregate.snapshot(fingerprint_)
+            for fingerprint_, aggregate in _query_stats.aggregates.items()
+        ]
+    return sorted(snapshots, key=lambda x: x.total_time, reverse=True)
+
+
+def _record_query(operations: Iterable[str], stats: ExecutionStats) -> None:
+    """
+    Aggregates the execution under the fingerprint of its operations, call sites
+    should check `_query_stats.enabled` before calling this.
+    """
+    # dict.fromkeys de-duplicates whilst preserving the order
+    fingerprint_ = "\n;".join(dict.fromkeys(fingerprint(x) for x in operations))
+    with _query_stats.lock:
+        aggregate = _query_stats.aggregates.get(fingerprint_)
+        if aggregate is None:
+            aggregate = _query_stats.aggregates[fingerprint_] = _Aggregate()
+        aggregate.add(stats)
@@ -0,0 +1,489 @@
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from itertools import accumulate
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+    cast,
+    overload,
+)
+
+if TYPE_CHECKING:
+    from typing_extensions import Literal
+
+    # the array typecodes of the typed buffers
+    TypeCode = Literal["B", "i", "I", "q", "d"]
+
+Row = Tuple[Any, ...]
+ResultSet = Tuple[Sequence[Row], Tuple[str, ...], Tuple[int, ...]]
+Buffer = Union[bytes, bytearray, memoryview]
+
+MAGIC = b"PMSQLRS"
+FORMAT_VERSION = 1
+# buffers are padded to this many bytes so that typed views are aligned
+ALIGNMENT = 8
+
+_HEADER = struct.Struct("<7sBI")
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_SECOND = timedelta(seconds=1)
+_INT64_MIN = -(2**63)
+_INT64_MAX = 2**63 - 1
+
+
+def _padding(size: int) -> int:
+    return -size % ALIGNMENT
+
+
+def _column_kind(values: Sequence[Any]) -> str:
+    types = set(map(type, values))
+    types.discard(type(None))
+    if not types:
+        return "null"
+    if len(types) > 1:
+        return "object"
+    type_ = types.pop()
+    if type_ is int:
+        present = [x for x in values if x is not None]
+        if _INT64_MIN <= min(present) and max(present) <= _INT64_MAX:
+            return "int"
+        return "object"
+    if type_ is datetime:
+        aware = {x.tzinfo is not None for x in values if x is not None}
+        if aware == {False}:
+            return "datetime"
+        if aware == {True}:
+            return "datetimetz"
+        return "object"
+    if type_ is time:
+        if all(x.tzinfo is None for x in values if x is not None):
+            return "time"
+        return "object"
+    return _SIMPLE_KINDS.get(type_, "object")
+
+
+_SIMPLE_KINDS = {
+    bool: "bool",
+    float: "float",
+    str: "str",
+    bytes: "bytes",
+    Decimal: "decimal",
+    date: "date",
+}
+
+
+def _time_to_micros(value: time) -> int:
+    return (
+        (value.hour * 60 + value.minute) * 60 + value.second
+    ) * 1_000_000 + value.microsecond
+
+
+def _micros_to_time(value: int) -> time:
+    seconds, microsecond = divmod(value, 1_000_000)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return time(hour, minute, second, microsecond)
+
+
+def _encode_variable(values: List[bytes]) -> List[bytes]:
+    # the offsets' width is inferred from the buffer's length when decoding
+    blob = b"".join(values)
+    offsets = array("I" if len(blob) <= 0xFFFFFFFF else "q", [0])
+    offsets.extend(accumulate(map(len, values)))
+    return [offsets.tobytes(), blob]
+
+
+def _encode_column(kind: str, values: Sequence[Any]) -> List[bytes]:
+    """
+    Encodes a column's values into its buffers, None values must already have
+    been replaced with a placeholder of the column's type.
+    """
+    if kind == "null":
+        return []
+    if kind == "int":
+        return [array("q", values).tobytes()]
+    if kind == "float":
+        return [array("d", values).tobytes()]
+    if kind == "bool":
+        return [array("B", values).tobytes()]
+    if kind == "str":
+        return _encode_variable([x.encode("UTF-8") for x in values])
+    if kind == "bytes":
+        return _encode_variable(list(values))
+    if kind == "decimal":
+        return _encode_variable([str(x).encode("ascii") for x in values])
+    if kind == "date":
+        return [array("i", [x.toordinal() for x in values]).tobytes()]
+    if kind == "time":
+        return [array("q", [_time_to_micros(x) for x in values]).tobytes()]
+    if kind == "datetime":
+        return [array("q", [(x - _EPOCH) // _MICROSECOND for x in values]).tobytes()]
+    if kind == "datetimetz":
+        return [
+            array(
+                "q",
+                [(x.replace(tzinfo=None) - _EPOCH) // _MICROSECOND for x in values],
+            ).tobytes(),
+            array("i", [x.utcoffset() // _SECOND for x in values]).tobytes(),
+        ]
+    return [pickle.dumps(list(values), protocol=pickle.HIGHEST_PROTOCOL)]
+
+
+_PLACEHOLDERS: Dict[str, Any] = {
+    "int": 0,
+    "float": 0.0,
+    "bool": False,
+    "str": "",
+    "bytes": b"",
+    "decimal": Decimal(0),
+    "date": date(1970, 1, 1),
+    "time": time(0),
+    "datetime": _EPOCH,
+    "datetimetz": datetime(1970, 1, 1, tzinfo=timezone.utc),
+}
+
+
+def encode_result_sets(result_sets: Sequence[ResultSet], **meta: Any) -> List[bytes]:
+    """
+    Encodes result sets into the typed columnar binary format, returning the
+    list of chunks which concatenated make up the encoded bytes. Any extra
+    keyword arguments are stored in the header and returned by decode_result_sets.
+
+    The layout is a fixed header (magic, version & header length), a JSON header
+    describing each set's columns, source types, row count and the kind and
+    buffer locations of each column, followed by the column buffers each padded
+    to ALIGNMENT bytes. Nullable columns have a buffer of one byte per row, 1 if
+    the value is not null.
+    """
+    chunks: List[bytes] = []
+    offset = 0
+
+    def add(buffer: bytes) -> List[int]:
+        nonlocal offset
+        location = [offset, len(buffer)]
+        chunks.append(buffer)
+        offset += len(buffer)
+        padding = _padding(len(buffer))
+        if padding:
+            chunks.append(b"\x00" * padding)
+            offset += padding
+        return location
+
+    sets = []
+    for rows, columns, source_types in result_sets:
+        fields = []
+        for values in zip(*rows) if rows else [() for _ in columns]:
+            kind = _column_kind(values)
+            nulls = None
+            if kind not in ("null", "object") and None in values:
+                nulls = add(array("B", [x is not None for x in values]).tobytes())
+                placeholder = _PLACEHOLDERS[kind]
+                values = tuple(placeholder if x is None else x for x in values)
+            fields.append(
+                {
+                    "kind": kind,
+                    "nulls": nulls,
+                    "buffers": [add(x) for x in _encode_column(kind, values)],
+                }
+            )
+        sets.append(
+            {
+                "columns": list(columns),
+                "source_types": list(source_types),
+                "rows": len(rows),
+                "fields": fields,
+            }
+        )
+
+    header = json.dumps(
+        {"byteorder": sys.byteorder, "sets": sets, "meta": meta},
+        separators=(",", ":"),
+    ).encode("UTF-8")
+    header += b" " * _padding(_HEADER.size + len(header))
+    return [_HEADER.pack(MAGIC, FORMAT_VERSION, len(header)), header] + chunks
+
+
+class _Column:
+    """
+    Decodes the values of one column from its buffers, which are memoryviews of the
+    encoded data so nothing is copied until values are accessed.
+    """
+
+    def __init__(
+        self,
+        kind: str,
+        buffers: List[memoryview],
+        nulls: Optional[memoryview],
+        rows: int,
+        swap: bool,
+    ):
+        self.kind = kind
+        self.rows = rows
+        self.nulls = nulls
+        self._object: Optional[List[Any]] = None
+        self._offsets: Sequence[int] = ()
+        self._values: Any = None
+        self._extra: Any = None
+
+        if kind in ("str", "bytes", "decimal"):
+            itemsize = len(buffers[0]) // (rows + 1)
+            self._offsets = _typed(buffers[0], "I" if itemsize == 4 else "q", swap)
+            self._values = buffers[1]
+        elif kind in _TYPECODES:
+            self._values = _typed(buffers[0], _TYPECODES[kind], swap)
+            if kind == "datetimetz":
+                self._extra = _typed(buffers[1], "i", swap)
+        elif kind == "object":
+            self._values = buffers[0]
+
+    def get(self, idx: int) -> Any:
+        if self.kind == "null" or (self.nulls is not None and not self.nulls[idx]):
+            return None
+        if self.kind == "object":
+            return self._objects()[idx]
+        if self.kind in ("str", "bytes", "decimal"):
+            value = self._values[self._offsets[idx] : self._offsets[idx + 1]]
+            return _VARIABLE_DECODERS[self.kind](value)
+        if self.kind == "datetimetz":
+            return _decode_datetimetz(self._values[idx], self._extra[idx])
+        return _FIXED_DECODERS[self.kind](self._values[idx])
+
+    def to_list(self) -> List[Any]:
+        if self.kind == "null":
+            return [None] * self.rows
+        if self.kind == "object":
+            return list(self._objects())
+        values: List[Any]
+        if self.kind in ("int", "float"):
+            values = self._values.tolist()
+        elif self.kind in ("str", "bytes", "decimal"):
+            data = self._values.tobytes()
+            offsets = self._offsets
+            decoder = _VARIABLE_DECODERS[self.kind]
+            values = [
+                decoder(data[offsets[i] : offsets[i + 1]]) for i in range(self.rows)
+            ]
+        elif self.kind == "datetimetz":
+            values = list(
+                map(_decode_datetimetz, self._values.tolist(), self._extra.tolist())
+            )
+        else:
+            values = list(map(_FIXED_DECODERS[self.kind], self._values.tolist()))
+        if self.nulls is not None:
+            nulls = self.nulls
+            return [x if nulls[i] else None for i, x in enumerate(values)]
+        return values
+
+    def _objects(self) -> List[Any]:
+        if self._object is None:
+            self._object = pickle.loads(self._values)
+        return self._object
+
+
+_TYPECODES: Dict[str, "TypeCode"] = {
+    "int": "q",
+    "float": "d",
+    "bool": "B",
+    "date": "i",
+    "time": "q",
+    "datetime": "q",
+    "datetimetz": "q",
+}
+
+_VARIABLE_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "str": lambda x: str(x, "UTF-8"),
+    "bytes": bytes,
+    "decimal": lambda x: Decimal(str(x, "ascii")),
+}
+
+_timezones: Dict[int, timezone] = {}
+
+
+def _decode_datetime(value: int) -> datetime:
+    return _EPOCH + timedelta(0, 0, value)
+
+
+def _decode_datetimetz(value: int, offset: int) -> datetime:
+    tz = _timezones.get(offset)
+    if tz is None:
+        tz = _timezones[offset] = timezone(timedelta(seconds=offset))
+    return (_EPOCH + timedelta(0, 0, value)).replace(tzinfo=tz)
+
+
+_FIXED_DECODERS: Dict[str, Callable[[Any], Any]] = {
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "date": date.fromordinal,
+    "time": _micros_to_time,
+    "datetime": _decode_datetime,
+}
+
+
+def _typed(buffer: memoryview, typecode: "TypeCode", swap: bool) -> Sequence[Any]:
+    if swap:
+        # written on a machine with the other byte order, so this has to copy
+        values = array(typecode)
+        values.frombytes(buffer)
+        values.byteswap()
+        return values
+    return buffer.cast(typecode)
+
+
+class ColumnarRows(Sequence[Row]):
+    """
+    A read only sequence of rows backed by the typed columnar binary format, see
+    DatabaseResult.to_bytes. This is returned by DatabaseResult.raw_data for results
+    created by DatabaseResult.from_bytes, values are decoded from the underlying
+    buffer as they are accessed.
+    """
+
+    def __init__(self, columns: List[_Column], rows: int):
+        self._columns = columns
+        self._length = rows
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, idx: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> List[Row]: ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Row, List[Row]]:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self._length))]
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("row index out of range")
+        return tuple(column.get(idx) for column in self._columns)
+
+    def __iter__(self) -> Iterator[Row]:
+        # decoding a column at a time is much faster than a row at a time
+        if not self._columns:
+            return iter([()] * self._length)
+        return zip(*(column.to_list() for column in self._columns))
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, ColumnarRows)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"ColumnarRows(rows={self._length}, columns={len(self._columns)})"
+
+
+def decode_result_sets(data: Buffer) -> Tuple[List[ResultSet], Dict[str, Any]]:
+    """
+    Decodes result sets encoded by encode_result_sets, returning the result sets
+    and the header's meta dictionary. The rows of each set are ColumnarRows which
+    reference data without copying it, so data must not be modified afterwards.
+    """
+    view = memoryview(data).cast("B")
+    if len(view) < _HEADER.size:
+        raise ValueError("data is not an encoded DatabaseResult")
+    magic, version, header_length = _HEADER.unpack(view[: _HEADER.size])
+    if magic != MAGIC:
+        raise ValueError("data is not an encoded DatabaseResult")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported DatabaseResult format version {version}")
+    start = _HEADER.size + header_length
+    header = json.loads(bytes(view[_HEADER.size : start]))
+    swap = header["byteorder"] != sys.byteorder
+    body = view[start:]
+
+    def buffer(location: List[int]) -> memoryview:
+        return body[location[0] : location[0] + location[1]]
+
+    result_sets: List[ResultSet] = []
+    for set_ in header["sets"]:
+        columns = [
+            _Column(
+                field["kind"],
+                [buffer(x) for x in field["buffers"]],
+                buffer(field["nulls"]) if field["nulls"] else None,
+                set_["rows"],
+                swap,
+            )
+            for field in set_["fields"]
+        ]
+        result_sets.append(
+            (
+                ColumnarRows(columns, set_["rows"]),
+                tuple(set_["columns"]),
+                tuple(set_["source_types"]),
+            )
+        )
+    return result_sets, header["meta"]
+
+
+def write_to_shared_memory(chunks: List[bytes], name: Optional[str] = None) -> Any:
+    """
+    Creates a shared memory block holding the concatenated chunks.
+    """
+    try:
+        from multiprocessing import shared_memory
+    except ImportError as err:
+        raise ImportError("Python 3.8+ is required to use shared memory") from err
+
+    size = sum(map(len, chunks))
+    block = shared_memory.SharedMemory(name=name, create=True, size=max(size, 1))
+    buf = cast(memoryview, block.buf)
+    offset = 0
+    for chunk in chunks:
+        buf[offset : offset + len(chunk)] = chunk
+        offset += len(chunk)
+    return block
+
+
+def attach_shared_memory(name: str) -> memoryview:
+    """
+    Maps an existing shared memory block read-only without taking ownership of it,
+    i.e. it is not unlinked when this process exits. The mapping is released once
+    the returned memoryview, and any views of it, are garbage collected.
+    """
+    # SharedMemory isn't used on POSIX as attaching registers the block with the
+    # resource tracker (before Python 3.13), which unlinks it when this process
+    # exits, and it can only map blocks read-write
+    try:
+        if sys.platform == "win32":
+            from multiprocessing.shared_memory import SharedMemory
+        else:
+            import _posixshmem
+    except ImportError as err:
+        raise ImportError("Python 3.8+ is required to use shared memory") from err
+
+    if sys.platform == "win32":
+        block = SharedMemory(name=name)
+        try:
+            mapping = mmap.mmap(-1, block.size, tagname=name, access=mmap.ACCESS_READ)
+        finally:
+            block.close()
+    else:
+        fd = _posixshmem.shm_open(
+            name if name.startswith("/") else f"/{name}", os.O_RDONLY, mode=0o600
+        )
+        try:
+            mapping = mmap.mmap(fd, os.fstat(fd).st_size, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+    return memoryview(mapping)
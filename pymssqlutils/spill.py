@@ -0,0 +1,132 @@
+import mmap
+import pickle
+import sys
+import tempfile
+import threading
+from bisect import bisect_right
+from typing import Any, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+Row = Tuple[Any, ...]
+
+
+def _estimate_rows_size(rows: List[Row]) -> int:
+    """
+    Estimates the memory used by a list of decoded rows in bytes, by sampling
+    the first, middle and last rows.
+    """
+    if not rows:
+        return 0
+    samples = [rows[0], rows[len(rows) // 2], rows[-1]]
+    row_size = sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(item) for item in row) for row in samples
+    ) // len(samples)
+    # plus the list's pointer to each row
+    return (row_size + 8) * len(rows)
+
+
+class SpilledRows(Sequence[Row]):
+    """
+    A read only sequence of rows where the first rows are held in memory and the
+    remaining rows have been written to a temporary file, in pickled chunks, which
+    is read back via mmap. This is returned by DatabaseResult.raw_data when the
+    result exceeded its memory_budget.
+
+    Indexing a spilled row loads (and caches) the chunk it is in, iterating reads
+    one chunk at a time. Reading is safe from multiple threads.
+    """
+
+    def __init__(self, rows: List[Row]):
+        self._rows = rows
+        self._file = tempfile.TemporaryFile(prefix="pymssqlutils-")
+        self._offset = 0
+        self._length = len(rows)
+        # (index of the chunk's first row, byte offset, byte length)
+        self._chunks: List[Tuple[int, int, int]] = []
+        self._chunk_starts: List[int] = []
+        self._mmap: Optional[mmap.mmap] = None
+        self._mmap_lock = threading.Lock()
+        # (chunk index, rows) of the last chunk read, replaced as a whole so that
+        # concurrent readers never see one chunk's index with another's rows
+        self._cached: Tuple[int, List[Row]] = (-1, [])
+
+    @property
+    def spilled_count(self) -> int:
+        """
+        Returns the number of rows held on disk rather than in memory.
+        """
+        return self._length - len(self._rows)
+
+    def _append(self, rows: List[Row]) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        payload = pickle.dumps(rows, protocol=pickle.HIGHEST_PROTOCOL)
+        self._file.write(payload)
+        self._chunks.append((self._length, self._offset, len(payload)))
+        self._chunk_starts.append(self._length)
+        self._offset += len(payload)
+        self._length += len(rows)
+
+    def _get_mmap(self) -> mmap.mmap:
+        with self._mmap_lock:
+            if self._mmap is None:
+                self._file.flush()
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._mmap
+
+    def _read_chunk(self, idx: int) -> List[Row]:
+        _, offset, length = self._chunks[idx]
+        rows: List[Row] = pickle.loads(self._get_mmap()[offset : offset + length])
+        return rows
+
+    def _get_row(self, idx: int) -> Row:
+        if idx < len(self._rows):
+            return self._rows[idx]
+        chunk = bisect_right(self._chunk_starts, idx) - 1
+        cached_chunk, rows = self._cached
+        if chunk != cached_chunk:
+            rows = self._read_chunk(chunk)
+            self._cached = (chunk, rows)
+        return rows[idx - self._chunk_starts[chunk]]
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, idx: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> List[Row]: ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Row, List[Row]]:
+        if isinstance(idx, slice):
+            return [self._get_row(i) for i in range(*idx.indices(self._length))]
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("row index out of range")
+        return self._get_row(idx)
+
+    def __iter__(self) -> Iterator[Row]:
+        yield from self._rows
+        for idx in range(len(self._chunks)):
+            yield from self._read_chunk(idx)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, (list, SpilledRows)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"SpilledRows(rows={self._length}, spilled={self.spilled_count})"
+
+    def close(self) -> None:
+        """
+        Closes and removes the temporary file, the spilled rows cannot be read after.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
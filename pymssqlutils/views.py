@@ -0,0 +1,113 @@
+from bisect import bisect_right
+from itertools import accumulate, chain, islice
+from typing import Any, Iterator, List, Sequence, Tuple, Union, overload
+
+Row = Tuple[Any, ...]
+
+
+def _is_rows(other: Any) -> bool:
+    return isinstance(other, Sequence) and not isinstance(other, (str, bytes))
+
+
+def _sequence_eq(rows: Sequence[Row], other: Sequence[Any]) -> bool:
+    return len(rows) == len(other) and all(a == b for a, b in zip(rows, other))
+
+
+class RowsView(Sequence[Row]):
+    """
+    A read only view of a range of another sequence of rows, which is not copied.
+    Slicing a view returns another view of the same rows. This is the raw_data of
+    a sliced DatabaseResult.
+    """
+
+    _rows: Sequence[Row]
+    _positions: range
+
+    def __init__(self, rows: Sequence[Row], positions: range):
+        self._rows = rows
+        self._positions = positions
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    @overload
+    def __getitem__(self, idx: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> "RowsView": ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Row, "RowsView"]:
+        if isinstance(idx, slice):
+            return RowsView(self._rows, self._positions[idx])
+        return self._rows[self._positions[idx]]
+
+    def __iter__(self) -> Iterator[Row]:
+        positions = self._positions
+        if positions.step == 1 and isinstance(self._rows, list):
+            return islice(self._rows, positions.start, positions.stop)
+        return (self._rows[x] for x in positions)
+
+    def __eq__(self, other: Any) -> bool:
+        if not _is_rows(other):
+            return NotImplemented
+        return _sequence_eq(self, other)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"RowsView(rows={len(self)})"
+
+
+class ChainedRows(Sequence[Row]):
+    """
+    A read only sequence of rows made up of other sequences of rows, which are not
+    copied. This is the raw_data of a concatenated DatabaseResult.
+    """
+
+    _parts: List[Sequence[Row]]
+    _starts: List[int]
+    _length: int
+
+    def __init__(self, parts: Sequence[Sequence[Row]]):
+        flattened: List[Sequence[Row]] = []
+        for part in parts:
+            if isinstance(part, ChainedRows):
+                flattened.extend(part._parts)
+            elif len(part):
+                flattened.append(part)
+        self._parts = flattened
+        # the index of each part's first row
+        self._starts = [0, *accumulate(len(x) for x in flattened)][:-1]
+        self._length = sum(len(x) for x in flattened)
+
+    def __len__(self) -> int:
+        return self._length
+
+    @overload
+    def __getitem__(self, idx: int) -> Row: ...
+
+    @overload
+    def __getitem__(self, idx: slice) -> Sequence[Row]: ...
+
+    def __getitem__(self, idx: Union[int, slice]) -> Union[Row, Sequence[Row]]:
+        if isinstance(idx, slice):
+            return RowsView(self, range(self._length)[idx])
+        if idx < 0:
+            idx += self._length
+        if not 0 <= idx < self._length:
+            raise IndexError("row index out of range")
+        part = bisect_right(self._starts, idx) - 1
+        return self._parts[part][idx - self._starts[part]]
+
+    def __iter__(self) -> Iterator[Row]:
+        return chain.from_iterable(self._parts)
+
+    def __eq__(self, other: Any) -> bool:
+        if not _is_rows(other):
+            return NotImplemented
+        return _sequence_eq(self, other)
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self) -> str:
+        return f"ChainedRows(rows={self._length}, parts={len(self._parts)})"
@@ -0,0 +1,242 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+import pymssqlutils as sql
+from pymssqlutils import DatabaseResult
+from tests.helpers import MockCursor
+
+DESCRIPTION = (
+    ("Col_Int", 3, None, None, None, None, None),
+    ("Col_Price", 5, None, None, None, None, None),
+    ("Col_Rate", 5, None, None, None, None, None),
+    ("Col_Str", 1, None, None, None, None, None),
+)
+ROW = [(1, Decimal("12.345"), Decimal("0.5"), "abc")]
+
+
+@pytest.fixture(autouse=True)
+def reset_converters():
+    yield
+    sql.clear_converters()
+
+
+def _rows(converters=None, row=None, row_count=2):
+    return DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=row_count, description=DESCRIPTION, row=row or ROW),
+        converters=converters,
+    ).raw_data
+
+
+def test_default_conversion():
+    assert _rows()[0] == (1, 12.345, 0.5, "abc")
+
+
+def test_register_converter():
+    sql.register_converter(5, Decimal, sql.keep)
+    assert _rows()[0] == (1, Decimal("12.345"), Decimal("0.5"), "abc")
+
+    sql.register_converter(5, Decimal, str)
+    assert _rows()[0] == (1, "12.345", "0.5", "abc")
+
+    sql.unregister_converter(5, Decimal)
+    assert _rows()[0] == (1, 12.345, 0.5, "abc")
+
+    with pytest.raises(KeyError):
+        sql.unregister_converter(5, Decimal)
+
+
+def test_register_converter_subclass():
+    class Price(Decimal):
+        pass
+
+    sql.register_converter(5, Decimal, str)
+    assert _rows(row=[(1, Price("1.5"), None, "abc")])[0] == (1, "1.5", None, "abc")
+
+
+def test_per_call_converters():
+    sql.register_converter(5, Decimal, str)
+    rows = _rows(converters={5: None, "Col_Price": sql.scaled_int(2), 1: str.upper})
+    assert rows[0] == (1, 1234, Decimal("0.5"), "ABC")
+
+
+def test_scaled_int():
+    convert = sql.scaled_int(2)
+    assert convert(Decimal("12.3")) == 1230
+    assert convert(Decimal("-0.125")) == -12
+    assert sql.scaled_int(0)(Decimal("123456789012345678")) == 123456789012345678
+
+
+def test_vectorized_converter():
+    calls = []
+
+    @sql.vectorized
+    def double(values):
+        calls.append(len(values))
+        return [None if x is None else x * 2 for x in values]
+
+    row = [(None, Decimal("1"), None, "abc")]
+    rows = _rows(converters={"Col_Int": double}, row_count=12_000)
+    assert rows[0][0] == 2
+    assert calls == [5_000, 5_000, 2_000]
+
+    # the converter isn't resolved while the column is NULL
+    assert _rows(converters={"Col_Int": double}, row=row)[0] == (None, 1.0, None, "abc")
+
+
+def test_vectorized_converter_length():
+    @sql.vectorized
+    def drop_nulls(values):
+        return [x for x in values if x is not None]
+
+    row = [(1, Decimal("1"), None, "abc"), (None, Decimal("1"), None, "abc")]
+    with pytest.raises(ValueError, match="'Col_Int' returned 1 values for 2 rows"):
+        _rows(converters={"Col_Int": drop_nulls}, row=row, row_count=1)
+
+
+def test_query_converters():
+    sql.set_driver(sql.ReplayDriver({"SELECT 1": [(DESCRIPTION, ROW)]}))
+    try:
+        result = sql.query("SELECT 1", server="replay", converters={5: sql.keep})
+    finally:
+        sql.set_driver(None)
+    assert result.data[0]["Col_Price"] == Decimal("12.345")
+
+
+DATETIMEOFFSET = b"Q\xfd,\xf1I\x00\x00\x00^\xad\x00\x00<\x00\x07\xe0"
+
+
+def test_datetimeoffset():
+    expected = datetime(
+        2021, 7, 7, 9, 49, 17, 887010, tzinfo=timezone(timedelta(hours=1))
+    )
+    values = sql.datetimeoffset([DATETIMEOFFSET, None, DATETIMEOFFSET])
+    assert values == [expected, None, expected]
+    # timezones are shared between values
+    assert values[0].tzinfo is values[2].tzinfo
+    assert sql.datetimeoffset([expected, None]) == [expected, None]
+    assert sql.datetimeoffset([None]) == [None]
+
+
+def test_datetimeoffset_column():
+    description = (("Col_Dto", 2, None, None, None, None, None),)
+    rows = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(
+            row_count=3, description=description, row=[(DATETIMEOFFSET,)]
+        ),
+        converters={"Col_Dto": sql.datetimeoffset},
+    ).raw_data
+    assert rows[2][0] == datetime(2021, 7, 7, 8, 49, 17, 887010, tzinfo=timezone.utc)
+
+
+def test_datetimeoffset_other_lengths():
+    # a VARBINARY column whose first value happens to look like a DATETIMEOFFSET
+    description = (("Col_Bin", 2, None, None, None, None, None),)
+    row = [(DATETIMEOFFSET,), (b"\x00" * 8,), (b"\x01" * 8,)]
+    rows = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=1, description=description, row=row),
+    ).raw_data
+    assert rows == row
+
+
+def _strings(count, distinct):
+    # new str objects, as returned by the driver
+    return ["".join(["status", str(idx % distinct)]) for idx in range(count)]
+
+
+def test_interned():
+    interned = sql.Interned()
+    values = interned(_strings(100, 3) + [None])
+    assert values[0] is values[3]
+    assert values[-1] is None
+    assert interned(_strings(3, 3))[1] is values[1]
+
+
+def test_interned_max_ratio():
+    interned = sql.Interned(max_ratio=0.1)
+    interned(_strings(100, 100))
+    assert not interned._cache
+
+    values = interned(_strings(100, 5))
+    assert values[0] is values[5]
+
+
+def test_interned_max_size():
+    interned = sql.Interned(max_size=2)
+    interned(["a", "b"])
+    values = interned(_strings(10, 2))
+    assert values[0] == "status0"
+    assert values[0] is not values[2]
+
+
+def test_interned_exports():
+    pd = pytest.importorskip("pandas")
+    pl = pytest.importorskip("polars")
+    rows = [(idx, None, None, status) for idx, status in enumerate(_strings(10, 2))]
+    sql.set_driver(sql.ReplayDriver({"SELECT 1": [(DESCRIPTION, rows)]}))
+    try:
+        result = sql.query(
+            "SELECT 1", server="replay", converters={"Col_Str": sql.Interned()}
+        )
+    finally:
+        sql.set_driver(None)
+
+    assert result.raw_data[0][3] is result.raw_data[2][3]
+    df = result.to_dataframe()
+    assert isinstance(df["Col_Str"].dtype, pd.CategoricalDtype)
+    assert list(df["Col_Str"].cat.categories) == ["status0", "status1"]
+    assert result.to_polars().schema["Col_Str"] == pl.Categorical
+    assert result.to_polars().schema["Col_Int"] == pl.Int64
+
+
+def test_interned_registered_parquet(tmp_path):
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    rows = [(idx, None, None, status) for idx, status in enumerate(_strings(10, 2))]
+    sql.set_driver(sql.ReplayDriver({"SELECT 1": [(DESCRIPTION, rows)]}))
+    sql.register_converter(1, str, sql.Interned(max_ratio=0.5))
+    try:
+        sql.query_to_parquet("SELECT 1", tmp_path / "out.parquet", server="replay")
+    finally:
+        sql.set_driver(None)
+
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert pa.types.is_dictionary(table.schema.field("Col_Str").type)
+    assert table.column("Col_Str").to_pylist() == _strings(10, 2)
+
+
+def test_interned_exports_only_interned_columns(mocker, tmp_path):
+    pd = pytest.importorskip("pandas")
+    pl = pytest.importorskip("polars")
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    mocker.patch("pymssqlutils.databaseresult.FETCH_SIZE", 100)
+    # the first chunk has few distinct values, the second too many to intern
+    statuses = _strings(100, 2) + _strings(100, 100)
+    rows = [(idx, None, None, status) for idx, status in enumerate(statuses)]
+    sql.set_driver(sql.ReplayDriver({"SELECT 1": [(DESCRIPTION, rows)]}))
+    sql.register_converter(1, str, sql.Interned(max_ratio=0.1))
+    try:
+        result = sql.query("SELECT 1", server="replay")
+        first = sql.query("SELECT 1", server="replay")[:100]
+        sql.query_to_parquet("SELECT 1", tmp_path / "out.parquet", server="replay")
+    finally:
+        sql.set_driver(None)
+
+    assert not isinstance(result.to_dataframe()["Col_Str"].dtype, pd.CategoricalDtype)
+    assert result.to_polars().schema["Col_Str"] == pl.Utf8
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert not pa.types.is_dictionary(table.schema.field("Col_Str").type)
+
+    # a slice keeps its result's interned columns
+    assert not isinstance(first.to_dataframe()["Col_Str"].dtype, pd.CategoricalDtype)
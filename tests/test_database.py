@@ -171,3 +171,11 @@ def test_to_dataframe_empty_result():
     out = result.to_dataframe()
     assert out.columns[0] == "now"
     assert out.shape == (0, 2)
+
+
+@pytest.mark.skipif(SKIP_FILE, reason=SKIP_REASON)
+def test_server_statistics():
+    result = sql.query("SELECT TOP 10 * FROM sys.objects", server_statistics=True)
+    assert result.server_stats.messages
+    assert result.server_stats.table_reads
+    assert result.server_stats.logical_reads > 0
@@ -1,4 +1,5 @@
 import sys
+from contextlib import ExitStack
 from datetime import date, datetime, time
 
 import orjson
@@ -260,3 +261,109 @@ def test_cast_to_dataframe_no_pandas(monkeypatch):
 
     with pytest.raises(ImportError):
         result.to_dataframe()
+
+
+def _lazy_multi_set_result(closed: list) -> DatabaseResult:
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockMultiSetCursor(
+            row_count=(1, 2, 1),
+            description=(
+                (("Col_Int", 3, None, None, None, None, None),),
+                (("Col_Str", 1, None, None, None, None, None),),
+                (("Col_Int", 3, None, None, None, None, None),),
+            ),
+            row=([(1,)], [("Hello",)], [(2,)]),
+        ),
+        lazy_sets=True,
+    )
+    resources = ExitStack()
+    resources.callback(closed.append, True)
+    result._hold_open(resources)
+    return result
+
+
+def test_lazy_multi_result_set():
+    closed = []
+    result = _lazy_multi_set_result(closed)
+
+    assert len(result._result_sets) == 1
+    assert result.data == [{"Col_Int": 1}]
+
+    assert result.next_set()
+    assert len(result._result_sets) == 2
+    assert result.data == [{"Col_Str": "Hello"}, {"Col_Str": "Hello"}]
+    assert not closed
+
+    assert result.next_set()
+    assert result.data == [{"Col_Int": 2}]
+    assert not result.next_set()
+    assert closed == [True]
+
+    assert result.previous_set()
+    assert result.previous_set()
+    assert result.data == [{"Col_Int": 1}]
+    assert result.set_count == 3
+    assert result.stats.set_count == 3
+
+
+def test_lazy_multi_result_set_count_and_close():
+    closed = []
+    result = _lazy_multi_set_result(closed)
+    assert result.set_count == 3
+    assert closed == [True]
+
+    closed = []
+    with _lazy_multi_set_result(closed) as result:
+        assert result.data == [{"Col_Int": 1}]
+    assert closed == [True]
+    assert not result.next_set()
+    assert result.set_count == 1
+
+
+def test_lazy_single_result_set_closes():
+    closed = []
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=2),
+        lazy_sets=True,
+    )
+    resources = ExitStack()
+    resources.callback(closed.append, True)
+    result._hold_open(resources)
+    assert not closed
+    assert result.set_count == 1
+    assert closed == [True]
+
+
+def test_execution_stats():
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockMultiSetCursor(
+            row_count=(3, 2),
+            description=(
+                (("Col_Int", 3, None, None, None, None, None),),
+                (("Col_Str", 1, None, None, None, None, None),),
+            ),
+            row=([(1,)], [("Hello",)]),
+        ),
+    )
+
+    assert result.stats.row_count == 5
+    assert result.stats.set_count == 2
+    assert result.stats.fetch_time > 0
+    assert result.stats.decode_time > 0
+    assert result.stats.total_time >= result.stats.decode_time
+    assert result.stats.as_dict()["row_count"] == 5
+
+
+def test_execution_stats_no_fetch():
+    result = DatabaseResult(ok=True, fetch=False, commit=True)
+    assert result.stats.row_count == 0
+    assert result.stats.total_time == 0
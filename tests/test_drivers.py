@@ -0,0 +1,118 @@
+import pymssql
+import pytest
+
+import pymssqlutils as sql
+from pymssqlutils.drivers import _ReplayConnection
+from tests.helpers import MockMultiSetCursor
+
+DESCRIPTIONS = (
+    (("Col_Int", 3, None, None, None, None, None),),
+    (("Col_Str", 1, None, None, None, None, None),),
+)
+
+
+@pytest.fixture(autouse=True)
+def set_env(monkeypatch):
+    monkeypatch.setenv("MSSQL_SERVER", "server")
+
+
+@pytest.fixture(autouse=True)
+def reset_driver():
+    yield
+    sql.set_driver(None)
+
+
+class FakeConnection:
+    _conn = type("_conn", (), {"tds_version_tuple": (7, 4)})()
+
+    def cursor(self):
+        return MockMultiSetCursor(
+            row_count=(2, 1), description=DESCRIPTIONS, row=([(1,)], [("Hello",)])
+        )
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def test_default_driver():
+    assert sql.get_driver() is pymssql.connect
+
+
+def test_record_and_replay(tmp_path):
+    recorder = sql.RecordingDriver(lambda **kwargs: FakeConnection())
+    sql.set_driver(recorder)
+    recorded = sql.query("SELECT * FROM T WHERE Id = %s", (1,))
+    recorder.save(tmp_path / "capture.pkl")
+
+    assert list(recorder.recordings) == ["SELECT * FROM T WHERE Id = 1"]
+
+    sql.set_driver(sql.ReplayDriver(tmp_path / "capture.pkl"))
+
+    # exact match and fingerprint match
+    for parameter in (1, 2):
+        replayed = sql.query("SELECT * FROM T WHERE Id = %s", (parameter,))
+        assert replayed.set_count == 2
+        assert replayed.raw_data == recorded.raw_data == [(1,), (1,)]
+        assert replayed.columns == ("Col_Int",)
+        assert replayed.next_set()
+        assert replayed.raw_data == [("Hello",)]
+
+
+def test_replay_missing_recording():
+    sql.set_driver(sql.ReplayDriver({}))
+    with pytest.raises(pymssql.OperationalError):
+        sql.query("SELECT 1")
+
+
+def test_replay_default_and_no_result():
+    sql.set_driver(sql.ReplayDriver({}, default=[(None, [])]))
+    result = sql.execute("INSERT INTO T VALUES (1)", fetch=True)
+    assert result.ok
+    assert result.set_count == 0
+
+
+def test_replay_simulated_latency():
+    recordings = {"SELECT 1": [(DESCRIPTIONS[0], [(1,)] * 100)]}
+    sql.set_driver(
+        sql.ReplayDriver(
+            recordings, connect_latency=0.01, latency=0.02, rows_per_second=10_000
+        )
+    )
+    result = sql.query("SELECT 1")
+    assert len(result.raw_data) == 100
+    assert result.stats.connect_time >= 0.01
+    assert result.stats.execute_time >= 0.02
+    assert result.stats.fetch_time >= 0.01
+
+
+def test_replay_bad_capture_file(tmp_path):
+    path = tmp_path / "capture.pkl"
+    path.write_bytes(b"\x80\x04}\x94.")  # an empty pickled dict
+    with pytest.raises(ValueError):
+        sql.ReplayDriver(path)
+
+
+def test_replay_lazy_sets(mocker):
+    close = mocker.spy(_ReplayConnection, "close")
+    sql.set_driver(
+        sql.ReplayDriver(
+            {
+                "SELECT 1; SELECT 2": [
+                    (DESCRIPTIONS[0], [(1,)]),
+                    (DESCRIPTIONS[1], [("Hi",)]),
+                ]
+            }
+        )
+    )
+    with sql.query("SELECT 1; SELECT 2", server="replay", lazy_sets=True) as result:
+        assert result.data == [{"Col_Int": 1}]
+        assert close.call_count == 0
+        assert result.next_set()
+        assert result.data == [{"Col_Str": "Hi"}]
+        assert close.call_count == 0
+        assert not result.next_set()
+        assert close.call_count == 1
+    assert close.call_count == 1
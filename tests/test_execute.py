@@ -268,3 +268,18 @@ def test_result_error_handling_on_raise(mocker):
         sql.query(
             "test query",
         )
+
+
+def test_execute_stats(mocker: MockerFixture):
+    mocker.patch("pymssqlutils.methods._get_connection", autospec=True)
+    result = sql.execute("select %s val", [2, 3, 4])
+    assert result.stats.statement_count == 3
+    assert result.stats.build_time > 0
+    assert result.stats.execute_time > 0
+
+
+def test_execute_stats_batched(mocker: MockerFixture):
+    mocker.patch("pymssqlutils.methods._get_connection", autospec=True)
+    result = sql.execute("select %s val", [2, 3, 4, 5], batch_size=2)
+    assert result.stats.statement_count == 2
+    assert result.stats.build_time > 0
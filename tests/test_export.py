@@ -0,0 +1,422 @@
+import gc
+import gzip
+import io
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import orjson
+import pymssql
+import pytest
+
+import pymssqlutils as sql
+from pymssqlutils import DatabaseResult
+from pymssqlutils.export import (
+    build_numpy_columns,
+    build_polars_frame,
+    iter_polars_frames,
+    write_csv,
+    write_json,
+    write_parquet,
+)
+from tests.helpers import MockCursor
+
+DESCRIPTION = (
+    ("Col_Int", 3, None, None, None, None, None),
+    ("Col_Str", 1, None, None, None, None, None),
+    ("Col_Datetime", 4, None, None, None, None, None),
+)
+ROW = (1, "Hello", datetime(2021, 7, 7, 9, 49))
+
+
+@pytest.fixture(autouse=True)
+def set_env(monkeypatch):
+    monkeypatch.setenv("MSSQL_SERVER", "server")
+
+
+@pytest.fixture(autouse=True)
+def replay():
+    sql.set_driver(
+        sql.ReplayDriver(
+            {
+                "SELECT * FROM T": [(DESCRIPTION, [ROW] * 12_000)],
+                "UPDATE T SET X = 1": [(None, [])],
+            }
+        )
+    )
+    yield
+    sql.set_driver(None)
+
+
+def test_query_to_json():
+    fileobj = io.BytesIO()
+    result = sql.query_to_json("SELECT * FROM T", fileobj)
+
+    assert result.ok
+    assert result.stats.row_count == 12_000
+    data = orjson.loads(fileobj.getvalue())
+    assert len(data) == 12_000
+    assert data[-1] == [1, "Hello", "2021-07-07T09:49:00"]
+
+
+def test_query_to_ndjson_with_columns():
+    fileobj = io.BytesIO()
+    sql.query_to_json("SELECT * FROM T", fileobj, ndjson=True, with_columns=True)
+
+    lines = fileobj.getvalue().splitlines()
+    assert len(lines) == 12_000
+    assert orjson.loads(lines[0]) == {
+        "Col_Int": 1,
+        "Col_Str": "Hello",
+        "Col_Datetime": "2021-07-07T09:49:00",
+    }
+
+
+def test_query_to_json_no_result_set():
+    fileobj = io.BytesIO()
+    sql.query_to_json("UPDATE T SET X = 1", fileobj)
+    assert fileobj.getvalue() == b"[]"
+
+
+def test_query_to_json_errors():
+    result = sql.query_to_json("SELECT 1", io.BytesIO(), raise_errors=False)
+    assert not result.ok
+    assert isinstance(result.error, pymssql.OperationalError)
+    with pytest.raises(pymssql.OperationalError):
+        sql.query_to_json("SELECT 1", io.BytesIO())
+
+
+def test_write_json_decimal():
+    fileobj = io.BytesIO()
+    chunks = [[(Decimal("1.10"),)], [], [(None,)]]
+    assert write_json(fileobj, ("Col",), chunks) == 2
+    assert fileobj.getvalue() == b'[["1.10"],[null]]'
+
+
+def test_database_result_write_json():
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=7_000, description=DESCRIPTION, row=[ROW]),
+    )
+    for with_columns in (False, True):
+        fileobj = io.BytesIO()
+        result.write_json(fileobj, with_columns=with_columns)
+        assert fileobj.getvalue() == result.to_json(
+            as_bytes=True, with_columns=with_columns
+        )
+
+
+def test_query_to_csv():
+    fileobj = io.BytesIO()
+    result = sql.query_to_csv("SELECT * FROM T", fileobj)
+
+    assert result.stats.row_count == 12_000
+    lines = fileobj.getvalue().decode().splitlines()
+    assert len(lines) == 12_001
+    assert lines[0] == "Col_Int,Col_Str,Col_Datetime"
+    assert lines[1] == "1,Hello,2021-07-07T09:49:00"
+
+
+def test_query_to_tsv_gzip():
+    fileobj = io.BytesIO()
+    sql.query_to_csv(
+        "SELECT * FROM T", fileobj, delimiter="\t", header=False, gzip=True
+    )
+    lines = gzip.decompress(fileobj.getvalue()).decode().splitlines()
+    assert len(lines) == 12_000
+    assert lines[0] == "1\tHello\t2021-07-07T09:49:00"
+
+
+def test_write_csv_types():
+    fileobj = io.BytesIO()
+    chunks = [
+        [(None, None, "a,b")],
+        [(b"\x01\xff", Decimal("1.10"), 'say "hi"')],
+        [(None, datetime(2021, 1, 1).date(), None)],
+    ]
+    assert write_csv(fileobj, ("A", "B", "C"), chunks) == 3
+    assert fileobj.getvalue().decode().splitlines() == [
+        "A,B,C",
+        ',,"a,b"',
+        '01ff,1.10,"say ""hi"""',
+        ",2021-01-01,",
+    ]
+    assert not fileobj.closed
+
+
+def test_database_result_to_csv():
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=2, description=DESCRIPTION, row=[ROW]),
+    )
+    assert result.to_csv(delimiter="|").splitlines() == [
+        "Col_Int|Col_Str|Col_Datetime",
+        "1|Hello|2021-07-07T09:49:00",
+        "1|Hello|2021-07-07T09:49:00",
+    ]
+    fileobj = io.BytesIO()
+    assert result.to_csv(fileobj, gzip=True) is None
+    assert gzip.decompress(fileobj.getvalue()).decode() == result.to_csv()
+    with pytest.raises(ValueError):
+        result.to_csv(gzip=True)
+
+
+def test_write_csv_error_keeps_fileobj_open():
+    def chunks():
+        yield [(1, "a")]
+        raise pymssql.OperationalError("connection lost")
+
+    for gzip_ in (False, True):
+        fileobj = io.BytesIO()
+        with pytest.raises(pymssql.OperationalError):
+            write_csv(fileobj, ("A", "B"), chunks(), gzip=gzip_)
+        gc.collect()
+        assert not fileobj.closed
+        data = fileobj.getvalue()
+        assert (gzip.decompress(data) if gzip_ else data) == b"A,B\r\n1,a\r\n"
+
+
+def test_query_to_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    path = tmp_path / "out.parquet"
+    result = sql.query_to_parquet("SELECT * FROM T", path, row_group_size=5_000)
+
+    assert result.stats.row_count == 12_000
+    parquet = pq.ParquetFile(path)
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.metadata.row_group(2).num_rows == 2_000
+    table = parquet.read()
+    assert table.column_names == ["Col_Int", "Col_Str", "Col_Datetime"]
+    assert str(table.schema.field("Col_Datetime").type) == "timestamp[us]"
+    assert table.slice(0, 1).to_pylist() == [
+        {"Col_Int": 1, "Col_Str": "Hello", "Col_Datetime": datetime(2021, 7, 7, 9, 49)}
+    ]
+
+
+def test_write_parquet_types():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    tz = timezone(timedelta(hours=1))
+    chunks = [
+        [
+            (None, Decimal("1.5"), datetime(2021, 1, 1, tzinfo=tz), b"\x00"),
+            (None, Decimal("-2.25"), None, None),
+        ]
+    ]
+    fileobj = io.BytesIO()
+    rows = write_parquet(fileobj, ("A", "B", "C", "D"), (1, 5, 2, 2), chunks)
+    assert rows == 2
+
+    table = pq.read_table(io.BytesIO(fileobj.getvalue()))
+    assert table.schema.types == [
+        pa.string(),
+        pa.decimal128(38, 2),
+        pa.timestamp("us", tz="+01:00"),
+        pa.binary(),
+    ]
+    assert table.column("B").to_pylist() == [Decimal("1.50"), Decimal("-2.25")]
+    assert table.column("C").to_pylist()[0] == datetime(2021, 1, 1, tzinfo=tz)
+
+
+def test_write_parquet_empty():
+    pq = pytest.importorskip("pyarrow.parquet")
+    fileobj = io.BytesIO()
+    assert write_parquet(fileobj, ("A",), (3,), iter([])) == 0
+    table = pq.read_table(io.BytesIO(fileobj.getvalue()))
+    assert table.column_names == ["A"]
+    assert table.num_rows == 0
+
+
+def test_build_numpy_columns():
+    np = pytest.importorskip("numpy")
+    aware = datetime(2021, 7, 7, 9, 49, tzinfo=timezone(timedelta(hours=1)))
+    chunks = [
+        [(None, None, None, None), (None, "a", aware, None)],
+        [(3, None, aware, None)],
+        [(4, "bcd", None, None)],
+    ]
+    columns = build_numpy_columns(["a", "b", "c", "d"], [3, 1, 4, 2], chunks)
+
+    assert columns["a"].dtype == np.int64
+    assert columns["a"].tolist() == [None, None, 3, 4]
+    assert columns["b"].dtype == np.dtype("U3")
+    assert columns["b"].tolist() == [None, "a", None, "bcd"]
+    assert columns["c"].dtype == np.dtype("datetime64[us]")
+    assert columns["c"][1] == np.datetime64("2021-07-07T08:49")
+    assert columns["c"].mask.tolist() == [True, False, False, True]
+    # entirely NULL, so the dtype comes from the source type
+    assert columns["d"].dtype == np.dtype("O")
+    assert columns["d"].mask.all()
+
+
+def test_database_result_to_numpy():
+    np = pytest.importorskip("numpy")
+    result = sql.query("SELECT * FROM T")
+
+    columns = result.to_numpy()
+    assert list(columns) == ["Col_Int", "Col_Str", "Col_Datetime"]
+    assert not any(isinstance(x, np.ma.MaskedArray) for x in columns.values())
+    assert columns["Col_Int"].sum() == 12_000
+    assert columns["Col_Datetime"][-1] == np.datetime64("2021-07-07T09:49")
+
+    array = result.to_numpy(structured=True)
+    assert not isinstance(array, np.ma.MaskedArray)
+    assert array.dtype.names == ("Col_Int", "Col_Str", "Col_Datetime")
+    assert array[0]["Col_Str"] == "Hello"
+    assert len(array) == 12_000
+
+
+def test_query_to_numpy():
+    np = pytest.importorskip("numpy")
+    columns = sql.query_to_numpy("SELECT * FROM T")
+    assert list(columns) == ["Col_Int", "Col_Str", "Col_Datetime"]
+    assert columns["Col_Int"].sum() == 12_000
+
+    array = sql.query_to_numpy("SELECT * FROM T", structured=True)
+    assert np.array_equal(array, sql.query("SELECT * FROM T").to_numpy(True))
+
+
+def test_database_result_to_numpy_nulls():
+    np = pytest.importorskip("numpy")
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(
+            row_count=2, description=DESCRIPTION, row=[(None, "a", None)]
+        ),
+    )
+
+    array = result.to_numpy(structured=True)
+    assert isinstance(array, np.ma.MaskedArray)
+    assert array.mask["Col_Int"].all()
+    assert not array.mask["Col_Str"].any()
+    assert array["Col_Str"].tolist() == ["a", "a"]
+
+
+def test_build_polars_frame():
+    pl = pytest.importorskip("polars")
+    aware = datetime(2021, 7, 7, 9, 49, tzinfo=timezone(timedelta(hours=1)))
+    rows = [(None, Decimal("1.50"), aware, None), (2, None, None, None)]
+    frame = build_polars_frame(["a", "b", "c", "d"], [3, 5, 2, 1], rows)
+
+    assert frame.schema["a"] == pl.Int64
+    assert frame["a"].to_list() == [None, 2]
+    assert frame["b"].to_list() == [Decimal("1.50"), None]
+    assert frame.schema["c"] == pl.Datetime("us", "UTC")
+    assert frame["c"][0] == aware
+    assert frame.schema["d"] == pl.Utf8
+
+
+def test_database_result_to_polars():
+    pl = pytest.importorskip("polars")
+    result = sql.query("SELECT * FROM T")
+
+    frame = result.to_polars()
+    assert frame.columns == ["Col_Int", "Col_Str", "Col_Datetime"]
+    assert frame.schema["Col_Datetime"] == pl.Datetime("us")
+    assert frame["Col_Int"].sum() == 12_000
+
+    frames = list(result.iter_polars(chunk_size=5_000))
+    assert [len(x) for x in frames] == [5_000, 5_000, 2_000]
+    assert pl.concat(frames).equals(frame)
+
+
+def test_query_to_polars():
+    pl = pytest.importorskip("polars")
+    frames = []
+    result = sql.query_to_polars(
+        "SELECT * FROM T", frames.append, converters={"Col_Str": sql.Interned()}
+    )
+
+    assert result.stats.row_count == 12_000
+    assert len(frames) > 1
+    frame = pl.concat(frames)
+    assert frame.schema["Col_Str"] == pl.Categorical
+    assert frame["Col_Int"].sum() == 12_000
+    assert frame.drop("Col_Str").equals(
+        sql.query("SELECT * FROM T").to_polars().drop("Col_Str")
+    )
+
+
+def test_database_result_to_polars_empty():
+    pytest.importorskip("polars")
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=0, description=DESCRIPTION, row=[ROW]),
+    )
+    frame = result.to_polars()
+    assert frame.columns == ["Col_Int", "Col_Str", "Col_Datetime"]
+    assert len(frame) == 0
+    assert list(result.iter_polars()) == []
+
+
+def test_iter_polars_frames_leading_nulls(mocker):
+    pl = pytest.importorskip("polars")
+    day = date(2020, 1, 1)
+    chunks = [[(None, 1)] * 2, [(day, 2)] * 2]
+    frames = list(iter_polars_frames(("A", "B"), (2, 3), chunks))
+    assert [x.dtypes for x in frames] == [[pl.Date, pl.Int64]] * 2
+    assert pl.concat(frames)["A"].to_list() == [None, None, day, day]
+
+    # once the chunks held back run out the column falls back to its source type
+    mocker.patch("pymssqlutils.export.POLARS_DEFERRED_CHUNKS", 1)
+    with pytest.raises(ValueError, match="column 'A'"):
+        list(iter_polars_frames(("A", "B"), (2, 3), chunks))
+
+
+def test_iter_polars_frames_overflow():
+    pytest.importorskip("polars")
+    chunks = [[(1,)], [(2**64,)]]
+    # rather than silently replacing the value with a null
+    with pytest.raises(TypeError):
+        list(iter_polars_frames(("A",), (3,), chunks))
+
+
+def test_write_parquet_leading_nulls():
+    pa = pytest.importorskip("pyarrow")
+    pq = pytest.importorskip("pyarrow.parquet")
+    big = 2**53 + 1
+    chunks = [[(None, None, None)] * 2, [(date(2020, 1, 1), big, Decimal("1.125"))] * 2]
+    fileobj = io.BytesIO()
+    rows = write_parquet(fileobj, ("A", "B", "C"), (2, 3, 5), chunks, row_group_size=2)
+    assert rows == 4
+
+    parquet = pq.ParquetFile(io.BytesIO(fileobj.getvalue()))
+    assert parquet.metadata.num_row_groups == 2
+    table = parquet.read()
+    assert table.schema.types == [pa.date32(), pa.int64(), pa.decimal128(38, 3)]
+    day = date(2020, 1, 1)
+    assert table.column("A").to_pylist() == [None, None, day, day]
+    assert table.column("B").to_pylist() == [None, None, big, big]
+
+
+def test_write_parquet_deferred_limit():
+    pq = pytest.importorskip("pyarrow.parquet")
+    chunks = [[(None,)]] * 2 + [[(date(2020, 1, 1),)]]
+    # only 1 row can be held back, so the column falls back to its source type
+    with pytest.raises(ValueError, match="column 'A'"):
+        write_parquet(
+            io.BytesIO(), ("A",), (2,), chunks, row_group_size=1, max_deferred_rows=1
+        )
+
+    fileobj = io.BytesIO()
+    rows = write_parquet(
+        fileobj, ("A",), (2,), chunks, row_group_size=1, max_deferred_rows=2
+    )
+    assert rows == 3
+    table = pq.read_table(io.BytesIO(fileobj.getvalue()))
+    assert table.column("A").to_pylist() == [None, None, date(2020, 1, 1)]
+
+    fileobj = io.BytesIO()
+    assert write_parquet(fileobj, ("A",), (2,), [[(None,)]] * 3, row_group_size=1) == 3
+    table = pq.read_table(io.BytesIO(fileobj.getvalue()))
+    assert table.column("A").to_pylist() == [None, None, None]
+
+    with pytest.raises(ValueError, match="max_deferred_rows"):
+        write_parquet(io.BytesIO(), ("A",), (2,), chunks, max_deferred_rows=-1)
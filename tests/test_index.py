@@ -0,0 +1,74 @@
+import pytest
+
+from pymssqlutils import DatabaseResult, ResultIndex
+from tests.helpers import MockMultiSetCursor
+
+DESCRIPTION = (
+    ("Id", 3, None, None, None, None, None),
+    ("Country", 1, None, None, None, None, None),
+    ("Name", 1, None, None, None, None, None),
+)
+ROWS = [(1, "GB", "London"), (2, "FR", "Paris"), (3, "GB", "Leeds")]
+
+
+def _result():
+    return DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockMultiSetCursor(
+            row_count=(1, 1),
+            description=(DESCRIPTION, DESCRIPTION[:1]),
+            row=(ROWS, [(10,)]),
+        ),
+    )
+
+
+def test_unique_index():
+    index = ResultIndex(("Id", "Country", "Name"), ROWS, ["Id"])
+    assert len(index) == 3
+    assert 2 in index
+    assert index.get(2) == (2, "FR", "Paris")
+    assert index.get(4) is None
+    assert index.get(4, default=()) == ()
+    assert index.get(1, as_dict=True) == {"Id": 1, "Country": "GB", "Name": "London"}
+    assert index.get_all(3) == [(3, "GB", "Leeds")]
+    assert index.get_all(4) == []
+
+
+def test_non_unique_index():
+    index = ResultIndex(("Id", "Country", "Name"), ROWS, ["Country"], unique=False)
+    assert sorted(index) == ["FR", "GB"]
+    assert index.get("GB") == (1, "GB", "London")
+    assert index.get_all("GB") == [(1, "GB", "London"), (3, "GB", "Leeds")]
+    assert index.get_all("GB", as_dict=True)[1]["Name"] == "Leeds"
+
+
+def test_composite_index():
+    index = ResultIndex(("Id", "Country", "Name"), ROWS, ["Country", "Name"])
+    assert index.get(("GB", "Leeds")) == (3, "GB", "Leeds")
+    assert index.get(("FR", "Leeds")) is None
+
+
+def test_index_errors():
+    with pytest.raises(ValueError, match="duplicate key 'GB'"):
+        ResultIndex(("Id", "Country", "Name"), ROWS, ["Country"])
+    with pytest.raises(ValueError, match="not in the result set"):
+        ResultIndex(("Id", "Country", "Name"), ROWS, ["Missing"])
+    with pytest.raises(ValueError):
+        ResultIndex(("Id", "Country", "Name"), ROWS, [])
+
+
+def test_index_by():
+    result = _result()
+    index = result.index_by("Id")
+    assert index.get(1)[2] == "London"
+    assert result.index_by("Id") is index
+    assert result.index_by("Id", unique=False) is not index
+
+    # the cache is invalidated when the result set changes
+    result.next_set()
+    assert result.index_by("Id").get(10) == (10,)
+    result.previous_set()
+    assert result.index_by("Id") is not index
+    assert result.index_by("Id").get(1)[2] == "London"
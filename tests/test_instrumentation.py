@@ -0,0 +1,242 @@
+import logging
+import re
+
+import pymssql
+import pytest
+from pytest_mock import MockerFixture
+
+import pymssqlutils as sql
+from tests.helpers import MockCursor
+
+
+@pytest.fixture(autouse=True)
+def set_env(monkeypatch):
+    monkeypatch.setenv("MSSQL_SERVER", "server")
+    monkeypatch.setenv("MSSQL_DATABASE", "database")
+
+
+@pytest.fixture(autouse=True)
+def reset_hooks():
+    yield
+    sql.clear_hooks()
+    sql.configure_hooks()
+    sql.disable_slow_query_log()
+
+
+@pytest.fixture
+def connect(mocker: MockerFixture):
+    connect = mocker.patch("pymssqlutils.methods.sql.connect")
+    connect.return_value._conn.tds_version_tuple = (7, 4)
+    connect.return_value.cursor.return_value = MockCursor(row_count=3)
+    return connect
+
+
+def test_hooks_called_in_order(connect):
+    events = []
+    for event in sql.instrumentation.HOOK_EVENTS:
+        sql.register_hook(event, events.append)
+
+    sql.query("SELECT %s val", (1,))
+
+    assert [event.event for event in events] == [
+        "before_connect",
+        "after_connect",
+        "before_execute",
+        "after_execute",
+        "after_fetch",
+    ]
+    assert events[2].operation == "SELECT %s val"
+    assert events[2].statement == "SELECT 1 val"
+    assert events[2].server == "server"
+    assert events[2].database == "database"
+    assert events[-1].stats.row_count == 3
+    assert events[-1].duration > 0
+
+
+def test_hooks_no_fetch_event_on_execute(connect):
+    events = []
+    sql.register_hook("after_fetch", events.append)
+    sql.execute("INSERT INTO tbl VALUES (1)")
+    assert events == []
+
+
+def test_hooks_batched(connect):
+    events = []
+    sql.register_hook("after_execute", events.append)
+    sql.execute(["SELECT 1", "SELECT 2", "SELECT 3"], batch_size=2)
+    assert [event.operation for event in events] == ["SELECT 1", "SELECT 3"]
+    assert events[0].statement == "SELECT 1\n;SELECT 2"
+
+
+def test_hooks_on_error(connect, mocker: MockerFixture):
+    mocker.patch.object(
+        MockCursor, "execute", side_effect=pymssql.OperationalError("bad")
+    )
+    events = []
+    sql.register_hook("on_error", events.append)
+
+    result = sql.query("SELECT 1", raise_errors=False)
+
+    assert not result.ok
+    assert len(events) == 1
+    assert events[0].operation == "SELECT 1"
+    assert isinstance(events[0].error, pymssql.OperationalError)
+
+
+def test_hooks_statement_redaction(connect):
+    events = []
+    sql.register_hook("before_execute", events.append)
+
+    sql.configure_hooks(statement_redactor=lambda statement: "redacted")
+    sql.query("SELECT %s val", ("secret",))
+    sql.configure_hooks(include_statement=False)
+    sql.query("SELECT %s val", ("secret",))
+
+    assert events[0].statement == "redacted"
+    assert events[1].statement is None
+
+
+def test_hook_errors_are_logged(connect, caplog):
+    def bad_hook(event):
+        raise RuntimeError("bad hook")
+
+    sql.register_hook("before_execute", bad_hook)
+    result = sql.query("SELECT 1")
+    assert result.ok
+    assert "bad hook" in caplog.text
+
+
+def test_register_unknown_hook():
+    with pytest.raises(ValueError):
+        sql.register_hook("before_everything", print)
+
+
+def test_unregister_hook(connect):
+    events = []
+    sql.register_hook("before_execute", events.append)
+    sql.unregister_hook("before_execute", events.append)
+    sql.query("SELECT 1")
+    assert events == []
+
+
+def test_slow_query_log(connect, caplog):
+    sql.enable_slow_query_log(threshold=0)
+    with caplog.at_level(logging.WARNING, logger="pymssqlutils.slow_query"):
+        sql.query("SELECT %s val", (1,))
+
+    assert len(caplog.records) == 1
+    record = caplog.records[0]
+    assert "Slow query" in record.message
+    assert "SELECT 1 val" in record.message
+    assert record.slow_query["server"] == "server"
+    assert record.slow_query["database"] == "database"
+    assert record.slow_query["row_count"] == 3
+
+
+def test_slow_query_log_under_threshold(connect, caplog):
+    sql.enable_slow_query_log(threshold=60)
+    with caplog.at_level(logging.WARNING, logger="pymssqlutils.slow_query"):
+        sql.query("SELECT 1")
+    assert not caplog.records
+
+
+def test_slow_query_log_sampling(connect, caplog):
+    sql.enable_slow_query_log(threshold=None, sample_rate=1)
+    with caplog.at_level(logging.WARNING, logger="pymssqlutils.slow_query"):
+        sql.execute("SELECT %s", [1, 2, 3, 4], batch_size=2)
+    assert len(caplog.records) == 1
+    assert "Sampled query" in caplog.records[0].message
+    assert (
+        caplog.records[0].slow_query["statement"]
+        == "SELECT 1\n;SELECT 2\n;SELECT 3\n;SELECT 4"
+    )
+
+
+def test_slow_query_log_redaction_and_truncation(connect, caplog):
+    sql.enable_slow_query_log(
+        threshold=0,
+        statement_redactor=lambda statement: statement.replace("secret", "***"),
+        max_statement_length=25,
+    )
+    with caplog.at_level(logging.WARNING, logger="pymssqlutils.slow_query"):
+        sql.execute("SELECT %s val", ["secret"] * 10)
+    assert caplog.records[0].slow_query["statement"] == "SELECT N'***' val\n;SELECT..."
+
+
+def test_slow_query_log_redacts_before_truncating(connect, caplog):
+    sql.enable_slow_query_log(
+        threshold=0,
+        statement_redactor=lambda statement: re.sub(r"N'[^']*'", "N'***'", statement),
+        max_statement_length=25,
+    )
+    with caplog.at_level(logging.WARNING, logger="pymssqlutils.slow_query"):
+        sql.execute("SELECT 1 WHERE pw = %s", ("hunter2-very-secret-token",))
+    # the cut falls inside the literal
+    assert caplog.records[0].slow_query["statement"] == "SELECT 1 WHERE pw = N'***..."
+
+
+def test_slow_query_log_invalid_settings():
+    with pytest.raises(ValueError):
+        sql.enable_slow_query_log(threshold=-1)
+    with pytest.raises(ValueError):
+        sql.enable_slow_query_log(sample_rate=2)
+
+
+STATISTICS_MESSAGES = [
+    b"SQL Server parse and compile time: \n   CPU time = 3 ms, elapsed time = 4 ms.",
+    b"Table 'Orders'. Scan count 1, logical reads 25, physical reads 2, "
+    b"page server reads 0, read-ahead reads 8, lob logical reads 0.",
+    b"Table 'Customers'. Scan count 2, logical reads 10, physical reads 0.",
+    b"Table 'Orders'. Scan count 1, logical reads 5, physical reads 0.",
+    b" SQL Server Execution Times:\n   CPU time = 16 ms,  elapsed time = 20 ms.",
+    b"Warning: Null value is eliminated by an aggregate or other SET operation.",
+]
+
+
+def test_server_statistics_parsing():
+    server_stats = sql.ServerStatistics()
+    for message in STATISTICS_MESSAGES:
+        server_stats._message_handler(0, 0, b"server", b"", 1, message)
+
+    assert len(server_stats.messages) == 6
+    assert server_stats.table_reads["Orders"] == {
+        "scan_count": 2,
+        "logical_reads": 30,
+        "physical_reads": 2,
+        "page_server_reads": 0,
+        "read_ahead_reads": 8,
+        "lob_logical_reads": 0,
+    }
+    assert server_stats.logical_reads == 40
+    assert server_stats.physical_reads == 2
+    assert server_stats.cpu_time_ms == 16
+    assert server_stats.elapsed_time_ms == 20
+    assert server_stats.compile_cpu_time_ms == 3
+    assert server_stats.compile_elapsed_time_ms == 4
+
+
+def test_query_server_statistics(connect, mocker: MockerFixture):
+    def execute(self, operation, parameters=None):
+        self.executions.append((operation, parameters))
+        handler = connect.return_value._conn.set_msghandler.call_args[0][0]
+        for message in STATISTICS_MESSAGES:
+            handler(0, 0, b"server", b"", 1, message)
+
+    mocker.patch.object(MockCursor, "execute", execute)
+
+    result = sql.query("SELECT 1", server_statistics=True)
+
+    assert connect.return_value.cursor.return_value.executions[0] == (
+        "SET STATISTICS IO, TIME ON",
+        None,
+    )
+    assert result.stats.statement_count == 1
+    # the mock sends the messages on both the SET and the SELECT
+    assert result.server_stats.logical_reads == 80
+    assert result.server_stats.cpu_time_ms == 32
+
+
+def test_query_no_server_statistics(connect):
+    result = sql.query("SELECT 1")
+    assert result.server_stats is None
+    connect.return_value._conn.set_msghandler.assert_not_called()
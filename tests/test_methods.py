@@ -1,12 +1,18 @@
-from datetime import datetime, timedelta, timezone
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+
+import pytest
 
 from pymssqlutils import (
+    build_in_list,
     model_to_values,
+    models_to_rows,
+    models_to_values,
     set_connection_details,
     substitute_parameters,
     to_sql_list,
 )
-from pymssqlutils.methods import _with_conn_details
+from pymssqlutils.methods import _to_sql_literal, _with_conn_details
 
 
 def test_with_conn_details_from_args():
@@ -129,3 +135,156 @@ def test_to_sql_list():
         )
         == "(1.23, N'2020-06-01T12:30:00-01:00', N'hello', 1, NULL)"
     )
+
+
+def test_to_sql_list_int():
+    assert to_sql_list([1, -2, 3]) == "(1, -2, 3)"
+    assert to_sql_list([1, True]) == "(1, 1)"
+
+
+def test_build_in_list():
+    operation = "SELECT * FROM T WHERE Id IN {values} AND Name = %s"
+    assert (
+        build_in_list(operation, [1, 2, 2, 3], parameters=("a",))
+        == "SELECT * FROM T WHERE Id IN (1, 2, 3) AND Name = N'a'"
+    )
+
+    statement = build_in_list(operation, range(2_500), parameters=("a",))
+    lines = statement.splitlines()
+    assert lines[2] == "CREATE TABLE #in_list ([value] BIGINT PRIMARY KEY);"
+    assert len(lines) == 7
+    assert lines[3].startswith("INSERT INTO #in_list ([value]) VALUES (0), (1), ")
+    assert lines[5].endswith(", (2499);")
+    assert lines[5].count("(") == 500 + 1
+    assert lines[6] == (
+        "SELECT * FROM T WHERE Id IN (SELECT [value] FROM #in_list) AND Name = N'a'"
+    )
+
+
+def test_build_in_list_types():
+    statement = build_in_list("{values}", ["a, b", "it's", None], threshold=1)
+    assert (
+        "CREATE TABLE #in_list ([value] NVARCHAR(4) COLLATE DATABASE_DEFAULT);"
+        in statement
+    )
+    assert "VALUES (N'a, b'), (N'it''s');" in statement
+
+    # values equal under a case insensitive collation don't violate a key
+    statement = build_in_list("{values}", ["abc", "ABC", "abc "], threshold=1)
+    assert "VALUES (N'abc'), (N'ABC'), (N'abc ');" in statement
+    assert "PRIMARY KEY" not in statement
+
+    # lengths are in UTF-16 code units
+    statement = build_in_list("{values}", ["\U0001f600\U0001f600", "a"], threshold=1)
+    assert "[value] NVARCHAR(4) COLLATE DATABASE_DEFAULT" in statement
+
+    statement = build_in_list(
+        "{values}", ["x" * 5000, "y"], threshold=1, table_name="#t"
+    )
+    assert (
+        "CREATE TABLE #t ([value] NVARCHAR(MAX) COLLATE DATABASE_DEFAULT);" in statement
+    )
+
+    statement = build_in_list(
+        "{values}", [date(2020, 1, 1)] * 2, threshold=0, sql_type="DATE"
+    )
+    assert "CREATE TABLE #in_list ([value] DATE PRIMARY KEY);" in statement
+
+    statement = build_in_list("{values}", [1.5, 2.5], threshold=1, sql_type="FLOAT")
+    assert "VALUES (1.5), (2.5);" in statement
+
+    with pytest.raises(ValueError, match="sql_type"):
+        build_in_list("{values}", [1.5, 2.5], threshold=1)
+    with pytest.raises(ValueError, match="marker"):
+        build_in_list("SELECT 1", [1])
+
+
+class Model:
+    def __init__(self, id, name):
+        self.id = id
+        self.name = name
+
+
+def test_models_to_rows():
+    assert models_to_rows([Model(1, "a"), Model(2, None)]) == (
+        ["id", "name"],
+        [(1, "a"), (2, None)],
+    )
+    assert models_to_rows([]) == ([], [])
+    with pytest.raises(ValueError, match="model 1 has the columns"):
+        models_to_rows([{"id": 1, "name": "a"}, {"name": "b", "id": 2}])
+    with pytest.raises(ValueError):
+        models_to_rows([{"id": 1}, {"id": 2, "name": "b"}])
+
+
+def test_models_to_values():
+    models = [
+        {
+            "text": "50%",
+            "datetime": datetime(2020, 6, 1, 12, 30, tzinfo=timezone.utc),
+            "bool": True,
+        },
+        {"text": None, "datetime": None, "bool": False},
+    ]
+    assert models_to_values(models) == [
+        "([text], [datetime], [bool]) VALUES "
+        "(N'50%', N'2020-06-01T12:30:00+00:00', 1), (NULL, NULL, 0)"
+    ]
+    assert models_to_values(models, chunk_size=1) == [
+        "([text], [datetime], [bool]) VALUES "
+        "(N'50%', N'2020-06-01T12:30:00+00:00', 1)",
+        "([text], [datetime], [bool]) VALUES (NULL, NULL, 0)",
+    ]
+    # each row matches model_to_values
+    assert models_to_values(models[1:]) == [model_to_values(models[1])]
+    assert models_to_values([]) == []
+
+
+def test_models_to_values_prepend_append():
+    models = [Model(1, "a"), Model(2, "b")]
+    assert models_to_values(
+        models, prepend=[("batch", "@batch")], append=[("note", "'100%'")]
+    ) == [
+        "([batch], [id], [name], [note]) VALUES "
+        "(@batch, 1, N'a', '100%'), (@batch, 2, N'b', '100%')"
+    ]
+
+
+def test_models_to_values_chunks():
+    models = [{"id": idx} for idx in range(2_500)]
+    statements = models_to_values(models)
+    assert len(statements) == 3
+    assert statements[2] == "([id]) VALUES " + ", ".join(
+        f"({idx})" for idx in range(2_000, 2_500)
+    )
+    with pytest.raises(ValueError):
+        models_to_values(models, chunk_size=1_001)
+
+
+def test_to_sql_literal():
+    values = [
+        None,
+        True,
+        False,
+        0,
+        -5,
+        10**30,
+        1.23,
+        1e20,
+        1e-7,
+        -0.0,
+        float("inf"),
+        "",
+        "it's",
+        "'';--",
+        "ü",
+        "%s",
+        b"\x00\xff",
+        Decimal("1.50"),
+        date(2020, 6, 1),
+        time(12, 30, 1, 5),
+        datetime(2020, 6, 1, 12, 30),
+        datetime(2020, 6, 1, 12, 30, tzinfo=timezone(timedelta(hours=-1))),
+    ]
+    for value in values:
+        assert _to_sql_literal(value) == substitute_parameters("%s", (value,))
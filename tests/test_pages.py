@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+import pymssql
+import pytest
+
+import pymssqlutils as sql
+from pymssqlutils.methods import _keyset_statement
+
+OPERATION = "SELECT Id, Name FROM T"
+DESCRIPTION = (
+    ("Id", 3, None, None, None, None, None),
+    ("Name", 1, None, None, None, None, None),
+)
+ROWS = [(idx, f"name{idx}") for idx in range(1, 8)]
+
+
+@pytest.fixture(autouse=True)
+def replay():
+    def page(last_key, rows):
+        return _keyset_statement(OPERATION, ["Id"], 3, last_key), [(DESCRIPTION, rows)]
+
+    sql.set_driver(
+        sql.ReplayDriver(
+            dict(
+                [
+                    page(None, ROWS[:3]),
+                    page((3,), ROWS[3:6]),
+                    page((6,), ROWS[6:]),
+                ]
+            )
+        )
+    )
+    yield
+    sql.set_driver(None)
+
+
+def test_keyset_statement():
+    assert _keyset_statement(OPERATION, ["Id"], 3, None) == (
+        "SELECT TOP (3) * FROM (\nSELECT Id, Name FROM T\n) AS [_page] ORDER BY [Id]"
+    )
+    assert _keyset_statement(OPERATION, ["A", "B", "C"], 10, (1, "x", 2)) == (
+        "SELECT TOP (10) * FROM (\nSELECT Id, Name FROM T\n) AS [_page] WHERE "
+        "([A] > 1) OR ([A] = 1 AND [B] > N'x') OR ([A] = 1 AND [B] = N'x' AND [C] > 2) "
+        "ORDER BY [A], [B], [C]"
+    )
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_query_pages(prefetch):
+    pages = list(
+        sql.query_pages(OPERATION, "Id", page_size=3, prefetch=prefetch, server="s")
+    )
+    assert [x.raw_data for x in pages] == [ROWS[:3], ROWS[3:6], ROWS[6:]]
+    assert pages[0].columns == ("Id", "Name")
+    assert all(x.stats.statement_count == 1 for x in pages)
+
+
+def test_query_pages_rows():
+    assert list(sql.query_pages(OPERATION, ["Id"], 3, rows=True, server="s")) == ROWS
+
+
+def test_query_pages_close_early():
+    pages = sql.query_pages(OPERATION, "Id", page_size=3, prefetch=True, server="s")
+    assert next(pages).raw_data == ROWS[:3]
+    pages.close()
+
+
+def test_query_pages_empty_last_page():
+    sql.set_driver(
+        sql.ReplayDriver(
+            {
+                _keyset_statement(OPERATION, ["Id"], 3, None): [
+                    (DESCRIPTION, ROWS[:3])
+                ],
+                _keyset_statement(OPERATION, ["Id"], 3, (3,)): [(DESCRIPTION, [])],
+            }
+        )
+    )
+    pages = list(sql.query_pages(OPERATION, "Id", page_size=3, server="s"))
+    assert [x.raw_data for x in pages] == [ROWS[:3]]
+
+
+def test_query_pages_decimal_key():
+    description = (("Id", 5, None, None, None, None, None),)
+    key = Decimal("12345678901234567.89")
+    sql.set_driver(
+        sql.ReplayDriver(
+            {
+                _keyset_statement(OPERATION, ["Id"], 1, None): [
+                    (description, [(key,)])
+                ],
+                _keyset_statement(OPERATION, ["Id"], 1, (key,)): [(description, [])],
+            }
+        )
+    )
+    pages = list(
+        sql.query_pages(OPERATION, "Id", page_size=1, converters={5: float}, server="s")
+    )
+    assert [x.raw_data for x in pages] == [[(key,)]]
+
+
+def test_query_pages_errors():
+    with pytest.raises(ValueError):
+        list(sql.query_pages(OPERATION, [], server="s"))
+
+    with pytest.raises(pymssql.OperationalError):
+        list(sql.query_pages("SELECT 1", "Id", server="s"))
+    pages = list(sql.query_pages("SELECT 1", "Id", raise_errors=False, server="s"))
+    assert len(pages) == 1
+    assert not pages[0].ok
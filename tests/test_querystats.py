@@ -0,0 +1,89 @@
+import pytest
+from pytest_mock import MockerFixture
+
+import pymssqlutils as sql
+from pymssqlutils.instrumentation import ExecutionStats
+from pymssqlutils.querystats import RESERVOIR_SIZE, _Aggregate
+from tests.helpers import MockCursor
+
+
+@pytest.fixture(autouse=True)
+def set_env(monkeypatch):
+    monkeypatch.setenv("MSSQL_SERVER", "server")
+
+
+@pytest.fixture(autouse=True)
+def query_stats():
+    sql.enable_query_stats()
+    yield
+    sql.disable_query_stats()
+    sql.reset_query_stats()
+
+
+@pytest.fixture
+def connect(mocker: MockerFixture):
+    connect = mocker.patch("pymssqlutils.methods.sql.connect")
+    connect.return_value._conn.tds_version_tuple = (7, 4)
+    connect.return_value.cursor.side_effect = lambda: MockCursor(row_count=3)
+    return connect
+
+
+@pytest.mark.parametrize(
+    "operation, expected",
+    [
+        (
+            "SELECT * FROM T1 WHERE Id IN (1, 2,3) AND Name = %s",
+            "SELECT * FROM T1 WHERE Id IN (?) AND Name = ?",
+        ),
+        ("SELECT N'it''s', 'x', 0xFF, 1.5e3, NULL", "SELECT ?, ?, ?, ?, ?"),
+        ("SELECT %(id)s  -- comment\n  FROM /* inline */ T", "SELECT ? FROM T"),
+        ("INSERT INTO T ([a]) VALUES (1), (2),(3)", "INSERT INTO T ([a]) VALUES (?)"),
+        (
+            "SELECT Col1 - 1 FROM #Temp2 WHERE @Var1 = 2",
+            "SELECT Col1 - ? FROM #Temp2 WHERE @Var1 = ?",
+        ),
+    ],
+)
+def test_fingerprint(operation, expected):
+    assert sql.fingerprint(operation) == expected
+
+
+def test_query_stats_aggregation(connect):
+    sql.query("SELECT * FROM T WHERE Id = %s", (1,))
+    sql.query("SELECT * FROM T WHERE Id = 2")
+    sql.execute("UPDATE T SET Val = %s", [1, 2, 3], batch_size=2)
+
+    stats = {x.fingerprint: x for x in sql.get_query_stats()}
+
+    assert set(stats) == {"SELECT * FROM T WHERE Id = ?", "UPDATE T SET Val = ?"}
+    select_stats = stats["SELECT * FROM T WHERE Id = ?"]
+    assert select_stats.calls == 2
+    assert select_stats.row_count == 6
+    assert select_stats.total_time > 0
+    assert select_stats.decode_time > 0
+    assert 0 < select_stats.p50_time <= select_stats.p99_time <= select_stats.max_time
+    assert select_stats.mean_time == select_stats.total_time / 2
+    assert stats["UPDATE T SET Val = ?"].calls == 1
+
+
+def test_query_stats_reset_and_disable(connect):
+    sql.query("SELECT 1")
+    sql.reset_query_stats()
+    assert sql.get_query_stats() == []
+
+    sql.disable_query_stats()
+    sql.query("SELECT 1")
+    assert sql.get_query_stats() == []
+
+
+def test_query_stats_reservoir():
+    aggregate = _Aggregate()
+    stats = ExecutionStats()
+    for idx in range(RESERVOIR_SIZE * 2):
+        stats.execute_time = idx
+        aggregate.add(stats)
+
+    snapshot = aggregate.snapshot("fp")
+    assert len(aggregate.samples) == RESERVOIR_SIZE
+    assert snapshot.calls == RESERVOIR_SIZE * 2
+    assert snapshot.max_time == RESERVOIR_SIZE * 2 - 1
@@ -0,0 +1,123 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+
+from pymssqlutils import DatabaseResult
+from pymssqlutils.serialization import ColumnarRows
+from tests.helpers import MockCursor, MockMultiSetCursor, cursor_description
+
+MIXED_DESCRIPTION = (
+    ("Col_Mixed", 3, None, None, None, None, None),
+    ("Col_Decimal", 5, None, None, None, None, None),
+    ("Col_Tz", 2, None, None, None, None, None),
+)
+
+
+def _result_from_rows(rows, description=MIXED_DESCRIPTION):
+    # builds a result with arbitrary (already decoded) rows
+    return DatabaseResult._from_result_sets(
+        [(rows, tuple(x[0] for x in description), tuple(x[1] for x in description))]
+    )
+
+
+def test_round_trip():
+    result = DatabaseResult(
+        ok=True, fetch=True, commit=False, cursor=MockCursor(row_count=3)
+    )
+    loaded = DatabaseResult.from_bytes(result.to_bytes())
+
+    assert isinstance(loaded.raw_data, ColumnarRows)
+    assert loaded.columns == result.columns
+    assert loaded.source_types == result.source_types
+    assert loaded.raw_data == result.raw_data
+    assert list(loaded) == result.raw_data
+    assert loaded.raw_data[-1] == result.raw_data[-1]
+    assert loaded.raw_data[1:] == result.raw_data[1:]
+    assert loaded.data == result.data
+    assert (loaded.ok, loaded.fetch, loaded.commit) == (True, True, False)
+
+
+def test_round_trip_nulls_and_objects():
+    tz = timezone(timedelta(hours=-5, minutes=-30))
+    rows = [
+        (1, Decimal("1.10"), datetime(2021, 7, 7, 9, 49, tzinfo=tz)),
+        ("two", None, None),
+        (None, Decimal("-3"), datetime(1900, 1, 1, tzinfo=timezone.utc)),
+    ]
+    loaded = DatabaseResult.from_bytes(_result_from_rows(rows).to_bytes())
+
+    assert loaded.raw_data == rows
+    assert [loaded.raw_data[i] for i in range(3)] == rows
+    assert loaded.raw_data[0][2].utcoffset() == tz.utcoffset(None)
+    assert [x.kind for x in loaded.raw_data._columns] == [
+        "object",
+        "decimal",
+        "datetimetz",
+    ]
+
+
+def test_round_trip_multi_set():
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=True,
+        cursor=MockMultiSetCursor(
+            row_count=(2, 0),
+            description=(cursor_description[:3], cursor_description[10:11]),
+            row=([(1, 2, 3)], [("Hello",)]),
+        ),
+    )
+    loaded = DatabaseResult.from_bytes(memoryview(result.to_bytes()))
+
+    assert loaded.commit
+    assert loaded.set_count == 2
+    assert loaded.raw_data == [(1, 2, 3), (1, 2, 3)]
+    assert loaded.next_set()
+    assert loaded.columns == ("Col_Text",)
+    assert loaded.raw_data == []
+    assert loaded.to_dataframe().empty
+
+
+def test_round_trip_no_fetch():
+    result = DatabaseResult(ok=True, fetch=False, commit=True)
+    loaded = DatabaseResult.from_bytes(result.to_bytes())
+    assert not loaded.fetch
+    with pytest.raises(ValueError):
+        loaded.raw_data
+
+
+def test_serialization_errors():
+    with pytest.raises(ValueError):
+        DatabaseResult(ok=False, fetch=True, commit=False).to_bytes()
+    with pytest.raises(ValueError):
+        DatabaseResult.from_bytes(b"not a result")
+
+
+def _sum_from_shared_memory(name):
+    result = DatabaseResult.from_shared_memory(name)
+    return result.columns[0], sum(row[0] for row in result)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 8), reason="requires Python 3.8+")
+def test_shared_memory():
+    result = DatabaseResult(
+        ok=True, fetch=True, commit=False, cursor=MockCursor(row_count=100)
+    )
+    block = result.to_shared_memory()
+    try:
+        loaded = DatabaseResult.from_shared_memory(block.name)
+        assert loaded.columns == result.columns
+        assert loaded.raw_data == result.raw_data
+        rows = loaded.raw_data
+        del loaded
+        assert rows[-1] == result.raw_data[-1]
+
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            sums = list(pool.map(_sum_from_shared_memory, [block.name] * 2))
+        assert sums == [("Col_Int", 100)] * 2
+    finally:
+        block.close()
+        block.unlink()
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pymssqlutils as sql
+from pymssqlutils import DatabaseResult
+from pymssqlutils.spill import SpilledRows
+from tests.helpers import MockCursor
+
+DESCRIPTION = (
+    ("Col_Int", 3, None, None, None, None, None),
+    ("Col_Str", 1, None, None, None, None, None),
+)
+ROW = [(1, "Hello World")]
+
+
+@pytest.fixture(autouse=True)
+def set_env(monkeypatch):
+    monkeypatch.setenv("MSSQL_SERVER", "server")
+
+
+@pytest.fixture(autouse=True)
+def reset_driver():
+    yield
+    sql.set_driver(None)
+
+
+def _result(row_count, memory_budget=None):
+    return DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=row_count, description=DESCRIPTION, row=ROW),
+        memory_budget=memory_budget,
+    )
+
+
+def test_no_spill_under_budget():
+    result = _result(100, memory_budget=10 * 1024**2)
+    assert isinstance(result.raw_data, list)
+    assert len(result.raw_data) == 100
+
+
+def test_spill_over_budget():
+    expected = _result(12_000)
+    result = _result(12_000, memory_budget=1024)
+
+    assert isinstance(result.raw_data, SpilledRows)
+    assert result.raw_data.spilled_count == 12_000
+    assert len(result.raw_data) == 12_000
+    assert result.stats.row_count == 12_000
+
+    assert result.raw_data == expected.raw_data
+    assert list(result) == expected.raw_data
+    assert result.data == expected.data
+    assert result.to_json() == expected.to_json()
+    assert result.to_dataframe().equals(expected.to_dataframe())
+
+
+def test_spill_after_first_chunk():
+    # a row is estimated at ~150 bytes, so only the first chunk fits in the budget
+    result = _result(12_000, memory_budget=1_000_000)
+    assert isinstance(result.raw_data, SpilledRows)
+    assert result.raw_data.spilled_count == 7_000
+    assert result.raw_data[4_999] == (1, "Hello World")
+    assert result.raw_data[5_000] == (1, "Hello World")
+
+
+def test_spilled_rows_indexing():
+    spilled = SpilledRows([(0,), (1,)])
+    spilled._append([(2,), (3,), (4,)])
+    spilled._append([(5,)])
+
+    assert len(spilled) == 6
+    assert spilled.spilled_count == 4
+    assert [spilled[i] for i in range(6)] == [(i,) for i in range(6)]
+    assert spilled[-1] == (5,)
+    assert spilled[1:5] == [(1,), (2,), (3,), (4,)]
+    assert spilled[::-2] == [(5,), (3,), (1,)]
+    assert list(spilled) == [(i,) for i in range(6)]
+    assert (4,) in spilled
+
+    with pytest.raises(IndexError):
+        spilled[6]
+
+    spilled.close()
+
+
+def test_spilled_rows_concurrent_reads():
+    spilled = SpilledRows([])
+    for start in range(0, 2_000, 100):
+        spilled._append([(idx,) for idx in range(start, start + 100)])
+
+    def read(offset):
+        # alternate between chunks so that the cached chunk keeps changing
+        return all(
+            spilled[idx][0] == idx for idx in range(offset, 2_000, 97) for _ in range(3)
+        )
+
+    with ThreadPoolExecutor(8) as pool:
+        assert all(pool.map(read, range(97)))
+    spilled.close()
+
+
+def test_query_memory_budget():
+    sql.set_driver(
+        sql.ReplayDriver({"SELECT 1": [(DESCRIPTION, ROW * 12_000)]}),
+    )
+    result = sql.query("SELECT 1", server="replay", memory_budget=1024)
+    assert isinstance(result.raw_data, SpilledRows)
+    assert result.raw_data[-1] == (1, "Hello World")
@@ -0,0 +1,113 @@
+import pytest
+
+from pymssqlutils import ChainedRows, DatabaseResult, RowsView
+from pymssqlutils.spill import SpilledRows
+from tests.helpers import MockCursor
+
+DESCRIPTION = (
+    ("Col_Int", 3, None, None, None, None, None),
+    ("Col_Str", 1, None, None, None, None, None),
+)
+
+
+def _result(rows, description=DESCRIPTION):
+    result = DatabaseResult._from_result_sets(
+        [(rows, tuple(x[0] for x in description), tuple(x[1] for x in description))]
+    )
+    result.stats.row_count = len(rows)
+    return result
+
+
+def test_rows_view():
+    rows = [(i,) for i in range(10)]
+    view = RowsView(rows, range(2, 8))
+    assert len(view) == 6
+    assert view[0] == (2,)
+    assert view[-1] == (7,)
+    assert list(view) == rows[2:8]
+    assert view == rows[2:8]
+    assert view[::2] == [(2,), (4,), (6,)]
+    assert view[1:3]._rows is rows
+    with pytest.raises(IndexError):
+        view[6]
+
+
+def test_chained_rows():
+    parts = [[(0,), (1,)], [], RowsView([(2,), (3,), (4,)], range(3))]
+    chained = ChainedRows(parts)
+    assert len(chained) == 5
+    assert [chained[i] for i in range(5)] == [(i,) for i in range(5)]
+    assert chained[-1] == (4,)
+    assert list(chained) == [(i,) for i in range(5)]
+    assert chained[1:4] == [(1,), (2,), (3,)]
+    assert list(ChainedRows([chained, [(5,)]])) == [(i,) for i in range(6)]
+    with pytest.raises(IndexError):
+        chained[5]
+
+
+def test_slice_result():
+    rows = [(i, str(i)) for i in range(10)]
+    result = _result(rows)
+
+    sliced = result[2:5]
+    assert isinstance(sliced, DatabaseResult)
+    assert sliced.raw_data == rows[2:5]
+    assert sliced.columns == ("Col_Int", "Col_Str")
+    assert sliced.data[0] == {"Col_Int": 2, "Col_Str": "2"}
+    assert sliced[1:][0] == (3, "3")
+    assert sliced[1:].raw_data._rows is rows
+    assert result[3] == (3, "3")
+
+    assert result.head(3).raw_data == rows[:3]
+    assert result.head(20).raw_data == rows
+    assert result.head(3).to_json() == '[[0,"0"],[1,"1"],[2,"2"]]'
+
+
+def test_slice_spilled_result():
+    result = DatabaseResult(
+        ok=True,
+        fetch=True,
+        commit=False,
+        cursor=MockCursor(row_count=12_000, description=DESCRIPTION, row=[(1, "a")]),
+        memory_budget=1024,
+    )
+    assert isinstance(result.raw_data, SpilledRows)
+    assert result[-3:].raw_data == [(1, "a")] * 3
+
+
+def test_concat():
+    first = _result([(1, "a"), (2, "b")])
+    second = _result([(3, "c")])
+
+    result = DatabaseResult.concat([first, second, _result([])])
+    assert result.raw_data == [(1, "a"), (2, "b"), (3, "c")]
+    assert result.raw_data._parts[0] is first.raw_data
+    assert result.stats.row_count == 3
+    assert result.to_dataframe()["Col_Int"].tolist() == [1, 2, 3]
+
+    assert DatabaseResult.concat([result, first])[3:].raw_data == [(1, "a"), (2, "b")]
+
+
+def test_concat_slice():
+    result = _result([(1, "a"), (2, "b")])
+    result.stats.fetch_time = 1.0
+
+    sliced = result[:1]
+    assert sliced.stats is not result.stats
+    assert sliced.stats.row_count == 1
+    assert sliced.stats.fetch_time == 0.0
+
+    concat = DatabaseResult.concat([result, sliced])
+    assert concat.stats.row_count == 3
+    assert concat.stats.fetch_time == 1.0
+    assert result.stats.row_count == 2
+
+
+def test_concat_errors():
+    with pytest.raises(ValueError):
+        DatabaseResult.concat([])
+    with pytest.raises(ValueError, match="same columns"):
+        DatabaseResult.concat([_result([]), _result([], DESCRIPTION[:1])])
+    different_type = (DESCRIPTION[0], ("Col_Str", 2, None, None, None, None, None))
+    with pytest.raises(ValueError, match="same columns"):
+        DatabaseResult.concat([_result([]), _result([], different_type)])